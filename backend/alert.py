@@ -3,6 +3,7 @@ ArgusAI — Alert System (Telegram + Gmail)
 Sends notifications for:
   - OTP verification requests (MEDIUM risk)
   - Block alerts (HIGH risk)
+  - Digests of alerts held back by backend/alert_throttle.py
 """
 
 import os, random, asyncio, smtplib
@@ -11,6 +12,8 @@ from email.mime.text      import MIMEText
 from datetime             import datetime
 import httpx
 
+from ml.rules import rules
+
 # ─── Config ───────────────────────────────────────────────────────────────────
 # Telegram
 TELEGRAM_TOKEN   = os.getenv("TELEGRAM_TOKEN",   "YOUR_BOT_TOKEN_HERE")
@@ -29,6 +32,13 @@ def generate_otp(length: int = 6) -> str:
     return "".join([str(random.randint(0, 9)) for _ in range(length)])
 
 
+def issue_otp(txn_id: str) -> str:
+    """New OTP for `txn_id`, stored for verify_otp (sent or not)."""
+    otp = generate_otp()
+    _otp_store[txn_id] = otp
+    return otp
+
+
 # ─── Telegram Functions ───────────────────────────────────────────────────────
 async def _send_telegram(message: str) -> bool:
     """Send a message via Telegram Bot API."""
@@ -75,12 +85,18 @@ def _send_email(subject: str, html_body: str) -> bool:
         return False
 
 
+def _top_reason(result: dict) -> str:
+    """Label of the strongest SHAP signal; explanations may be skipped (cascade)."""
+    explanation = result.get("shap_explanation") or [{}]
+    return explanation[0].get("label", "unusual pattern")
+
+
 def _otp_email_html(txn, result, otp):
     amount   = txn.get("amount", 0)
     txn_id   = txn.get("transaction_id", "TXN???")
     city     = txn.get("transaction_city", "Unknown")
     risk     = result.get("risk_score", 0)
-    reason   = result.get("shap_explanation", [{}])[0].get("label", "unusual pattern")
+    reason   = _top_reason(result)
     time_now = datetime.now().strftime("%d %b %Y, %I:%M %p")
     return f"""<div style="font-family:Arial,sans-serif;max-width:500px;margin:0 auto;background:#0a0e1a;color:#e2e8f0;border-radius:12px;overflow:hidden;">
       <div style="background:linear-gradient(135deg,#f59e0b,#ef4444);padding:24px;text-align:center;">
@@ -114,11 +130,7 @@ def _block_email_html(txn, result):
     city     = txn.get("transaction_city", "Unknown")
     risk     = result.get("risk_score", 0)
     time_now = datetime.now().strftime("%d %b %Y, %I:%M %p")
-    signals  = []
-    if txn.get("is_night"):                        signals.append("Night-time transaction")
-    if txn.get("device_mismatch"):                 signals.append("Unknown device")
-    if txn.get("distance_from_home_km", 0) > 500: signals.append(f"{txn['distance_from_home_km']:.0f}km from home")
-    if txn.get("amount_vs_avg_ratio", 0) > 5:     signals.append("Amount far above average")
+    signals  = rules.signals(txn)
     rows = "".join([f"<tr><td style='padding:4px 0;'>• {s}</td></tr>" for s in signals]) or "<tr><td>Multiple risk signals</td></tr>"
     return f"""<div style="font-family:Arial,sans-serif;max-width:500px;margin:0 auto;background:#0a0e1a;color:#e2e8f0;border-radius:12px;overflow:hidden;">
       <div style="background:linear-gradient(135deg,#ef4444,#7f1d1d);padding:24px;text-align:center;">
@@ -147,13 +159,11 @@ def _block_email_html(txn, result):
 # ─── Public API (sends both Telegram + Email) ─────────────────────────────────
 async def send_otp_alert(txn: dict, result: dict) -> dict:
     """Send OTP alert via Telegram AND Email."""
-    otp     = generate_otp()
     txn_id  = txn.get("transaction_id", "TXN???")
+    otp     = issue_otp(txn_id)
     amount  = txn.get("amount", 0)
     city    = txn.get("transaction_city", "Unknown")
-    reason  = result.get("shap_explanation", [{}])[0].get("label", "unusual pattern")
-
-    _otp_store[txn_id] = otp
+    reason  = _top_reason(result)
 
     # Telegram message
     telegram_msg = (
@@ -189,14 +199,8 @@ async def send_block_alert(txn: dict, result: dict) -> bool:
     amount = txn.get("amount", 0)
     city   = txn.get("transaction_city", "Unknown")
 
-    # Build signals
-    signals = []
-    if txn.get("is_night"):          signals.append("🌙 Night-time transaction")
-    if txn.get("device_mismatch"):   signals.append("📱 Unknown device")
-    if txn.get("distance_from_home_km", 0) > 500:
-        signals.append(f"📍 {txn['distance_from_home_km']:.0f}km from home")
-    if txn.get("amount_vs_avg_ratio", 0) > 5:
-        signals.append("💸 Amount far above average")
+    # Risk signals: the rules this transaction hit (ml/rules.json)
+    signals = rules.signals(txn, icons=True)
     signal_text = "\n".join(signals) if signals else "Multiple risk signals"
 
     # Telegram message
@@ -226,6 +230,33 @@ async def send_block_alert(txn: dict, result: dict) -> bool:
     return telegram_sent or email_sent
 
 
+async def send_digest_alert(lines: list[str], window_s: float) -> bool:
+    """One message summarising the alerts coalesced during a throttle window."""
+    telegram_msg = (
+        f"📊 <b>ArgusAI — Alert digest</b>\n\n"
+        f"Alerts held back in the last {window_s:.0f}s (rate limited):\n"
+        f"─────────────────────────\n"
+        + "\n".join(f"• {line}" for line in lines) +
+        f"\n─────────────────────────\n"
+        f"🕐 {datetime.now().strftime('%d %b %Y, %I:%M %p')}"
+    )
+    telegram_sent = await _send_telegram(telegram_msg)
+
+    rows = "".join(f"<tr><td style='padding:4px 0;'>• {line}</td></tr>" for line in lines)
+    html = f"""<div style="font-family:Arial,sans-serif;max-width:500px;margin:0 auto;background:#0a0e1a;color:#e2e8f0;border-radius:12px;overflow:hidden;">
+      <div style="background:linear-gradient(135deg,#6366f1,#312e81);padding:24px;text-align:center;">
+        <h1 style="margin:0;font-size:24px;color:#fff;">📊 Alert digest</h1>
+        <p style="margin:8px 0 0;color:rgba(255,255,255,0.8);">Alerts held back in the last {window_s:.0f}s</p>
+      </div>
+      <div style="padding:24px;"><table style="width:100%;font-size:13px;">{rows}</table></div>
+    </div>"""
+    loop = asyncio.get_event_loop()
+    email_sent = await loop.run_in_executor(
+        None, _send_email, "ArgusAI: alert digest", html
+    )
+    return telegram_sent or email_sent
+
+
 def verify_otp(txn_id: str, user_otp: str) -> bool:
     stored = _otp_store.get(txn_id)
     if stored and stored == user_otp.strip():
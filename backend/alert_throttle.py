@@ -0,0 +1,220 @@
+"""
+ArgusAI — Alert Throttling
+Sits between process_and_broadcast and backend/alert.py so an attack
+cannot turn into an alert storm (hundreds of Telegram messages and emails
+a minute, provider rate limits, unbounded send tasks).
+
+An alert is sent only if all three allow it:
+
+  per-user bucket  ARGUS_ALERT_USER_PER_MIN tokens/min, burst ARGUS_ALERT_USER_BURST
+  global bucket    ARGUS_ALERT_GLOBAL_PER_MIN tokens/min, burst ARGUS_ALERT_GLOBAL_BURST
+                   (every alert lands in the same chat/mailbox)
+  task limit       at most ARGUS_ALERT_MAX_TASKS sends in flight
+
+Otherwise it is coalesced: counted against its user for the current
+window (ARGUS_ALERT_WINDOW_S). At the end of the window one digest covers
+every coalesced user:
+
+  37 blocked transactions for user 212 in the last 60s (₹184,200, max risk 98)
+
+Only when more than ARGUS_ALERT_MAX_PENDING users are already waiting in
+the window is an alert dropped outright. A throttled OTP still has its
+code issued (the dashboard can verify it); only the message is withheld.
+
+Outcomes per kind (sent / coalesced / dropped) and digests sent are at
+GET /api/alerts and in /metrics. ARGUS_ALERT_THROTTLE=0 sends everything
+(the task limit still applies).
+"""
+
+import os, asyncio
+from collections import Counter, OrderedDict
+from datetime import datetime
+from time import monotonic
+
+KINDS    = {"BLOCK": "blocked", "OTP": "OTP-challenged"}
+OUTCOMES = ("sent", "coalesced", "dropped")
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, per_min: float, burst: float, now: float):
+        self.rate   = per_min / 60.0
+        self.burst  = burst
+        self.tokens = burst
+        self.stamp  = now
+
+    def ready(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp  = now
+        return self.tokens >= 1.0
+
+
+class AlertThrottle:
+    def __init__(self, user_per_min: float = 3, user_burst: float = 3,
+                 global_per_min: float = 20, global_burst: float = 10,
+                 window_s: float = 60.0, max_tasks: int = 32,
+                 max_users: int = 10_000, max_pending: int = 1000,
+                 enabled: bool = True):
+        self.user_per_min   = user_per_min
+        self.user_burst     = user_burst
+        self.window_s       = window_s
+        self.max_tasks      = max_tasks
+        self.max_users      = max_users
+        self.max_pending    = max_pending
+        self.enabled        = enabled
+        self.outcomes  = Counter()                # (kind, outcome) → count
+        self.digests   = 0
+        self.last_digest = None
+        self._global   = TokenBucket(global_per_min, global_burst, monotonic())
+        self._users: OrderedDict = OrderedDict()  # user → TokenBucket (LRU)
+        self._pending: dict = {}                  # user → window summary
+        self._window_start = datetime.now()
+        self._tasks: set = set()
+        self._flusher = None
+        self._send_digest = None
+
+    # ── Admission ─────────────────────────────────────────────────────────────
+    def _bucket(self, user, now: float) -> TokenBucket:
+        bucket = self._users.get(user)
+        if bucket is None:
+            bucket = self._users[user] = TokenBucket(self.user_per_min, self.user_burst, now)
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user)
+        return bucket
+
+    def admit(self, kind: str, txn, result) -> bool:
+        """
+        True: send this alert now (and hold a task slot until it finishes).
+        False: it was coalesced into the window digest, or dropped.
+        """
+        if len(self._tasks) >= self.max_tasks:
+            return self._coalesce(kind, txn, result)
+        if self.enabled:
+            now    = monotonic()
+            bucket = self._bucket(txn.get("user_id"), now)
+            # Check both before taking either, so a refusal costs no token
+            if not (bucket.ready(now) and self._global.ready(now)):
+                return self._coalesce(kind, txn, result)
+            bucket.tokens       -= 1
+            self._global.tokens -= 1
+        self.outcomes[kind, "sent"] += 1
+        return True
+
+    def _coalesce(self, kind: str, txn, result) -> bool:
+        user    = txn.get("user_id")
+        summary = self._pending.get(user)
+        if summary is None:
+            if len(self._pending) >= self.max_pending:
+                self.outcomes[kind, "dropped"] += 1
+                return False
+            summary = self._pending[user] = {"kinds": Counter(), "amount": 0.0,
+                                             "max_risk": 0.0}
+        summary["kinds"][kind] += 1
+        summary["amount"]   += txn.get("amount", 0) or 0
+        summary["max_risk"]  = max(summary["max_risk"], result.get("risk_score", 0) or 0)
+        self.outcomes[kind, "coalesced"] += 1
+        return False
+
+    # ── Sending ───────────────────────────────────────────────────────────────
+    def spawn(self, coro) -> asyncio.Task:
+        """Run an admitted send in the background, holding a task slot."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+        return task
+
+    def _done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[Alert error] {task.exception()}")
+
+    async def send(self, coro):
+        """Await an admitted send inline (OTP at tier 0), holding a task slot."""
+        return await self.spawn(coro)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    async def drain(self):
+        """Wait for every send in flight (errors are reported by _done)."""
+        await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    # ── Window digests ────────────────────────────────────────────────────────
+    def digest_lines(self, limit: int = 20) -> list[str]:
+        """One line per coalesced user, most alerts first; resets the window."""
+        pending, self._pending = self._pending, {}
+        seconds = (datetime.now() - self._window_start).total_seconds()
+        self._window_start = datetime.now()
+        ranked  = sorted(pending.items(), key=lambda kv: -sum(kv[1]["kinds"].values()))
+        lines   = []
+        for user, s in ranked[:limit]:
+            what = " and ".join(f"{n} {KINDS.get(k, k.lower())}" for k, n in s["kinds"].items())
+            lines.append(f"{what} transactions for user {user} in the last {seconds:.0f}s "
+                         f"(₹{s['amount']:,.0f}, max risk {s['max_risk']:.0f})")
+        if len(ranked) > limit:
+            rest = sum(sum(s["kinds"].values()) for _, s in ranked[limit:])
+            lines.append(f"+ {rest} more alerts for {len(ranked) - limit} other users")
+        return lines
+
+    async def flush(self):
+        """Send the digest for the current window, if anything was coalesced."""
+        if not self._pending:
+            self._window_start = datetime.now()
+            return
+        lines = self.digest_lines()
+        self.digests    += 1
+        self.last_digest = {"at": datetime.now().isoformat(timespec="seconds"),
+                            "lines": lines}
+        if self._send_digest is not None:
+            # One message per window: outside the buckets, holds a task slot
+            await self.spawn(self._send_digest(lines, self.window_s))
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.window_s)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[Alert digest error] {e}")
+
+    def start(self, send_digest):
+        """`send_digest(lines, window_s)` is the coroutine that delivers a digest."""
+        self._send_digest  = send_digest
+        self._window_start = datetime.now()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+
+    def status(self) -> dict:
+        return {
+            "enabled":       self.enabled,
+            "outcomes":      {kind: {o: self.outcomes[kind, o] for o in OUTCOMES}
+                              for kind in KINDS},
+            "digests":       self.digests,
+            "last_digest":   self.last_digest,
+            "pending_users": len(self._pending),
+            "tasks":         self.in_flight,
+            "max_tasks":     self.max_tasks,
+            "global_tokens": round(self._global.tokens, 2),
+        }
+
+
+alerts = AlertThrottle(
+    user_per_min   = float(os.getenv("ARGUS_ALERT_USER_PER_MIN",   "3")),
+    user_burst     = float(os.getenv("ARGUS_ALERT_USER_BURST",     "3")),
+    global_per_min = float(os.getenv("ARGUS_ALERT_GLOBAL_PER_MIN", "20")),
+    global_burst   = float(os.getenv("ARGUS_ALERT_GLOBAL_BURST",   "10")),
+    window_s       = float(os.getenv("ARGUS_ALERT_WINDOW_S",       "60")),
+    max_tasks      = int(os.getenv("ARGUS_ALERT_MAX_TASKS",        "32")),
+    max_pending    = int(os.getenv("ARGUS_ALERT_MAX_PENDING",      "1000")),
+    enabled        = os.getenv("ARGUS_ALERT_THROTTLE", "1") == "1",
+)
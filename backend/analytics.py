@@ -0,0 +1,333 @@
+"""
+ArgusAI — Analytics Mirror
+Columnar copy of the audit log in an embedded DuckDB file, for the
+analyst queries SQLite is slow at (fraud rate by city × merchant × hour,
+risk distributions over months). Queries never touch the transactional
+file, so they cannot hold up the writer.
+
+  sync     rows are appended by SQLite id high-water mark, labels by
+           labelled_at, in chunks of SYNC_CHUNK; a background task runs it
+           every SYNC_SECS once the DB write generation has moved
+  queries  predefined aggregations (QUERIES) grouped by whitelisted
+           dimensions (DIMENSIONS), with optional time range and equality
+           filters; everything user-supplied is bound, never interpolated
+  lane     sync and queries share one "analytics" thread on the async DB
+           layer (backend/async_db.py), so they are timed like SQLite calls
+           and a long aggregation never stalls the event loop
+
+DuckDB is optional: without it (or with ARGUS_ANALYTICS=0) the mirror is
+disabled and /api/analytics/* answers 503.
+
+Config: ARGUS_ANALYTICS, ARGUS_ANALYTICS_DB, ARGUS_ANALYTICS_SYNC_SECS
+(default 5).
+"""
+
+import os, asyncio
+from datetime import datetime
+from time import perf_counter
+from typing import Optional
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:                          # optional dependency
+    duckdb = None
+
+from backend import database
+from backend.async_db import db
+
+ANALYTICS_DB = os.getenv("ARGUS_ANALYTICS_DB",
+                         os.path.join(os.path.dirname(__file__), "argusai_analytics.duckdb"))
+ENABLED      = os.getenv("ARGUS_ANALYTICS", "1") == "1"
+SYNC_SECS    = float(os.getenv("ARGUS_ANALYTICS_SYNC_SECS", "5"))
+SYNC_CHUNK   = 100_000
+MAX_GROUPS   = 10_000
+
+# Copied from SQLite; created_at becomes a TIMESTAMP plus a DATE (cheaper to
+# group on than formatting timestamps), and hour falls back to the hour the
+# row was logged for rows without features
+SOURCE_COLUMNS = ("id", "created_at", "user_id", "amount", "payment_type",
+                  "merchant_category", "transaction_city", "device_type",
+                  "device_mismatch", "distance_km", "is_night", "transaction_hour",
+                  "risk_score", "risk_level", "action", "fraud_prob",
+                  "anomaly_score", "is_anomaly", "model_version", "label")
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS transactions (
+        id                BIGINT PRIMARY KEY,
+        created_at        TIMESTAMP,
+        day               DATE,
+        user_id           BIGINT,
+        amount            DOUBLE,
+        payment_type      VARCHAR,
+        merchant_category VARCHAR,
+        transaction_city  VARCHAR,
+        device_type       VARCHAR,
+        device_mismatch   TINYINT,
+        distance_km       DOUBLE,
+        is_night          TINYINT,
+        hour              TINYINT,
+        risk_score        DOUBLE,
+        risk_level        VARCHAR,
+        action            VARCHAR,
+        fraud_prob        DOUBLE,
+        anomaly_score     DOUBLE,
+        is_anomaly        TINYINT,
+        model_version     VARCHAR,
+        label             TINYINT
+    );
+    CREATE TABLE IF NOT EXISTS sync_state (key VARCHAR PRIMARY KEY, value VARCHAR);
+"""
+
+_APPEND_SQL = """
+    INSERT INTO transactions
+    SELECT id, TRY_CAST(created_at AS TIMESTAMP), TRY_CAST(created_at AS DATE), user_id, amount, payment_type,
+           merchant_category, transaction_city, device_type, device_mismatch,
+           distance_km, is_night,
+           coalesce(transaction_hour, hour(TRY_CAST(created_at AS TIMESTAMP))),
+           risk_score, risk_level, action, fraud_prob, anomaly_score, is_anomaly,
+           model_version, label
+    FROM chunk
+"""
+
+# Group-by dimensions: API name → mirror expression
+DIMENSIONS = {
+    "city":          "transaction_city",
+    "merchant":      "merchant_category",
+    "payment_type":  "payment_type",
+    "device_type":   "device_type",
+    "action":        "action",
+    "risk_level":    "risk_level",
+    "model_version": "model_version",
+    "is_night":      "is_night",
+    "hour":          "hour",
+    "day":           "day",
+    "week":          "date_trunc('week', day)::DATE",
+    "month":         "date_trunc('month', day)::DATE",
+}
+
+# Predefined aggregations: name → (extra group expression, SELECT list).
+# Quantiles are computed together, so each group is sorted once.
+QUERIES = {
+    "fraud_rate": (None, """
+        count(*)                                              AS transactions,
+        count(*) FILTER (WHERE action = 'BLOCK')              AS blocked,
+        count(*) FILTER (WHERE action = 'OTP')                AS otp,
+        round(100.0 * count(*) FILTER (WHERE action = 'BLOCK') / nullif(count(*), 0), 3)
+                                                              AS block_rate_pct,
+        count(label)                                          AS labelled,
+        round(100.0 * sum(label) / nullif(count(label), 0), 3) AS confirmed_fraud_pct,
+        round(avg(risk_score), 2)                             AS avg_risk,
+        round(sum(amount), 2)                                 AS amount"""),
+    "risk_quantiles": (None, """
+        count(*)                                              AS transactions,
+        round(avg(risk_score), 2)                             AS avg_risk,
+        list_transform(quantile_cont(risk_score, [0.5, 0.9, 0.99]), q -> round(q, 2))
+                                                              AS p50_p90_p99_risk,
+        round(max(risk_score), 2)                             AS max_risk"""),
+    "risk_histogram": ("least(floor(risk_score / 10) * 10, 90)::INTEGER AS risk_bucket", """
+        count(*)                                              AS transactions,
+        count(label)                                          AS labelled,
+        coalesce(sum(label), 0)                               AS confirmed_fraud"""),
+}
+
+
+def _parse_where(where: Optional[str]) -> list[tuple[str, str]]:
+    """"city:Pune,action:BLOCK" → [("city", "Pune"), ("action", "BLOCK")]."""
+    filters = []
+    for part in filter(None, (where or "").split(",")):
+        dim, sep, value = part.partition(":")
+        if not sep or dim.strip() not in DIMENSIONS:
+            raise ValueError(f"bad filter {part!r}; use <dimension>:<value> with "
+                             f"dimension in {sorted(DIMENSIONS)}")
+        filters.append((dim.strip(), value.strip()))
+    return filters
+
+
+def build_query(query: str, by: list[str], since: Optional[str] = None,
+                until: Optional[str] = None, where: Optional[str] = None,
+                limit: int = 1000) -> tuple[str, list]:
+    """SQL and bound parameters for one predefined aggregation."""
+    if query not in QUERIES:
+        raise ValueError(f"unknown query {query!r}; choose from {sorted(QUERIES)}")
+    unknown = [d for d in by if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"unknown dimension(s) {unknown}; choose from {sorted(DIMENSIONS)}")
+    extra, select = QUERIES[query]
+    groups = [f"{DIMENSIONS[d]} AS {d}" for d in by] + ([extra] if extra else [])
+
+    conditions, params = [], []
+    for bound, op in ((since, ">="), (until, "<")):
+        if bound:
+            conditions.append(f"created_at {op} ?::TIMESTAMP")
+            params.append(bound)
+    for dim, value in _parse_where(where):
+        conditions.append(f"{DIMENSIONS[dim]}::VARCHAR = ?")
+        params.append(value)
+
+    sql = f"SELECT {', '.join(groups + [select])} FROM transactions"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    if groups:
+        positions = ", ".join(str(i + 1) for i in range(len(groups)))
+        sql += f" GROUP BY {positions} ORDER BY {positions}"
+    sql += " LIMIT ?"
+    params.append(max(1, min(limit, MAX_GROUPS)))
+    return sql, params
+
+
+class AnalyticsMirror:
+    def __init__(self, path: str = ANALYTICS_DB, enabled: bool = ENABLED):
+        self.path      = path
+        self.enabled   = enabled and duckdb is not None
+        self._conn     = None                  # opened on the analytics lane thread
+        self._source   = None
+        self._task     = None
+        self._synced_generation = None
+        self.synced_at = None
+        self.last_sync = {}
+        if self.enabled:
+            db.add_lane("analytics")
+
+    # ── Lane-thread work ─────────────────────────────────────────────────────
+    def _duck(self):
+        if self._conn is None:
+            self._conn = duckdb.connect(self.path)
+            self._conn.execute(_SCHEMA)
+        return self._conn
+
+    def _state(self, key: str, default: str = None) -> Optional[str]:
+        row = self._duck().execute("SELECT value FROM sync_state WHERE key = ?",
+                                   [key]).fetchone()
+        return row[0] if row else default
+
+    def _set_state(self, key: str, value: str):
+        self._duck().execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)",
+                             [key, value])
+
+    def sync_step(self) -> dict:
+        """Copy up to SYNC_CHUNK new rows and label changes; returns counts."""
+        duck = self._duck()
+        if self._source is None:
+            self._source = database.get_conn()
+        high = duck.execute("SELECT coalesce(max(id), 0) FROM transactions").fetchone()[0]
+        rows = self._source.execute(
+            f"SELECT {', '.join(SOURCE_COLUMNS)} FROM transactions "
+            f"WHERE id > ? ORDER BY id LIMIT ?", (high, SYNC_CHUNK)).fetchall()
+        if rows:
+            chunk = pd.DataFrame.from_records(rows, columns=SOURCE_COLUMNS)
+            duck.register("chunk", chunk)
+            try:
+                duck.execute(_APPEND_SQL)
+            finally:
+                duck.unregister("chunk")
+
+        # Labels set after a row was mirrored (rows copied later carry theirs)
+        since  = self._state("labelled_at", "")
+        labels = self._source.execute(
+            "SELECT id, label, labelled_at FROM transactions "
+            "WHERE labelled_at > ? ORDER BY labelled_at LIMIT ?",
+            (since, SYNC_CHUNK)).fetchall()
+        if labels:
+            chunk = pd.DataFrame.from_records(labels, columns=("id", "label", "labelled_at"))
+            duck.register("chunk", chunk)
+            try:
+                duck.execute("UPDATE transactions SET label = chunk.label FROM chunk "
+                             "WHERE transactions.id = chunk.id")
+            finally:
+                duck.unregister("chunk")
+            self._set_state("labelled_at", labels[-1][2])
+        self._source.rollback()                  # end the read snapshot
+        return {"rows": len(rows), "labels": len(labels)}
+
+    def sync(self) -> dict:
+        """Catch up completely (blocking; for scripts and benchmarks)."""
+        total = {"rows": 0, "labels": 0}
+        while True:
+            step = self.sync_step()
+            total = {k: total[k] + step[k] for k in total}
+            if step["rows"] < SYNC_CHUNK and step["labels"] < SYNC_CHUNK:
+                self.synced_at = datetime.utcnow()
+                return total
+
+    def run_query(self, query: str, by: list[str], since=None, until=None,
+                  where=None, limit: int = 1000) -> dict:
+        sql, params = build_query(query, by, since, until, where, limit)
+        started = perf_counter()
+        try:
+            cursor = self._duck().execute(sql, params)
+        except duckdb.Error as e:              # e.g. an unparseable since/until
+            raise ValueError(f"analytics query failed: {str(e).splitlines()[0]}") from e
+        columns = [d[0] for d in cursor.description]
+        rows    = cursor.fetchall()
+        return {
+            "query":      query,
+            "by":         by,
+            "columns":    columns,
+            "rows":       [list(r) for r in rows],
+            "truncated":  len(rows) >= params[-1],
+            "elapsed_ms": round((perf_counter() - started) * 1000, 2),
+        }
+
+    def _row_count(self) -> int:
+        return self._duck().execute("SELECT count(*) FROM transactions").fetchone()[0]
+
+    # ── Event-loop side ──────────────────────────────────────────────────────
+    async def catch_up(self):
+        """Sync chunk by chunk, so queries interleave during a large backfill."""
+        generation = database.write_generation()
+        totals     = {"rows": 0, "labels": 0}
+        while True:
+            step = await db.run("analytics", self.sync_step, name="analytics_sync")
+            totals = {k: totals[k] + step[k] for k in totals}
+            if step["rows"] < SYNC_CHUNK and step["labels"] < SYNC_CHUNK:
+                break
+        self._synced_generation = generation
+        self.synced_at = datetime.utcnow()
+        self.last_sync = totals
+        return totals
+
+    async def _sync_loop(self):
+        while True:
+            if database.write_generation() != self._synced_generation:
+                try:
+                    await self.catch_up()
+                except Exception as e:
+                    print(f"⚠️  Analytics sync failed: {e}")
+            await asyncio.sleep(SYNC_SECS)
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._sync_loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def query(self, query: str, by: list[str], since=None, until=None,
+                    where=None, limit: int = 1000) -> dict:
+        result = await db.run("analytics", self.run_query, query, by, since, until,
+                              where, limit, name=f"analytics_{query}")
+        result["synced_at"] = self.synced_at.isoformat() if self.synced_at else None
+        return result
+
+    async def status(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False,
+                    "reason": "duckdb not installed" if duckdb is None
+                              else "ARGUS_ANALYTICS=0"}
+        rows = await db.run("analytics", self._row_count, name="analytics_count")
+        return {
+            "enabled":    True,
+            "path":       self.path,
+            "rows":       rows,
+            "synced_at":  self.synced_at.isoformat() if self.synced_at else None,
+            "last_sync":  self.last_sync,
+            "queries":    sorted(QUERIES),
+            "dimensions": sorted(DIMENSIONS),
+        }
+
+
+mirror = AnalyticsMirror()
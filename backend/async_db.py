@@ -0,0 +1,82 @@
+"""
+ArgusAI — Async Database Access
+Runs backend/database.py functions off the event loop, so a slow query or
+commit never stalls scoring, WebSocket fan-out or other requests.
+
+Two lanes, each a small thread pool whose threads keep one pooled SQLite
+connection for their lifetime (database.connection()):
+
+  read   ARGUS_DB_READERS threads (default 2); with WAL they run alongside
+         the writer
+  write  one thread, since SQLite has a single writer anyway, so commits
+         queue here instead of contending for the file lock
+
+Every call is timed twice: time waiting for a lane thread, and time
+running the query itself.
+
+    from backend.async_db import db
+    stats = await db.read(get_stats)
+    await db.write(log_transaction, txn, result)
+"""
+
+import os, asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from backend import database, metrics
+
+READERS = int(os.getenv("ARGUS_DB_READERS", "2"))
+
+QUERY_SECONDS = metrics.Histogram("argus_db_query_seconds",
+                                  "SQLite call time on a DB lane thread",
+                                  ("query", "lane"))
+WAIT_SECONDS  = metrics.Histogram("argus_db_wait_seconds",
+                                  "Time a DB call waited for a lane thread", ("lane",))
+
+
+class AsyncDB:
+    def __init__(self, readers: int = READERS):
+        self.lanes = {
+            "read":  ThreadPoolExecutor(readers, thread_name_prefix="argus-db-read",
+                                        initializer=database.bind_thread_connection),
+            "write": ThreadPoolExecutor(1, thread_name_prefix="argus-db-write",
+                                        initializer=database.bind_thread_connection),
+        }
+        self.pending = {lane: 0 for lane in self.lanes}
+
+    def add_lane(self, lane: str, threads: int = 1, initializer=None):
+        """Extra lane for another store (e.g. the analytics mirror)."""
+        self.lanes[lane]   = ThreadPoolExecutor(threads, thread_name_prefix=f"argus-db-{lane}",
+                                                initializer=initializer)
+        self.pending[lane] = 0
+
+    async def run(self, lane: str, fn, *args, name: str = None):
+        return await self._run(lane, fn, args, name)
+
+    async def read(self, fn, *args, name: str = None):
+        return await self._run("read", fn, args, name)
+
+    async def write(self, fn, *args, name: str = None):
+        return await self._run("write", fn, args, name)
+
+    async def _run(self, lane: str, fn, args, name):
+        name     = name or getattr(fn, "__name__", "query")
+        queued   = perf_counter()
+        self.pending[lane] += 1
+
+        def call():
+            started = perf_counter()
+            WAIT_SECONDS.observe(started - queued, lane)
+            try:
+                return fn(*args)
+            finally:
+                QUERY_SECONDS.observe(perf_counter() - started, name, lane)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.lanes[lane], call)
+        finally:
+            self.pending[lane] -= 1
+
+
+db = AsyncDB()
@@ -0,0 +1,340 @@
+"""
+ArgusAI — Transaction Capture (record / replay)
+Compact binary capture of transaction streams for reproducible benchmarks.
+
+File layout (.argcap):
+  b"ARGCAP01" | uint32 header length | JSON header | fixed-width records
+
+Each record is one row of CAPTURE_DTYPE (little-endian NumPy structured
+array), so a capture is read back with a single memory map and no parsing.
+`t_offset_us` is the arrival time relative to the first record, which lets
+replay reproduce the original pacing, a scaled version of it, or run flat out.
+
+CLI:
+  python backend/capture.py record out.argcap --seed 42 --count 10000 --rate 50
+  python backend/capture.py info   out.argcap
+"""
+
+import os, sys, json, time, asyncio, argparse
+from collections import Counter
+from datetime import datetime
+from typing   import Optional
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+MAGIC   = b"ARGCAP01"
+VERSION = 1
+
+CAPTURE_DTYPE = np.dtype([
+    ("t_offset_us",           "<u8"),
+    ("transaction_id",        "S24"),
+    ("user_id",               "<i4"),
+    ("timestamp",             "<f8"),     # epoch seconds
+    ("amount",                "<f8"),
+    ("payment_type",          "S16"),
+    ("merchant_category",     "S16"),
+    ("transaction_city",      "S16"),
+    ("transaction_lat",       "<f4"),
+    ("transaction_lon",       "<f4"),
+    ("home_city",             "S16"),
+    ("home_lat",              "<f4"),
+    ("home_lon",              "<f4"),
+    ("distance_from_home_km", "<f8"),
+    ("device_type",           "S16"),
+    ("user_home_device",      "S16"),
+    ("device_mismatch",       "u1"),
+    ("card_age_days",         "<i4"),
+    ("transaction_hour",      "u1"),
+    ("transaction_day",       "u1"),
+    ("is_weekend",            "u1"),
+    ("is_night",              "u1"),
+    ("daily_txn_count",       "<u2"),
+    ("avg_amount_7d",         "<f8"),
+    ("amount_vs_avg_ratio",   "<f8"),
+    ("simulated_fraud",       "u1"),
+])
+
+_STR_FIELDS   = [n for n in CAPTURE_DTYPE.names if CAPTURE_DTYPE[n].kind == "S"]
+_F4_FIELDS    = [n for n in CAPTURE_DTYPE.names if CAPTURE_DTYPE[n] == np.float32]
+# Integer field → (min, max) of its dtype; out-of-range values are clipped
+_INT_RANGES   = {n: (int(np.iinfo(CAPTURE_DTYPE[n]).min), int(np.iinfo(CAPTURE_DTYPE[n]).max))
+                 for n in CAPTURE_DTYPE.names if CAPTURE_DTYPE[n].kind in "iu"}
+_SKIP_FIELDS  = {"t_offset_us", "timestamp", "simulated_fraud"}
+
+
+def _parse_ts(value) -> float:
+    if not value:
+        return time.time()
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return time.time()
+
+
+# ─── Encoding ─────────────────────────────────────────────────────────────────
+def _fit(text: str, size: int, issues: Counter = None) -> bytes:
+    """UTF-8 bytes of `text`, cut to `size` on a character boundary."""
+    data = text.encode()
+    if len(data) <= size:
+        return data
+    if issues is not None:
+        issues["truncated"] += 1
+    return data[:size].decode(errors="ignore").encode()
+
+
+def encode(txn: dict, t_offset_us: int = 0, issues: Counter = None) -> tuple:
+    """
+    Transaction dict → CAPTURE_DTYPE row tuple (missing fields → 0 / "").
+    Integers outside their field's range are clipped to it and strings longer
+    than their field are cut on a character boundary, counted in `issues` as
+    "clipped" / "truncated". A value that is not a number raises ValueError.
+    """
+    row = []
+    for name in CAPTURE_DTYPE.names:
+        if name == "t_offset_us":
+            row.append(t_offset_us)
+        elif name == "timestamp":
+            row.append(_parse_ts(txn.get("timestamp")))
+        elif name == "simulated_fraud":
+            row.append(int(bool(txn.get("_simulated_fraud", False))))
+        elif name in _STR_FIELDS:
+            row.append(_fit(str(txn.get(name) or ""), CAPTURE_DTYPE[name].itemsize, issues))
+        elif name in _INT_RANGES:
+            value    = int(txn.get(name) or 0)
+            lo, hi   = _INT_RANGES[name]
+            if not lo <= value <= hi:
+                value = min(max(value, lo), hi)
+                if issues is not None:
+                    issues["clipped"] += 1
+            row.append(value)
+        else:
+            row.append(float(txn.get(name) or 0))
+    return tuple(row)
+
+
+def decode(rec) -> dict:
+    """CAPTURE_DTYPE row → transaction dict as produced by the simulator."""
+    txn = {}
+    for name in CAPTURE_DTYPE.names:
+        if name in _SKIP_FIELDS:
+            continue
+        val = rec[name]
+        if name in _STR_FIELDS:
+            txn[name] = val.decode(errors="ignore")   # older captures cut mid-character
+        elif name in _F4_FIELDS:
+            txn[name] = round(float(val), 4)
+        elif isinstance(val, np.floating):
+            txn[name] = float(val)
+        else:
+            txn[name] = int(val)
+    txn["timestamp"] = datetime.fromtimestamp(float(rec["timestamp"])) \
+                               .strftime("%Y-%m-%d %H:%M:%S")
+    txn["_simulated_fraud"] = bool(rec["simulated_fraud"])
+    return txn
+
+
+# ─── Writer ───────────────────────────────────────────────────────────────────
+class CaptureWriter:
+    """
+    Append-only capture file; records are buffered and flushed in blocks.
+    Recording must never fail scoring: a transaction that cannot be encoded
+    is skipped and counted (`issues`), not raised.
+    """
+
+    def __init__(self, path: str, source: str = "live", seed: Optional[int] = None,
+                 flush_every: int = 256):
+        self.path        = path
+        self.count       = 0
+        self.issues      = Counter()      # clipped / truncated / skipped
+        self.flush_every = flush_every
+        self._buf: list[tuple] = []
+        self._t0         = None
+        header = json.dumps({
+            "version":    VERSION,
+            "source":     source,
+            "seed":       seed,
+            "created_at": datetime.utcnow().isoformat(),
+            "dtype":      CAPTURE_DTYPE.descr,
+        }).encode()
+        self._fh = open(path, "wb")
+        self._fh.write(MAGIC)
+        self._fh.write(np.uint32(len(header)).tobytes())
+        self._fh.write(header)
+
+    def write(self, txn: dict, at: Optional[float] = None):
+        """Record `txn` as arriving at monotonic time `at` (default: now)."""
+        at = time.monotonic() if at is None else at
+        if self._t0 is None:
+            self._t0 = at
+        try:
+            self._buf.append(encode(txn, int((at - self._t0) * 1e6), self.issues))
+        except (TypeError, ValueError, OverflowError):
+            self.issues["skipped"] += 1
+            return
+        self.count += 1
+        if len(self._buf) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if not self._buf:
+            return
+        rows, self._buf = self._buf, []
+        try:
+            block = np.array(rows, dtype=CAPTURE_DTYPE)
+        except (TypeError, ValueError, OverflowError):
+            # encode() should have caught it; salvage the block row by row
+            good = []
+            for row in rows:
+                try:
+                    good.append(np.array([row], dtype=CAPTURE_DTYPE))
+                except (TypeError, ValueError, OverflowError):
+                    self.issues["skipped"] += 1
+                    self.count -= 1
+            block = np.concatenate(good) if good else np.zeros(0, dtype=CAPTURE_DTYPE)
+        self._fh.write(block.tobytes())
+        self._fh.flush()
+
+    def close(self):
+        if not self._fh.closed:
+            self.flush()
+            self._fh.close()
+
+
+# ─── Reader ───────────────────────────────────────────────────────────────────
+def read_header(path: str) -> tuple[dict, int]:
+    """Return (header dict, byte offset of the first record)."""
+    with open(path, "rb") as fh:
+        if fh.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an ArgusAI capture file")
+        hlen   = int(np.frombuffer(fh.read(4), dtype="<u4")[0])
+        header = json.loads(fh.read(hlen))
+    return header, len(MAGIC) + 4 + hlen
+
+
+def open_capture(path: str) -> np.ndarray:
+    """Memory-map all records of a capture (zero-copy, no parsing)."""
+    _, offset = read_header(path)
+    n = (os.path.getsize(path) - offset) // CAPTURE_DTYPE.itemsize
+    if n == 0:
+        return np.zeros(0, dtype=CAPTURE_DTYPE)
+    return np.memmap(path, dtype=CAPTURE_DTYPE, mode="r", offset=offset, shape=(n,))
+
+
+def iter_batches(path: str, batch_size: int = 1024):
+    """Yield lists of decoded transactions, for batch scoring."""
+    recs = open_capture(path)
+    for i in range(0, len(recs), batch_size):
+        yield [decode(r) for r in recs[i:i + batch_size]]
+
+
+# ─── Replay ───────────────────────────────────────────────────────────────────
+async def replay(path: str, handler, speed: float = 1.0,
+                 limit: Optional[int] = None, max_pending: int = 256) -> dict:
+    """
+    Feed a capture into async `handler(txn)` (e.g. process_and_broadcast).
+
+    speed=1.0 → original pacing, 2.0 → twice as fast, 0 → as fast as possible.
+    Pacing is open-loop (arrivals are not delayed by slow handling) up to
+    `max_pending` handlers in flight; past that, arrivals wait for a slot
+    and the delay shows up in max_lag_ms. Handler exceptions are counted
+    in `errors` (first few messages in `error_samples`).
+    """
+    recs  = open_capture(path)
+    if limit is not None:
+        recs = recs[:limit]
+    loop  = asyncio.get_running_loop()
+    start = loop.time()
+    slots = asyncio.Semaphore(max(int(max_pending), 1))
+    tasks, max_lag = [], 0.0
+    outcome = Counter()
+    samples: list[str] = []
+
+    async def handle(txn: dict):
+        try:
+            await handler(txn)
+            outcome["ok"] += 1
+        except Exception as e:
+            outcome["errors"] += 1
+            if len(samples) < 5:
+                samples.append(f"{type(e).__name__}: {e}")
+        finally:
+            slots.release()
+
+    for rec in recs:
+        if speed > 0:
+            due = start + float(rec["t_offset_us"]) / 1e6 / speed
+            now = loop.time()
+            if due > now:
+                await asyncio.sleep(due - now)
+            await slots.acquire()
+            max_lag = max(max_lag, loop.time() - due)
+            tasks.append(asyncio.create_task(handle(decode(rec))))
+        else:
+            await slots.acquire()
+            await handle(decode(rec))
+    if tasks:
+        await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+    return {
+        "replayed":      outcome["ok"],
+        "errors":        outcome["errors"],
+        "error_samples": samples,
+        "elapsed_s":     round(elapsed, 3),
+        "rate":          round(len(recs) / elapsed, 2) if elapsed > 0 else 0.0,
+        "speed":         speed,
+        "max_lag_ms":    round(max_lag * 1000, 2),
+    }
+
+
+# ─── CLI ──────────────────────────────────────────────────────────────────────
+def _record_synthetic(path: str, seed: int, count: int, rate: float,
+                      fraud_every: int = 0):
+    """Write a deterministic synthetic capture (simulated clock, fixed spacing)."""
+    from backend.transaction_stream import TransactionGenerator
+
+    gen    = TransactionGenerator(seed=seed, start=datetime(2024, 1, 1, 9, 0),
+                                  step_secs=1.0 / rate)
+    writer = CaptureWriter(path, source="synthetic", seed=seed)
+    for i in range(count):
+        force = bool(fraud_every) and i % fraud_every == 0
+        writer.write(gen.generate(force_fraud=force), at=i / rate)
+    writer.close()
+    return writer.count
+
+
+def main():
+    ap  = argparse.ArgumentParser(description="ArgusAI capture tool")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    rec = sub.add_parser("record", help="write a seeded synthetic capture")
+    rec.add_argument("path")
+    rec.add_argument("--seed",  type=int,   default=42)
+    rec.add_argument("--count", type=int,   default=10000)
+    rec.add_argument("--rate",  type=float, default=10.0, help="tx/s pacing")
+    rec.add_argument("--fraud-every", type=int, default=0,
+                     help="force a fraud transaction every N records")
+
+    info = sub.add_parser("info", help="print header and summary")
+    info.add_argument("path")
+
+    args = ap.parse_args()
+    if args.cmd == "record":
+        n = _record_synthetic(args.path, args.seed, args.count, args.rate,
+                              args.fraud_every)
+        size = os.path.getsize(args.path)
+        print(f"✅ Capture saved → {args.path}  ({n:,} records, {size/1e6:.2f} MB)")
+    else:
+        header, _ = read_header(args.path)
+        recs = open_capture(args.path)
+        span = recs["t_offset_us"][-1] / 1e6 if len(recs) else 0.0
+        print(json.dumps({k: v for k, v in header.items() if k != "dtype"}, indent=2))
+        print(f"   Records  : {len(recs):,}  ({CAPTURE_DTYPE.itemsize} B each)")
+        print(f"   Duration : {span:.1f}s")
+        if len(recs):
+            print(f"   Fraud    : {int(recs['simulated_fraud'].sum()):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,63 @@ ArgusAI — Database Layer (SQLite)
 Stores every transaction decision for audit, analytics, and the dashboard.
 """
 
-import sqlite3, os, json
+import sqlite3, os, json, threading
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Optional
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "argusai.db")
+from backend.ids import new_txn_id, parse_txn_id
+from ml import explain_codec
+from ml.records import Transaction, Decision, row_getter
+
+DB_PATH = os.getenv("ARGUS_DB_PATH",
+                    os.path.join(os.path.dirname(__file__), "argusai.db"))
+
+# PRAGMA user_version; 1 = shap_explanation stored packed (ml/explain_codec.py)
+SCHEMA_VERSION = 1
+
+# Bumped after every committed write; read caches compare it (backend/snapshots.py)
+_writes = 0
+
+
+def write_generation() -> int:
+    return _writes
+
+
+# Model inputs stored with every decision so logged rows can be re-scored and
+# fed back into training (ml/refresh.py). Added after the original schema,
+# hence nullable and migrated in by _migrate().
+FEATURE_COLUMNS = {
+    "card_age_days":       "INTEGER",
+    "transaction_hour":    "INTEGER",
+    "transaction_day":     "INTEGER",
+    "is_weekend":          "INTEGER",
+    "daily_txn_count":     "INTEGER",
+    "avg_amount_7d":       "REAL",
+    "amount_vs_avg_ratio": "REAL",
+}
+# Ground truth: 1 = confirmed fraud, 0 = confirmed legitimate, NULL = unknown
+LABEL_COLUMNS = {
+    "label":        "INTEGER",
+    "label_source": "TEXT",
+    "labelled_at":  "TEXT",
+}
+# Request fingerprint of client-keyed transactions (backend/idempotency.py).
+# Unique per transaction_id where set; NULL for older and server-keyed rows.
+IDEMPOTENCY_COLUMNS = {
+    "fingerprint":  "TEXT",
+}
+# 64-bit snowflake key of generated transaction IDs (backend/ids.py); NULL
+# for client-supplied and pre-snowflake IDs
+KEY_COLUMNS = {
+    "txn_key":      "INTEGER",
+}
+# Cascade early exits (ml/predict.py) skip the autoencoder: risk_score is the
+# AE-free lower bound, risk_upper the score with the AE at its maximum, and
+# anomaly_score / is_anomaly are NULL. risk_upper is NULL for fully scored rows.
+CASCADE_COLUMNS = {
+    "risk_upper":   "REAL",
+}
 
 
 def get_conn():
@@ -15,8 +68,39 @@ def get_conn():
     return conn
 
 
+# Threads of the async DB lanes (backend/async_db.py) keep one connection each
+_local = threading.local()
+
+
+def bind_thread_connection():
+    """Give the calling thread a persistent connection (thread-pool initializer)."""
+    _local.pooled = True
+
+
+@contextmanager
+def connection():
+    """The thread's pooled connection if it has one, else a fresh one closed after."""
+    if getattr(_local, "pooled", False):
+        conn = getattr(_local, "conn", None)
+        if conn is None:
+            conn = _local.conn = get_conn()
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        return
+    conn = get_conn()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
 def init_db():
     conn = get_conn()
+    # WAL: readers (dashboard queries) no longer wait on the audit-log writer
+    conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("""
         CREATE TABLE IF NOT EXISTS transactions (
             id               INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -42,6 +126,10 @@ def init_db():
             created_at       TEXT
         )
     """)
+    _migrate(conn)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        _compact_explanations(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.execute("""
         CREATE TABLE IF NOT EXISTS user_risk_profile (
             user_id          INTEGER PRIMARY KEY,
@@ -56,40 +144,150 @@ def init_db():
     print("✅ Database initialised →", DB_PATH)
 
 
-def log_transaction(txn: dict, result: dict):
-    conn  = get_conn()
-    now   = datetime.utcnow().isoformat()
+def _migrate(conn):
+    """Add columns introduced after the first release to existing databases."""
+    have = {r["name"] for r in conn.execute("PRAGMA table_info(transactions)")}
+    for name, sql_type in {**FEATURE_COLUMNS, **LABEL_COLUMNS,
+                           **IDEMPOTENCY_COLUMNS, **KEY_COLUMNS,
+                           **CASCADE_COLUMNS}.items():
+        if name not in have:
+            conn.execute(f"ALTER TABLE transactions ADD COLUMN {name} {sql_type}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_txn_labelled_at "
+                 "ON transactions(labelled_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_txn_transaction_id "
+                 "ON transactions(transaction_id)")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_txn_idempotency "
+                 "ON transactions(transaction_id) WHERE fingerprint IS NOT NULL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_txn_key ON transactions(txn_key)")
 
-    conn.execute("""
-        INSERT INTO transactions
-        (transaction_id, user_id, timestamp, amount, payment_type,
-         merchant_category, transaction_city, device_type, device_mismatch,
-         distance_km, is_night, risk_score, risk_level, action,
-         fraud_prob, anomaly_score, is_anomaly, shap_explanation,
-         model_version, created_at)
-        VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-    """, (
-        txn.get("transaction_id", f"TXN{int(datetime.utcnow().timestamp())}"),
-        txn.get("user_id",         0),
-        txn.get("timestamp",       now),
-        txn.get("amount",          0),
-        txn.get("payment_type",    ""),
-        txn.get("merchant_category",""),
-        txn.get("transaction_city",""),
-        txn.get("device_type",     ""),
-        txn.get("device_mismatch", 0),
-        txn.get("distance_from_home_km", 0),
-        txn.get("is_night",        0),
-        result.get("risk_score",   0),
-        result.get("risk_level",   ""),
-        result.get("action",       ""),
-        result.get("fraud_prob",   0),
-        result.get("anomaly_score",0),
-        int(result.get("is_anomaly", False)),
-        json.dumps(result.get("shap_explanation", [])),
-        result.get("model_version",""),
+
+def _compact_explanations(conn, batch: int = 50_000) -> int:
+    """
+    Rewrite JSON explanations from before SCHEMA_VERSION 1 as packed pairs,
+    one committed batch at a time. Rows it cannot pack (features unknown to
+    the codec) keep their JSON, which explain_codec.unpack() still reads.
+    The file only shrinks after a VACUUM.
+    """
+    last, packed = 0, 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, shap_explanation FROM transactions WHERE id > ? ORDER BY id LIMIT ?",
+            (last, batch)).fetchall()
+        if not rows:
+            break
+        last    = rows[-1][0]
+        updates = []
+        for row_id, stored in rows:
+            if isinstance(stored, str):
+                try:
+                    updates.append((explain_codec.pack(json.loads(stored)), row_id))
+                except (ValueError, KeyError, TypeError):
+                    pass
+        conn.executemany("UPDATE transactions SET shap_explanation=? WHERE id=?", updates)
+        conn.commit()
+        packed += len(updates)
+    if packed:
+        print(f"🗜️  Packed {packed:,} SHAP explanations (VACUUM to reclaim the space)")
+    return packed
+
+
+def log_transaction(txn: Transaction, result: Decision):
+    log_transactions([(txn, result)])
+
+
+def log_transactions(rows: list[tuple[Transaction, Decision]]):
+    """Log many (txn, result) decisions in one commit (deferred writes)."""
+    global _writes
+    with connection() as conn:
+        for txn, result in rows:
+            _insert(conn, txn, result, datetime.utcnow().isoformat())
+        conn.commit()
+    _writes += 1
+
+
+# Column order of _audit_values(); FEATURE_COLUMNS follow created_at
+AUDIT_COLUMNS = (
+    "transaction_id", "user_id", "timestamp", "amount", "payment_type",
+    "merchant_category", "transaction_city", "device_type", "device_mismatch",
+    "distance_km", "is_night", "risk_score", "risk_level", "action",
+    "fraud_prob", "anomaly_score", "is_anomaly", "shap_explanation",
+    "model_version", "created_at", *FEATURE_COLUMNS, "fingerprint", "txn_key",
+    *CASCADE_COLUMNS,
+)
+# Columns of a history row (get_recent_transactions, audit_row)
+ROW_COLUMNS = ("id", *AUDIT_COLUMNS, *LABEL_COLUMNS)
+_INSERT_SQL = (f"INSERT OR IGNORE INTO transactions ({', '.join(AUDIT_COLUMNS)}) "
+               f"VALUES ({', '.join('?' * len(AUDIT_COLUMNS))})")
+
+
+# Record fields → audit columns, each read in one call (ml/records.py);
+# the second tuple holds the defaults for fields a record lacks
+_TXN_AUDIT = row_getter(
+    ("user_id", "amount", "payment_type", "merchant_category", "transaction_city",
+     "device_type", "device_mismatch", "distance_from_home_km", "is_night"),
+    (0,         0,        "",             "",                  "",
+     "",            0,                 0,                       0))
+_DECISION_AUDIT = row_getter(
+    ("risk_score", "risk_level", "action", "fraud_prob", "anomaly_score"),
+    (0,            "",           "",       0,            0))
+_FEATURE_AUDIT  = row_getter(FEATURE_COLUMNS, (None,) * len(FEATURE_COLUMNS))
+
+
+def _audit_values(txn, result, now: str) -> tuple:
+    txn, result    = Transaction.of(txn), Decision.of(result)
+    transaction_id = txn.get("transaction_id") or new_txn_id()
+    user_id, *txn_values = _TXN_AUDIT(txn)
+    is_anomaly = result.get("is_anomaly", False)
+    cascade    = result.get("cascade")
+    return (
+        transaction_id,
+        user_id,
+        txn.get("timestamp", now),
+        *txn_values,
+        *_DECISION_AUDIT(result),
+        None if is_anomaly is None else int(is_anomaly),
+        explain_codec.pack(result.get("shap_explanation") or []),
+        result.get("model_version", ""),
         now,
-    ))
+        *_FEATURE_AUDIT(txn),
+        result.get("fingerprint"),
+        parse_txn_id(transaction_id),
+        cascade["risk_bounds"][1] if cascade and cascade["early_exit"] else None,
+    )
+
+
+def audit_row(decision: dict) -> dict:
+    """
+    A broadcast decision ({**txn, **result, processed_at}) in the shape of a
+    history row, for rows served from memory (backend/recent.py). `id` is
+    only assigned by SQLite, so it is None here.
+    """
+    row = dict(zip(AUDIT_COLUMNS, _audit_values(
+        decision, decision, decision.get("processed_at") or datetime.utcnow().isoformat())))
+    row["shap_explanation"] = decision.get("shap_explanation") or []
+    return {"id": None, **row, **{col: decision.get(col) for col in LABEL_COLUMNS}}
+
+
+def _flag(value) -> Optional[bool]:
+    """is_anomaly column → bool; NULL (AE skipped by the cascade) stays None."""
+    return None if value is None else bool(value)
+
+
+def decision_from_row(row: dict) -> dict:
+    """Inverse of audit_row(): a logged row as a broadcast decision."""
+    decision = dict(row)
+    decision["distance_from_home_km"] = decision.pop("distance_km", 0)
+    decision["is_anomaly"]       = _flag(decision["is_anomaly"])
+    decision["processed_at"]     = decision["created_at"]
+    return decision
+
+
+def _insert(conn, txn: dict, result: dict, now: str):
+    # OR IGNORE: a retried client-keyed transaction that is already logged
+    # (unique fingerprint index) adds neither a row nor a profile update
+    cur = conn.execute(_INSERT_SQL, _audit_values(txn, result, now))
+    if not cur.rowcount:
+        return
 
     # Update rolling user risk profile
     uid = txn.get("user_id", 0)
@@ -110,31 +308,61 @@ def log_transaction(txn: dict, result: dict):
         now,
     ))
 
-    conn.commit()
-    conn.close()
-
 
 def get_recent_transactions(limit: int = 50) -> list[dict]:
-    conn = get_conn()
-    rows = conn.execute(
-        "SELECT * FROM transactions ORDER BY created_at DESC LIMIT ?", (limit,)
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    with connection() as conn:
+        rows = conn.execute(
+            f"SELECT {', '.join(ROW_COLUMNS)} FROM transactions "
+            f"ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+    out = [dict(r) for r in rows]
+    for row in out:
+        row["shap_explanation"] = explain_codec.unpack(row["shap_explanation"])
+    return out
+
+
+def get_decision(transaction_id: str) -> Optional[dict]:
+    """Logged decision of a client-keyed transaction (idempotent replays)."""
+    with connection() as conn:
+        row = conn.execute("""
+            SELECT fingerprint, risk_score, risk_level, action, fraud_prob,
+                   anomaly_score, is_anomaly, shap_explanation, model_version
+            FROM transactions WHERE transaction_id=? AND fingerprint IS NOT NULL
+        """, (transaction_id,)).fetchone()
+    if row is None:
+        return None
+    decision = dict(row)
+    decision["is_anomaly"]       = _flag(decision["is_anomaly"])
+    decision["shap_explanation"] = explain_codec.unpack(decision["shap_explanation"])
+    return decision
+
+
+def set_label(transaction_id: str, label: int, source: str) -> int:
+    """Record ground truth for a transaction; returns the number of rows updated."""
+    global _writes
+    key  = parse_txn_id(transaction_id)
+    with connection() as conn:
+        cur = conn.execute(
+            "UPDATE transactions SET label=?, label_source=?, labelled_at=? "
+            + ("WHERE txn_key=?" if key is not None else "WHERE transaction_id=?"),
+            (int(label), source, datetime.utcnow().isoformat(),
+             key if key is not None else transaction_id))
+        conn.commit()
+    _writes += 1
+    return cur.rowcount
 
 
 def get_stats() -> dict:
-    conn = get_conn()
-    total  = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
-    fraud  = conn.execute(
-        "SELECT COUNT(*) FROM transactions WHERE action='BLOCK'").fetchone()[0]
-    otp    = conn.execute(
-        "SELECT COUNT(*) FROM transactions WHERE action='OTP'").fetchone()[0]
-    allow  = conn.execute(
-        "SELECT COUNT(*) FROM transactions WHERE action='ALLOW'").fetchone()[0]
-    avg_risk = conn.execute(
-        "SELECT AVG(risk_score) FROM transactions").fetchone()[0] or 0
-    conn.close()
+    with connection() as conn:
+        total  = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        fraud  = conn.execute(
+            "SELECT COUNT(*) FROM transactions WHERE action='BLOCK'").fetchone()[0]
+        otp    = conn.execute(
+            "SELECT COUNT(*) FROM transactions WHERE action='OTP'").fetchone()[0]
+        allow  = conn.execute(
+            "SELECT COUNT(*) FROM transactions WHERE action='ALLOW'").fetchone()[0]
+        avg_risk = conn.execute(
+            "SELECT AVG(risk_score) FROM transactions").fetchone()[0] or 0
     return {
         "total":     total,
         "blocked":   fraud,
@@ -146,28 +374,26 @@ def get_stats() -> dict:
 
 
 def get_user_profile(user_id: int) -> dict:
-    conn = get_conn()
-    row  = conn.execute(
-        "SELECT * FROM user_risk_profile WHERE user_id=?", (user_id,)
-    ).fetchone()
-    conn.close()
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT * FROM user_risk_profile WHERE user_id=?", (user_id,)
+        ).fetchone()
     return dict(row) if row else {}
 
 
 def get_risk_trend(hours: int = 24) -> list[dict]:
-    conn = get_conn()
-    rows = conn.execute("""
-        SELECT
-            strftime('%H:00', created_at) as hour,
-            COUNT(*) as total,
-            SUM(CASE WHEN action='BLOCK' THEN 1 ELSE 0 END) as fraud,
-            AVG(risk_score) as avg_risk
-        FROM transactions
-        WHERE created_at >= datetime('now', ?)
-        GROUP BY hour
-        ORDER BY hour
-    """, (f"-{hours} hours",)).fetchall()
-    conn.close()
+    with connection() as conn:
+        rows = conn.execute("""
+            SELECT
+                strftime('%H:00', created_at) as hour,
+                COUNT(*) as total,
+                SUM(CASE WHEN action='BLOCK' THEN 1 ELSE 0 END) as fraud,
+                AVG(risk_score) as avg_risk
+            FROM transactions
+            WHERE created_at >= datetime('now', ?)
+            GROUP BY hour
+            ORDER BY hour
+        """, (f"-{hours} hours",)).fetchall()
     return [dict(r) for r in rows]
 
 
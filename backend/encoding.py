@@ -0,0 +1,75 @@
+"""
+ArgusAI — Encoding
+One place that turns response and broadcast data into bytes.
+
+  JSON     orjson when installed (several times faster than json.dumps, and
+           numpy scalars/arrays encode natively), else the stdlib
+  msgpack  optional; WebSocket clients opt in with /ws/stream?encoding=msgpack
+           and then receive binary frames
+
+FastJSONResponse is the app's default response class. Routes on the hot
+path return it directly, which also skips FastAPI's jsonable_encoder walk.
+Broadcasts are encoded once per message and per format, not per client
+(see ConnectionManager.broadcast in backend/main.py).
+"""
+
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:                          # optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:                          # optional dependency
+    msgpack = None
+
+FORMATS = ("json", "msgpack") if msgpack is not None else ("json",)
+
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def _default(obj):
+    if hasattr(obj, "as_dict"):              # ml/records.py
+        return obj.as_dict()
+    if hasattr(obj, "item"):                 # numpy scalar
+        return obj.item()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumps(value) -> bytes:
+    """Compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False,
+                      default=_default).encode()
+
+
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def packb(value) -> bytes:
+    return msgpack.packb(value, default=_default)
+
+
+def encode(value, fmt: str = "json"):
+    """A WebSocket frame: str (text frame) for JSON, bytes for msgpack."""
+    return packb(value) if fmt == "msgpack" else dumps(value).decode()
+
+
+def decode(frame):
+    """Inverse of encode() for an incoming text or binary frame."""
+    if isinstance(frame, (bytes, bytearray)):
+        return msgpack.unpackb(frame) if msgpack is not None else loads(frame)
+    return loads(frame)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,98 @@
+"""
+ArgusAI — Idempotent Scoring
+Payment gateways retry. A POST /api/transaction that repeats a client-supplied
+transaction_id with the same payload gets the original decision back
+without re-running the models, writing a second audit row, updating the
+user profile again or sending a second OTP.
+
+  key          transaction_id (client-supplied only; generated IDs are new
+               transactions by definition)
+  fingerprint  blake2b of the scoring payload — every field except
+               transaction_id and timestamp, which retries may regenerate
+
+Lookups go to a bounded in-process LRU first, then to the audit log, where
+a unique index on (transaction_id) for fingerprinted rows guarantees one
+decision per key across restarts. The same key with a different
+fingerprint is a conflict (HTTP 409), not a replay.
+"""
+
+import os, json, hashlib
+from collections import OrderedDict, Counter
+from typing import Optional
+
+from backend.database import get_decision
+from backend.async_db import db
+
+CACHE_SIZE = int(os.getenv("ARGUS_IDEMPOTENCY_SIZE", "10000"))
+
+# Not part of the fingerprint: retries may legitimately regenerate these
+_UNHASHED = ("transaction_id", "timestamp")
+
+
+class IdempotencyConflict(Exception):
+    """transaction_id reused with a different payload."""
+
+
+def fingerprint(txn: dict) -> str:
+    payload = {k: v for k, v in txn.items() if k not in _UNHASHED}
+    blob    = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(blob.encode(), digest_size=16).hexdigest()
+
+
+class IdempotencyCache:
+    def __init__(self, size: int = CACHE_SIZE, lookup=get_decision):
+        self.size     = size
+        self.lookup   = lookup                       # audit-log fallback
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self.outcomes = Counter()                    # hit / db_hit / miss / conflict
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, transaction_id: str, fp: str) -> Optional[dict]:
+        """Original decision for a retry, None for a new transaction."""
+        result = self._entries.get(transaction_id)
+        source = "hit"
+        if result is not None:
+            self._entries.move_to_end(transaction_id)
+        else:
+            row = await db.read(self.lookup, transaction_id)
+            # A concurrent attempt may have been scored while we awaited
+            result = self._entries.get(transaction_id)
+            if result is None and row is None:
+                self.outcomes["miss"] += 1
+                return None
+            if result is None:
+                result, source = self._from_log(row), "db_hit"
+                self.remember(transaction_id, result)
+
+        if result.get("fingerprint") != fp:
+            self.outcomes["conflict"] += 1
+            raise IdempotencyConflict(transaction_id)
+        self.outcomes[source] += 1
+        return {**result, "replayed": True}
+
+    def remember(self, transaction_id: str, result: dict):
+        """Call as soon as a decision exists, before anything awaits."""
+        self._entries[transaction_id] = result
+        self._entries.move_to_end(transaction_id)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _from_log(row: dict) -> dict:
+        from ml.predict import FraudEngine
+        return {**row, "message": FraudEngine._decide(row["risk_score"])[2]}
+
+    def status(self) -> dict:
+        looked_up = sum(self.outcomes.values())
+        replays   = self.outcomes["hit"] + self.outcomes["db_hit"]
+        return {
+            "entries":  len(self),
+            "size":     self.size,
+            **{k: self.outcomes[k] for k in ("hit", "db_hit", "miss", "conflict")},
+            "hit_rate": round(replays / looked_up, 4) if looked_up else 0.0,
+        }
+
+
+idempotency = IdempotencyCache()
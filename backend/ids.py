@@ -0,0 +1,163 @@
+"""
+ArgusAI — Transaction IDs
+Snowflake-style 64-bit IDs: unique across workers, ordered by time, and
+cheap to index as an INTEGER.
+
+  bit 63        0 (IDs stay positive in a signed 64-bit column)
+  bits 22-62    milliseconds since EPOCH_MS (41 bits ≈ 69 years)
+  bits 12-21    worker id (ARGUS_WORKER_ID, else leased on this host)
+  bits 0-11     sequence
+
+The sequence is an itertools.count — a single C call, atomic under the
+GIL — masked to 12 bits, so next_id() takes no lock. IDs are unique while a
+worker issues fewer than 4,096 in one millisecond, and sort by millisecond;
+two minted in the same millisecond sort by sequence unless the sequence
+wrapped between them. The clock is the wall clock at startup advanced by
+time.monotonic_ns(), so NTP steps cannot make it run backwards.
+
+Without ARGUS_WORKER_ID a process leases the lowest free worker id on its
+host: an exclusive, non-blocking lock on worker-<id>.lock in
+ARGUS_WORKER_LEASE_DIR (default: <tmp>/argusai-workers), held for the life
+of the process and released by the OS when it exits, so crashed workers
+leave no stale lease. A child forked after import leases its own id. Hosts
+share no lease directory: give workers on different hosts distinct
+ARGUS_WORKER_ID values.
+
+As strings, generated IDs are "TXN" + 19 zero-padded digits. That keeps them
+apart from client-supplied IDs and from the older TXN<seconds> / TXN<counter>
+forms, which are shorter.
+"""
+
+import os, re, time, tempfile, itertools
+from datetime import datetime, timezone
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:                          # Windows
+    fcntl = None
+    import msvcrt
+
+EPOCH_MS    = 1577836800000          # 2020-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQ_BITS    = 12
+MAX_WORKER  = (1 << WORKER_BITS) - 1
+_SEQ_MASK   = (1 << SEQ_BITS) - 1
+_PREFIX     = "TXN"
+_ID_RE      = re.compile(r"TXN(\d{19})")
+LEASE_DIR   = os.getenv("ARGUS_WORKER_LEASE_DIR",
+                        os.path.join(tempfile.gettempdir(), "argusai-workers"))
+
+
+def _try_lock(fh) -> bool:
+    try:
+        fh.seek(0)
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def lease_worker_id(lease_dir: str = None) -> tuple[int, object]:
+    """
+    Lowest worker id no other live process on this host holds. Returns
+    (id, open lock file); the lease lasts as long as the file stays open.
+    """
+    lease_dir = lease_dir or LEASE_DIR
+    os.makedirs(lease_dir, exist_ok=True)
+    for worker in range(MAX_WORKER + 1):
+        fh = open(os.path.join(lease_dir, f"worker-{worker}.lock"), "a+")
+        if _try_lock(fh):
+            fh.seek(0); fh.truncate(); fh.write(f"{os.getpid()}\n"); fh.flush()
+            return worker, fh
+        fh.close()
+    raise RuntimeError(f"all {MAX_WORKER + 1} worker ids in {lease_dir} are leased; "
+                       "set ARGUS_WORKER_ID")
+
+
+def env_worker_id() -> Optional[int]:
+    env = os.getenv("ARGUS_WORKER_ID")
+    if env is None:
+        return None
+    worker = int(env)
+    if not 0 <= worker <= MAX_WORKER:
+        raise ValueError(f"ARGUS_WORKER_ID must be 0-{MAX_WORKER}, got {worker}")
+    return worker
+
+
+class Snowflake:
+    def __init__(self, worker_id: int = None, epoch_ms: int = EPOCH_MS):
+        """`worker_id` None: ARGUS_WORKER_ID, else a host-local lease."""
+        self._lease = None
+        if worker_id is None:
+            worker_id = env_worker_id()
+        if worker_id is None:
+            worker_id, self._lease = lease_worker_id()
+        self._set_worker(worker_id)
+        self.epoch_ms  = epoch_ms
+        self._wall_ms  = time.time_ns() // 1_000_000
+        self._mono_ns  = time.monotonic_ns()
+
+    def _set_worker(self, worker_id: int):
+        if not 0 <= worker_id <= MAX_WORKER:
+            raise ValueError(f"worker id must be 0-{MAX_WORKER}")
+        self.worker_id = worker_id
+        self._worker   = worker_id << SEQ_BITS
+        self._seq      = itertools.count()
+
+    def _after_fork(self):
+        """In a forked child: the parent's lease is not ours, take a new one."""
+        if self._lease is not None:
+            worker_id, self._lease = lease_worker_id()
+            self._set_worker(worker_id)
+
+    def now_ms(self) -> int:
+        return self._wall_ms + (time.monotonic_ns() - self._mono_ns) // 1_000_000
+
+    def next_id(self, at_ms: int = None) -> int:
+        """New ID; `at_ms` (epoch ms) pins the time part, for simulated clocks."""
+        ms  = (self.now_ms() if at_ms is None else at_ms) - self.epoch_ms
+        seq = next(self._seq) & _SEQ_MASK
+        return (ms << (WORKER_BITS + SEQ_BITS)) | self._worker | seq
+
+    def next_txn_id(self, at: datetime = None) -> str:
+        return format_txn_id(self.next_id(None if at is None else to_ms(at)))
+
+
+def to_ms(at: datetime) -> int:
+    """Epoch ms of a datetime; naive values are taken as UTC."""
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return int(at.timestamp() * 1000)
+
+
+def format_txn_id(key: int) -> str:
+    return f"{_PREFIX}{key:019d}"
+
+
+def parse_txn_id(transaction_id: str) -> Optional[int]:
+    """Integer key of a generated ID; None for any other transaction_id."""
+    m = _ID_RE.fullmatch(transaction_id or "")
+    return int(m.group(1)) if m else None
+
+
+def decode(key: int, epoch_ms: int = EPOCH_MS) -> dict:
+    return {
+        "timestamp": datetime.fromtimestamp(
+            ((key >> (WORKER_BITS + SEQ_BITS)) + epoch_ms) / 1000, tz=timezone.utc),
+        "worker":    (key >> SEQ_BITS) & MAX_WORKER,
+        "sequence":  key & _SEQ_MASK,
+    }
+
+
+# Process-wide generator shared by the API, the live simulator and the DB layer
+_ids = Snowflake()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_ids._after_fork)
+
+
+def new_txn_id() -> str:
+    return _ids.next_txn_id()
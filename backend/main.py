@@ -2,35 +2,83 @@
 ArgusAI — FastAPI Backend
 Endpoints:
   POST /api/transaction         → analyze single transaction
+  POST /api/transactions/batch  → analyze a list of transactions (validated together)
   POST /api/transaction/fraud   → inject a fraud transaction (demo)
-  GET  /api/transactions        → recent transaction history
-  GET  /api/stats               → system statistics
-  GET  /api/user/{id}           → user risk profile
-  POST /api/otp/verify          → verify OTP
-  WS   /ws/stream               → live transaction WebSocket feed
+  GET  /api/transactions        → recent transaction history   ┐ cached snapshots,
+  GET  /api/stats               → system statistics            │ ETag / 304
+  GET  /api/user/{id}           → user risk profile            ┘ (backend/snapshots.py)
+  POST /api/otp/verify          → verify OTP (success labels the txn legitimate)
+  POST /api/transactions/{id}/label → record ground truth for model refresh
+  POST /api/stream/control      → start/stop the simulator (rate + load profile)
+  GET  /api/stream/status       → simulator target vs. achieved rate and lag
+  POST /api/capture/control     → start/stop recording traffic to a capture file
+  POST /api/capture/replay      → replay a capture through the pipeline
+  WS   /ws/stream               → live transaction WebSocket feed (recent backlog on connect;
+                                  ?encoding=msgpack for binary frames)
+  GET  /metrics                 → Prometheus text-format metrics
+  GET  /api/debug/slow          → captured slow scoring requests
+  POST /api/debug/profiling     → toggle slow-request capture at runtime
+  GET  /api/debug/profile       → sample the live process, collapsed stacks
+  GET  /api/models              → model versions, active/shadow, per-version latency
+  POST /api/models/activate     → load + warm a version, then hot-swap it in
+  POST /api/models/shadow       → shadow-score a sampled fraction with a candidate
+  GET  /api/shedding            → latency budget, current scoring tier, deferred writes
+  GET  /api/analytics/query     → predefined aggregations on the columnar mirror
+  GET  /api/analytics/status    → mirror size and last sync (backend/analytics.py)
+  GET  /api/alerts              → alerts sent / coalesced / dropped, last digest
+  GET  /api/rules               → active risk rules, per-rule hit rate and cost
+  POST /api/rules/reload        → re-read ml/rules.json now (else picked up on change)
+
+Under load, scoring degrades by tier to stay inside ARGUS_LATENCY_BUDGET_MS
+(backend/shedding.py); responses carry `degraded` and `tier`.
 """
 
-import sys, os, asyncio, json
+import sys, os, asyncio
+from time     import perf_counter
 from datetime import datetime
 from typing import Optional
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import (FastAPI, WebSocket, BackgroundTasks,
+                     HTTPException, Query, Request)
+from fastapi.exceptions      import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-
-from ml.predict                  import predict_transaction
-from backend.database            import (log_transaction, get_recent_transactions,
-                                          get_stats, get_user_profile, get_risk_trend)
-from backend.alert               import send_otp_alert, send_block_alert, verify_otp
+from fastapi.responses       import PlainTextResponse, Response
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from ml.predict                  import predict_transaction, unseen_category_counts
+from ml.registry                 import registry
+from ml.records                  import Transaction
+from ml.rules                    import rules, RuleError
+from backend.database            import (log_transaction, log_transactions,
+                                          get_recent_transactions, get_stats,
+                                          get_user_profile, get_risk_trend, set_label,
+                                          audit_row, decision_from_row, write_generation)
+from backend.alert               import (send_otp_alert, send_block_alert, send_digest_alert,
+                                         issue_otp, verify_otp)
+from backend.alert_throttle      import alerts, KINDS, OUTCOMES
 from backend.transaction_stream  import generate_live_transaction
+from backend.stream_controller   import StreamController, build_profile, PROFILES
+from backend.capture             import CaptureWriter, replay
+from backend                     import metrics
+from backend.profiling           import (slow_log, request_context, sample_profile,
+                                         SlowRequestMiddleware)
+from backend.shedding            import shedder, DeferredWriter, TIERS, SCORING_STAGES
+from backend.idempotency         import idempotency, fingerprint, IdempotencyConflict
+from backend.ids                 import new_txn_id
+from backend.recent              import recent
+from backend.snapshots           import snapshots
+from backend.async_db            import db
+from backend.analytics           import mirror
+from backend.encoding            import FastJSONResponse, encode, decode, FORMATS
 
 # ─── App ──────────────────────────────────────────────────────────────────────
 app = FastAPI(
     title       = "ArgusAI Fraud Detection API",
     description = "Real-time AI-powered fraud detection & risk management",
     version     = "1.0.0",
+    default_response_class = FastJSONResponse,
 )
 
 app.add_middleware(
@@ -41,60 +89,204 @@ app.add_middleware(
     allow_headers     = ["*"],
 )
 
+# ─── Slow request capture ─────────────────────────────────────────────────────
+# The routes that score transactions (not labelling, which shares the prefix)
+SCORING_ROUTES = ("/api/transaction", "/api/transactions/batch",
+                  "/api/transaction/fraud", "/api/transaction/simulate")
+app.add_middleware(SlowRequestMiddleware, paths=SCORING_ROUTES)
+
+
 # ─── WebSocket Manager ────────────────────────────────────────────────────────
 class ConnectionManager:
     def __init__(self):
         self.active: list[WebSocket] = []
+        self.formats: dict[int, str] = {}          # id(ws) → "json" | "msgpack"
 
-    async def connect(self, ws: WebSocket):
+    async def connect(self, ws: WebSocket, fmt: str = "json"):
         await ws.accept()
+        # Snapshot and subscribe in one step: later decisions arrive as broadcasts
+        backlog = recent.latest(WS_BACKLOG)
         self.active.append(ws)
+        self.formats[id(ws)] = fmt
+        await self.send(ws, {"type": "backlog", "transactions": backlog})
 
     def disconnect(self, ws: WebSocket):
         if ws in self.active:
             self.active.remove(ws)
+        self.formats.pop(id(ws), None)
+
+    @staticmethod
+    async def _send_frame(ws: WebSocket, frame):
+        if isinstance(frame, bytes):
+            await ws.send_bytes(frame)
+        else:
+            await ws.send_text(frame)
+
+    async def send(self, ws: WebSocket, data: dict):
+        await self._send_frame(ws, encode(data, self.formats.get(id(ws), "json")))
 
     async def broadcast(self, data: dict):
-        dead = []
+        """Encodes `data` once per format in use; every client gets the same frame."""
+        frames = {}
+        dead   = []
         for ws in self.active:
+            fmt   = self.formats.get(id(ws), "json")
+            frame = frames.get(fmt)
+            if frame is None:
+                frame = frames[fmt] = encode(data, fmt)
             try:
-                await ws.send_json(data)
+                await self._send_frame(ws, frame)
             except Exception:
                 dead.append(ws)
         for ws in dead:
             self.disconnect(ws)
 
 
+WS_BACKLOG     = int(os.getenv("ARGUS_WS_BACKLOG", "100"))   # the dashboard keeps 100
 manager        = ConnectionManager()
-_streaming     = False
-_stream_task   = None
+deferred       = DeferredWriter(lambda rows: db.write(log_transactions, rows))
+_capture: Optional[CaptureWriter] = None
+
+CAPTURE_DIR = os.getenv("ARGUS_CAPTURE_DIR",
+                        os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                     "data", "captures"))
 
 
 # ─── Core transaction processor ───────────────────────────────────────────────
-async def process_and_broadcast(txn: dict):
-    result = predict_transaction(txn)
-    log_transaction(txn, result)
-
-    # Send alerts
-    if result["action"] == "BLOCK":
-        asyncio.create_task(send_block_alert(txn, result))
-    elif result["action"] == "OTP":
-        otp_data = await send_otp_alert(txn, result)
-        result["otp_sent"] = otp_data.get("sent", False)
-        result["otp"]      = otp_data.get("otp", "")
-
-    payload = {**txn, **result, "processed_at": datetime.utcnow().isoformat()}
-    await manager.broadcast(payload)
+async def process_and_broadcast(txn, fp: str = None):
+    """Score, log, alert and broadcast one transaction (dict or Transaction)."""
+    txn     = Transaction.of(txn)
+    started = perf_counter()
+    timings = {}
+    tier    = shedder.admit()          # 0 = full scoring, see backend/shedding.py
+    service = None
+    external = 0.0
+    try:
+        if _capture is not None:
+            try:
+                _capture.write(txn)
+            except OSError as e:              # disk full etc. — never fail scoring
+                print(f"[Capture error] {e}")
+        result = predict_transaction(txn, timings, tier)
+        # Only the scoring stages are the tier's service time; DB and alert
+        # awaits are not work the tier choice can shed
+        service = sum(timings.get(stage, 0.0) for stage in SCORING_STAGES)
+        result.degraded = tier > 0
+        result.tier     = TIERS[tier]
+        if fp is not None:
+            # Before any await, so a concurrent retry already sees it
+            result.fingerprint = fp
+            idempotency.remember(txn.transaction_id, result)
+
+        # Degraded: the audit row is written in the background, in batches
+        t0 = perf_counter()
+        if tier:
+            await deferred.put(txn, result)
+        else:
+            await db.write(log_transaction, txn, result)
+        t1 = perf_counter();  timings["db_write"] = t1 - t0
+
+        # Send alerts — rate-limited per user and overall; the rest are
+        # coalesced into a digest (backend/alert_throttle.py)
+        if result.action == "BLOCK":
+            if alerts.admit("BLOCK", txn, result):
+                alerts.spawn(send_block_alert(txn, result))
+        elif result.action == "OTP" and tier:
+            if alerts.admit("OTP", txn, result):
+                alerts.spawn(send_otp_alert(txn, result))
+            else:
+                result.otp_throttled = True
+            result.otp_sent     = False
+            result.otp_deferred = True
+        elif result.action == "OTP":
+            if alerts.admit("OTP", txn, result):
+                otp_data = await alerts.send(send_otp_alert(txn, result))
+                result.otp_sent = otp_data.get("sent", False)
+                result.otp      = otp_data.get("otp", "")
+            else:
+                result.otp_sent      = False
+                result.otp           = issue_otp(txn.get("transaction_id", "TXN???"))
+                result.otp_throttled = True
+        t0 = perf_counter();  timings["alert_enqueue"] = t0 - t1
+        external = timings["alert_enqueue"]     # Telegram/Gmail round trip (inline OTP)
+
+        payload = txn.as_dict()
+        payload.update(result.as_dict())
+        payload["processed_at"] = datetime.utcnow().isoformat()
+        recent.append(payload)
+        await manager.broadcast(payload)
+        done = perf_counter();  timings["broadcast"] = done - t0
+    finally:
+        shedder.done(tier, service, perf_counter() - started - external)
+
+    metrics.record_request(timings, result.action, done - started)
+    ctx = request_context.get()
+    if ctx is not None:
+        # One entry per transaction: a batch scores several in one request
+        ctx["items"].append({"timings": timings, "txn": txn.as_dict(),
+                             "action": result.action})
     return result
 
 
 # ─── Background stream ────────────────────────────────────────────────────────
-async def _auto_stream(interval: float):
-    global _streaming
-    while _streaming:
-        txn = generate_live_transaction()
-        await process_and_broadcast(txn)
-        await asyncio.sleep(interval)
+stream = StreamController(process_and_broadcast, generate_live_transaction)
+
+
+# ─── Scrape-time metrics ──────────────────────────────────────────────────────
+metrics.counter_func("argus_unseen_category_total",
+                     "Categorical values unknown to the label encoders",
+                     unseen_category_counts, ("feature",))
+metrics.gauge("argus_model_predict_ms",
+              "Recent predict latency per model version and role (p50/p99)",
+              lambda: {(v, role, q): s.summary()[f"p{q}_ms"]
+                       for (v, role), s in list(registry.latency.items())
+                       for q in ("50", "99")},
+              ("version", "role", "quantile"))
+metrics.counter_func("argus_model_predictions_total",
+                     "Predictions per model version and role",
+                     lambda: {k: s.count for k, s in list(registry.latency.items())},
+                     ("version", "role"))
+metrics.counter_func("argus_alerts_total",
+                     "Block/OTP alerts by outcome (sent / coalesced / dropped)",
+                     lambda: {(k, o): alerts.outcomes[k, o] for k in KINDS for o in OUTCOMES},
+                     ("kind", "outcome"))
+metrics.counter_func("argus_alert_digests_total", "Digests of coalesced alerts sent",
+                     lambda: alerts.digests)
+metrics.gauge("argus_alert_tasks", "Alert sends in flight", lambda: alerts.in_flight)
+metrics.counter_func("argus_rule_hits_total", "Transactions each risk rule fired on",
+                     lambda: {r.name: r.hits for r in rules.ruleset.rules}, ("rule",))
+metrics.counter_func("argus_rule_evaluations_total", "Transactions run through the rules",
+                     lambda: rules.ruleset.evaluated)
+metrics.gauge("argus_shedding_tier",
+              "Scoring tier the next transaction would get (0 = full)",
+              shedder.current_tier)
+metrics.counter_func("argus_degraded_total",
+                     "Transactions scored at a degraded tier",
+                     lambda: {TIERS[t]: n for t, n in shedder.admitted.items() if t},
+                     ("tier",))
+metrics.gauge("argus_event_loop_lag_seconds", "Smoothed event-loop lag",
+              lambda: shedder.loop_lag)
+metrics.gauge("argus_deferred_writes_queued", "Audit rows waiting to be written",
+              lambda: deferred.status()["queued"])
+metrics.counter_func("argus_deferred_writes_dropped_total",
+                     "Deferred audit rows that failed every retry",
+                     lambda: deferred.dropped)
+metrics.counter_func("argus_idempotency_total",
+                     "Client-keyed transaction lookups (hit / db_hit / miss / conflict)",
+                     lambda: dict(idempotency.outcomes), ("outcome",))
+metrics.gauge("argus_idempotency_entries", "Decisions held in the idempotency LRU",
+              lambda: len(idempotency))
+metrics.counter_func("argus_snapshot_total",
+                     "Dashboard read snapshots (fresh / shared / computed / not_modified)",
+                     lambda: dict(snapshots.outcomes), ("outcome",))
+metrics.gauge("argus_db_pending", "DB calls queued or running per lane",
+              lambda: dict(db.pending), ("lane",))
+metrics.gauge("argus_ws_clients", "Connected WebSocket clients",
+              lambda: len(manager.active))
+metrics.gauge("argus_stream_target_rate", "Simulator target rate (tx/s)",
+              lambda: stream.status().get("target_rate", 0))
+metrics.gauge("argus_stream_achieved_rate", "Simulator achieved rate (tx/s)",
+              lambda: stream.status().get("achieved_rate", 0))
 
 
 # ─── Pydantic Schemas ─────────────────────────────────────────────────────────
@@ -122,9 +314,66 @@ class OTPVerify(BaseModel):
     transaction_id: str
     otp:            str
 
+class TransactionLabel(BaseModel):
+    label:  int                      # 1 = confirmed fraud, 0 = legitimate
+    source: str = "analyst"
+
+class CaptureControl(BaseModel):
+    action: str = "start"            # "start" | "stop"
+    name:   str = "live.argcap"      # file name inside CAPTURE_DIR
+
+class CaptureReplay(BaseModel):
+    name:  str
+    speed: float         = 1.0       # 1 = original pacing, 0 = max speed
+    limit: Optional[int] = None
+
+class ProfilingControl(BaseModel):
+    enabled:      Optional[bool]  = None
+    threshold_ms: Optional[float] = None
+    capacity:     Optional[int]   = None
+
+class ModelActivate(BaseModel):
+    version: str
+
+class ModelShadow(BaseModel):
+    version:  Optional[str] = None   # None stops shadow scoring
+    fraction: float         = 0.1
+
 class StreamControl(BaseModel):
-    action:   str    = "start"   # "start" | "stop"
-    interval: float  = 3.0
+    action:         str             = "start"     # "start" | "stop"
+    interval:       float           = 3.0         # legacy: used when rate is unset
+    rate:           Optional[float] = None        # target tx/s
+    profile:        str             = "constant"  # constant | burst | ramp | diurnal
+    peak_rate:      Optional[float] = None        # burst/ramp/diurnal peak tx/s
+    burst_every:    float           = 60.0
+    burst_duration: float           = 10.0
+    ramp_secs:      float           = 300.0
+    period:         float           = 600.0       # diurnal cycle length (s)
+    concurrency:    int             = 1
+    max_pending:    int             = 1000
+    poisson:        bool            = False       # exponential inter-arrivals
+
+
+# Ingest is validated straight from the request bytes and dumped to dicts in
+# one call each (pydantic-core), instead of model → .dict() per request
+MAX_BATCH   = int(os.getenv("ARGUS_MAX_BATCH", "1000"))
+_TXN_INPUT  = TypeAdapter(TransactionInput)
+_TXN_BATCH  = TypeAdapter(list[TransactionInput])
+_TXN_SCHEMA = TransactionInput.model_json_schema()
+
+
+def _json_body(schema: dict) -> dict:
+    """OpenAPI request body for routes that validate the raw body themselves."""
+    return {"requestBody": {"required": True,
+                            "content": {"application/json": {"schema": schema}}}}
+
+
+def _validated(adapter: TypeAdapter, body: bytes):
+    try:
+        return adapter.dump_python(adapter.validate_json(body))
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)])
 
 
 # ─── Routes ───────────────────────────────────────────────────────────────────
@@ -143,19 +392,61 @@ async def health():
     return {"status": "ok", "timestamp": datetime.utcnow().isoformat()}
 
 
-@app.post("/api/transaction")
-async def analyze_transaction(txn_input: TransactionInput):
-    """Analyze a single transaction and return risk assessment."""
-    txn = txn_input.dict()
-    if not txn.get("transaction_id"):
-        txn["transaction_id"] = f"TXN{int(datetime.utcnow().timestamp())}"
+async def _analyze(txn: dict) -> dict:
+    fp  = None
     if not txn.get("timestamp"):
         txn["timestamp"] = datetime.utcnow().isoformat()
-
-    result = await process_and_broadcast(txn)
+    if txn.get("transaction_id"):
+        fp = fingerprint(txn)
+        try:
+            replayed = await idempotency.get(txn["transaction_id"], fp)
+        except IdempotencyConflict:
+            raise HTTPException(409, f"transaction {txn['transaction_id']} was "
+                                     "already scored with a different payload")
+        if replayed is not None:
+            return {"transaction": txn, "result": replayed}
+    else:
+        txn["transaction_id"] = new_txn_id()
+
+    result = await process_and_broadcast(txn, fp)
     return {"transaction": txn, "result": result}
 
 
+@app.post("/api/transaction", openapi_extra=_json_body(_TXN_SCHEMA))
+async def analyze_transaction(request: Request):
+    """
+    Analyze a single transaction and return risk assessment. A retry with
+    the same transaction_id and payload returns the original decision
+    (result.replayed); the same id with a different payload is a 409.
+    """
+    txn = _validated(_TXN_INPUT, await request.body())
+    return FastJSONResponse(await _analyze(txn))
+
+
+@app.post("/api/transactions/batch",
+          openapi_extra=_json_body({"type": "array", "items": _TXN_SCHEMA}))
+async def analyze_batch(request: Request):
+    """
+    Analyze up to ARGUS_MAX_BATCH transactions, validated in one pass and
+    scored concurrently. Items are independent: one whose transaction_id
+    conflicts is reported in place (`error`, `status`), the rest are scored.
+    """
+    txns = _validated(_TXN_BATCH, await request.body())
+    if len(txns) > MAX_BATCH:
+        raise HTTPException(413, f"batch of {len(txns)} exceeds {MAX_BATCH}")
+    outcomes = await asyncio.gather(*(_analyze(t) for t in txns), return_exceptions=True)
+    results  = []
+    for txn, out in zip(txns, outcomes):
+        if isinstance(out, HTTPException):
+            results.append({"transaction": txn, "error": out.detail,
+                            "status": out.status_code})
+        elif isinstance(out, BaseException):
+            raise out
+        else:
+            results.append(out)
+    return FastJSONResponse({"results": results})
+
+
 @app.post("/api/transaction/fraud")
 async def inject_fraud_transaction():
     """Inject a simulated fraud transaction (for live demo)."""
@@ -172,27 +463,188 @@ async def simulate_transaction():
     return {"transaction": txn, "result": result}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(),
+                             media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/debug/slow")
+async def slow_requests():
+    return slow_log.snapshot()
+
+
+@app.post("/api/debug/profiling")
+async def control_profiling(body: ProfilingControl):
+    slow_log.configure(body.enabled, body.threshold_ms, body.capacity)
+    snap = slow_log.snapshot()
+    snap.pop("requests")
+    return snap
+
+
+@app.get("/api/debug/profile", response_class=PlainTextResponse)
+async def profile_process(seconds: float = 10.0, hz: float = 100.0):
+    """Collapsed stacks for flamegraph.pl / speedscope. Requires profiling on."""
+    if not slow_log.enabled:
+        raise HTTPException(403, "profiling is disabled "
+                                 "(POST /api/debug/profiling {\"enabled\": true})")
+    seconds = min(max(seconds, 0.1), 120.0)
+    hz      = min(max(hz, 1.0), 1000.0)
+    loop = asyncio.get_running_loop()
+    try:
+        stacks = await loop.run_in_executor(None, sample_profile, seconds, hz)
+    except RuntimeError as e:
+        raise HTTPException(409, str(e))
+    return PlainTextResponse(stacks, headers={
+        "Content-Disposition": 'attachment; filename="argusai.collapsed"'})
+
+
+@app.get("/api/models")
+async def model_status():
+    return registry.status()
+
+
+def _start_model_load(fn, version: str, *args):
+    """Run a registry load on a worker thread; the API keeps serving meanwhile."""
+    if registry.loading and registry.loading["state"] in ("loading", "warming"):
+        raise HTTPException(409, f"already loading {registry.loading['version']}")
+    try:
+        registry.path_for(version)
+    except KeyError:
+        raise HTTPException(404, f"unknown model version {version}")
+    registry.loading = {"version": version, "state": "loading", "error": None}
+    future = asyncio.get_running_loop().run_in_executor(None, fn, version, *args)
+    future.add_done_callback(lambda f: f.exception())      # error lands in status
+    return {"version": version, "state": "loading", "status": "/api/models"}
+
+
+@app.post("/api/models/activate", status_code=202)
+async def activate_model(body: ModelActivate):
+    return _start_model_load(registry.activate, body.version)
+
+
+@app.post("/api/models/shadow", status_code=202)
+async def shadow_model(body: ModelShadow):
+    if body.version is None:
+        registry.set_shadow(None)
+        return {"shadow": None}
+    return _start_model_load(registry.set_shadow, body.version, body.fraction)
+
+
+@app.get("/api/shedding")
+async def shedding_status():
+    return {**shedder.status(), "deferred_writes": deferred.status()}
+
+
+@app.get("/api/analytics/query")
+async def analytics_query(query: str = "fraud_rate", by: str = "city",
+                          since: Optional[str] = None, until: Optional[str] = None,
+                          where: Optional[str] = None, limit: int = 1000):
+    """
+    e.g. ?query=fraud_rate&by=city,merchant,hour&since=2025-01-01&where=action:BLOCK
+    Answered from the DuckDB mirror, never from SQLite.
+    """
+    if not mirror.enabled:
+        raise HTTPException(503, "analytics mirror disabled (pip install duckdb)")
+    dims = [d.strip() for d in by.split(",") if d.strip()]
+    try:
+        return await mirror.query(query, dims, since, until, where, limit)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
+@app.get("/api/analytics/status")
+async def analytics_status():
+    return await mirror.status()
+
+
+@app.get("/api/alerts")
+async def alerts_status():
+    return alerts.status()
+
+
+@app.get("/api/rules")
+async def rules_status():
+    return rules.status()
+
+
+@app.post("/api/rules/reload")
+async def rules_reload():
+    """Edits are picked up within ARGUS_RULES_CHECK_S anyway; this reports errors."""
+    try:
+        rules.reload()
+    except RuleError as e:
+        raise HTTPException(400, str(e))
+    return rules.status()
+
+
+def _snapshot_response(request: Request, snap) -> Response:
+    headers = {"ETag": snap.etag, "Cache-Control": "no-cache"}
+    if snap.matches(request.headers.get("if-none-match")):
+        snapshots.outcomes["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(snap.body, media_type="application/json", headers=headers)
+
+
 @app.get("/api/transactions")
-async def recent_transactions(limit: int = 50):
-    return {"transactions": get_recent_transactions(limit)}
+async def recent_transactions(request: Request, limit: int = Query(50, ge=1)):
+    """Served from memory (backend/recent.py) unless deeper than it holds."""
+    generation = (recent.generation, write_generation())
+    if limit <= len(recent):
+        snap = await snapshots.get(
+            ("transactions", limit),
+            lambda: {"transactions": [audit_row(d) for d in recent.latest(limit)]},
+            generation, offload=False)
+    else:
+        snap = await snapshots.get(
+            ("transactions", limit),
+            lambda: {"transactions": get_recent_transactions(limit)}, generation)
+    return _snapshot_response(request, snap)
+
+
+def _label_recent(transaction_id: str, label: int, source: str):
+    decision = recent.find(transaction_id)
+    if decision is not None:
+        decision.update(label=label, label_source=source,
+                        labelled_at=datetime.utcnow().isoformat())
+
+
+@app.post("/api/transactions/{transaction_id}/label")
+async def label_transaction(transaction_id: str, body: TransactionLabel):
+    if body.label not in (0, 1):
+        raise HTTPException(400, "label must be 0 (legitimate) or 1 (fraud)")
+    if not await db.write(set_label, transaction_id, body.label, body.source):
+        raise HTTPException(404, f"unknown transaction {transaction_id}")
+    _label_recent(transaction_id, body.label, body.source)
+    return {"transaction_id": transaction_id, "label": body.label,
+            "source": body.source}
 
 
 @app.get("/api/stats")
-async def system_stats():
-    stats = get_stats()
-    trend = get_risk_trend(hours=24)
-    return {"stats": stats, "trend": trend}
+async def system_stats(request: Request):
+    snap = await snapshots.get(
+        "stats",
+        lambda: {"stats": get_stats(), "trend": get_risk_trend(hours=24)},
+        write_generation())
+    return _snapshot_response(request, snap)
 
 
 @app.get("/api/user/{user_id}")
-async def user_profile(user_id: int):
-    profile = get_user_profile(user_id)
-    return {"user_id": user_id, "profile": profile}
+async def user_profile(request: Request, user_id: int):
+    snap = await snapshots.get(
+        ("user", user_id),
+        lambda: {"user_id": user_id, "profile": get_user_profile(user_id)},
+        write_generation())
+    return _snapshot_response(request, snap)
 
 
 @app.post("/api/otp/verify")
 async def verify_otp_endpoint(body: OTPVerify):
     ok = verify_otp(body.transaction_id, body.otp)
+    if ok:
+        # The cardholder confirmed it — ground truth for ml/refresh.py
+        await db.write(set_label, body.transaction_id, 0, "otp_verified")
+        _label_recent(body.transaction_id, 0, "otp_verified")
     return {
         "verified": ok,
         "message":  "Transaction approved ✅" if ok
@@ -202,31 +654,73 @@ async def verify_otp_endpoint(body: OTPVerify):
 
 @app.post("/api/stream/control")
 async def control_stream(body: StreamControl):
-    global _streaming, _stream_task
-    if body.action == "start" and not _streaming:
-        _streaming   = True
-        _stream_task = asyncio.create_task(_auto_stream(body.interval))
-        return {"status": "stream started", "interval": body.interval}
+    if body.action == "start":
+        rate = body.rate if body.rate else 1.0 / max(body.interval, 1e-3)
+        if body.profile not in PROFILES:
+            raise HTTPException(400, f"unknown profile {body.profile!r}")
+        profile = build_profile(body.profile, rate, body.peak_rate,
+                                body.burst_every, body.burst_duration,
+                                body.ramp_secs, body.period)
+        stream.start(profile, body.concurrency, body.max_pending, body.poisson)
+        return {"status": "stream started", "interval": 1.0 / rate,
+                **stream.status()}
     elif body.action == "stop":
-        _streaming = False
-        if _stream_task:
-            _stream_task.cancel()
+        stream.stop()
         return {"status": "stream stopped"}
     return {"status": "no change"}
 
 
+@app.get("/api/stream/status")
+async def stream_status():
+    return stream.status()
+
+
+def _capture_path(name: str) -> str:
+    os.makedirs(CAPTURE_DIR, exist_ok=True)
+    return os.path.join(CAPTURE_DIR, os.path.basename(name))
+
+
+@app.post("/api/capture/control")
+async def control_capture(body: CaptureControl):
+    global _capture
+    if body.action == "start":
+        if _capture is not None:
+            _capture.close()
+        _capture = CaptureWriter(_capture_path(body.name), source="live")
+        return {"status": "recording", "path": _capture.path}
+    elif body.action == "stop" and _capture is not None:
+        writer, _capture = _capture, None
+        writer.close()
+        return {"status": "recording stopped", "path": writer.path,
+                "records": writer.count, "issues": dict(writer.issues)}
+    return {"status": "no change"}
+
+
+@app.post("/api/capture/replay")
+async def replay_capture(body: CaptureReplay):
+    path = _capture_path(body.name)
+    if not os.path.exists(path):
+        raise HTTPException(404, f"capture {body.name!r} not found")
+    return await replay(path, process_and_broadcast, body.speed, body.limit)
+
+
 # ─── WebSocket endpoint ───────────────────────────────────────────────────────
 @app.websocket("/ws/stream")
-async def websocket_stream(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_stream(websocket: WebSocket, encoding: str = "json"):
+    if encoding not in FORMATS:
+        await websocket.close(code=1003)          # unsupported data
+        return
+    await manager.connect(websocket, encoding)
     try:
         while True:
-            # Keep alive / receive control messages
-            data = await websocket.receive_text()
-            msg  = json.loads(data)
-            if msg.get("action") == "ping":
-                await websocket.send_json({"action": "pong"})
-    except WebSocketDisconnect:
+            # Keep alive / receive control messages (text JSON or msgpack)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            msg = decode(message.get("text") or message.get("bytes"))
+            if isinstance(msg, dict) and msg.get("action") == "ping":
+                await manager.send(websocket, {"action": "pong"})
+    finally:
         manager.disconnect(websocket)
 
 
@@ -234,17 +728,29 @@ async def websocket_stream(websocket: WebSocket):
 @app.on_event("startup")
 async def startup():
     print("🚀 ArgusAI API starting up...")
+    # Load and warm the models before traffic, so no request pays for it
+    await asyncio.get_running_loop().run_in_executor(None, registry.warm_start)
+    shedder.start()
+    deferred.start()
+    mirror.start()
+    alerts.start(send_digest_alert)
+    # Dashboard history survives restarts
+    rows = await db.read(get_recent_transactions, recent.capacity)
+    recent.warm([decision_from_row(r) for r in rows])
     # Auto-start streaming on launch
-    global _streaming, _stream_task
-    _streaming   = True
-    _stream_task = asyncio.create_task(_auto_stream(3.0))
+    stream.start(build_profile("constant", rate=1 / 3.0))
     print("✅ Live transaction stream started (every 3s)")
 
 
 @app.on_event("shutdown")
 async def shutdown():
-    global _streaming
-    _streaming = False
+    stream.stop()
+    shedder.stop()
+    mirror.stop()
+    await deferred.flush()
+    await alerts.stop()
+    if _capture is not None:
+        _capture.close()
     print("👋 ArgusAI shutting down")
 
 
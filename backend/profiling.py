@@ -0,0 +1,154 @@
+"""
+ArgusAI — Profiling
+Opt-in tools for explaining individual slow requests.
+
+  SlowRequestLog   → bounded in-memory ring of scoring requests slower
+                     than a threshold, each with its per-stage breakdown and
+                     the transaction payload (one per item for a batch)
+  SlowRequestMiddleware → pure ASGI middleware feeding it; a plain
+                     pass-through while capture is off
+  sample_profile() → statistical sampling profiler over every thread of the
+                     live process; returns collapsed stacks ("a;b;c 42"),
+                     ready for flamegraph.pl / speedscope
+
+Both are toggled at runtime (POST /api/debug/profiling) — no restart needed.
+Start enabled with ARGUS_PROFILING=1; threshold via ARGUS_SLOW_MS.
+"""
+
+import os, sys, time, threading, contextvars
+from collections import deque, Counter
+from datetime    import datetime
+
+# Per-request scratch dict the middleware installs; process_and_broadcast
+# appends {"timings": ..., "txn": ..., "action": ...} to its "items" list,
+# once per scored transaction (several for a batch).
+request_context: contextvars.ContextVar = contextvars.ContextVar(
+    "argus_request_context", default=None)
+
+
+# ─── Slow request capture ─────────────────────────────────────────────────────
+class SlowRequestLog:
+    def __init__(self, enabled: bool = False, threshold_ms: float = 250.0,
+                 capacity: int = 200):
+        self.enabled      = enabled
+        self.threshold_ms = threshold_ms
+        self.seen         = 0
+        self.captured     = 0
+        self._ring        = deque(maxlen=capacity)
+
+    def configure(self, enabled: bool = None, threshold_ms: float = None,
+                  capacity: int = None):
+        if enabled is not None:
+            self.enabled = enabled
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+        if capacity is not None and capacity != self._ring.maxlen:
+            self._ring = deque(self._ring, maxlen=max(capacity, 1))
+
+    def record(self, path: str, latency_ms: float, ctx: dict):
+        self.seen += 1
+        if latency_ms < self.threshold_ms:
+            return
+        self.captured += 1
+        items = [self._item(item) for item in (ctx or {}).get("items", [])]
+        entry = {
+            "at":          datetime.utcnow().isoformat(),
+            "path":        path,
+            "latency_ms":  round(latency_ms, 3),
+        }
+        if len(items) == 1:
+            entry.update(items[0])
+        else:
+            entry["items"] = items
+        self._ring.append(entry)
+
+    @staticmethod
+    def _item(item: dict) -> dict:
+        return {
+            "stages_ms":   {k: round(v * 1000, 3) for k, v in item["timings"].items()},
+            "action":      item.get("action"),
+            "transaction": item.get("txn"),
+        }
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled":      self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "capacity":     self._ring.maxlen,
+            "seen":         self.seen,
+            "captured":     self.captured,
+            "requests":     list(reversed(self._ring)),   # newest first
+        }
+
+
+slow_log = SlowRequestLog(
+    enabled      = os.getenv("ARGUS_PROFILING", "0") == "1",
+    threshold_ms = float(os.getenv("ARGUS_SLOW_MS", "250")),
+)
+
+
+class SlowRequestMiddleware:
+    """
+    Times POSTs to `paths` into `log` while it is enabled. Pure ASGI, so
+    requests pass straight through (no BaseHTTPMiddleware wrapping) when
+    capture is off; checked per request, as it is toggled at runtime.
+    """
+
+    def __init__(self, app, paths, log: SlowRequestLog = slow_log):
+        self.app   = app
+        self.paths = frozenset(paths)
+        self.log   = log
+
+    async def __call__(self, scope, receive, send):
+        if (not self.log.enabled or scope["type"] != "http"
+                or scope["method"] != "POST" or scope["path"] not in self.paths):
+            return await self.app(scope, receive, send)
+        ctx   = {"items": []}
+        token = request_context.set(ctx)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_context.reset(token)
+            self.log.record(scope["path"], (time.perf_counter() - started) * 1000, ctx)
+
+
+# ─── Sampling profiler ────────────────────────────────────────────────────────
+_profile_lock = threading.Lock()
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def sample_profile(seconds: float = 10.0, hz: float = 100.0,
+                   max_depth: int = 64) -> str:
+    """
+    Sample the stack of every other thread `hz` times a second for `seconds`
+    and return collapsed stacks, root first, one "stack count" per line.
+    Blocking — call from a worker thread. Raises RuntimeError if a profile
+    is already running.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("a profile is already running")
+    try:
+        me       = threading.get_ident()
+        names    = {t.ident: t.name for t in threading.enumerate()}
+        stacks   = Counter()
+        interval = 1.0 / hz
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                parts = []
+                while frame is not None and len(parts) < max_depth:
+                    parts.append(_frame_name(frame))
+                    frame = frame.f_back
+                parts.append(names.get(tid, f"thread-{tid}"))
+                stacks[";".join(reversed(parts))] += 1
+            time.sleep(interval)
+        return "".join(f"{stack} {n}\n" for stack, n in stacks.most_common())
+    finally:
+        _profile_lock.release()
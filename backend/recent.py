@@ -0,0 +1,60 @@
+"""
+ArgusAI — Recent Decisions
+Fixed-capacity ring buffer of the latest broadcast decisions
+({**txn, **result, processed_at}), filled on the scoring path.
+
+It serves the dashboard's recent history without a database query:
+GET /api/transactions for limits within capacity, and the backlog a new
+WebSocket subscriber receives on connect. Deeper history still comes from
+SQLite. At startup the buffer is warmed from the audit log, so a restart
+does not empty the dashboard.
+
+Appends are a list store and an index bump, made from the event loop only.
+
+Config: ARGUS_RECENT_CAPACITY (default 1000).
+"""
+
+import os
+
+CAPACITY = int(os.getenv("ARGUS_RECENT_CAPACITY", "1000"))
+
+
+class RecentDecisions:
+    def __init__(self, capacity: int = CAPACITY):
+        self.capacity = capacity
+        self._slots   = [None] * capacity
+        self._count   = 0               # appended since start (next slot = count % capacity)
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def generation(self) -> int:
+        """Decisions appended since start; changes on every append."""
+        return self._count
+
+    def append(self, decision: dict):
+        self._slots[self._count % self.capacity] = decision
+        self._count += 1
+
+    def latest(self, n: int) -> list[dict]:
+        """Up to `n` decisions, newest first."""
+        n    = min(max(n, 0), len(self))
+        head = self._count % self.capacity
+        out  = self._slots[head - 1::-1] if head else []
+        if len(out) < n:                       # wrapped: continue from the end
+            out += self._slots[:head - 1:-1] if head else self._slots[::-1]
+        return out[:n]
+
+    def find(self, transaction_id: str):
+        for decision in self.latest(len(self)):
+            if decision.get("transaction_id") == transaction_id:
+                return decision
+        return None
+
+    def warm(self, decisions_newest_first: list[dict]):
+        for decision in reversed(decisions_newest_first[:self.capacity]):
+            self.append(decision)
+
+
+recent = RecentDecisions()
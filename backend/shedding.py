@@ -0,0 +1,241 @@
+"""
+ArgusAI — Load Shedding
+Keeps scoring latency inside a per-request budget by degrading work under
+load instead of queueing without bound.
+
+Each transaction is admitted at a tier:
+
+  0  full scoring                      XGBoost + AE + SHAP, inline DB/alerts
+  1  skip SHAP                         DB write and alerts deferred
+  2  skip SHAP, AE only when it can    (cascade bounds, see ml/predict.py)
+     change the action
+  3  rules + XGBoost only              AE never runs
+
+The tier is the lowest one whose predicted completion time fits the budget:
+
+  backlog + (in-flight + 1) × service time of that tier
+
+Scoring runs on the event loop, so requests queue as ready callbacks the
+app cannot count. The backlog is therefore read off the loop itself: a
+ticker task sleeps in short intervals, and how overdue its wake-up is
+right now (or its smoothed lag, or the recent in-request queueing delay,
+whichever is largest) is how long a new request has already waited.
+Service times are EWMAs of the scoring stages (SCORING_STAGES, not DB or
+alert awaits) learned per tier from completed requests, so the prediction
+tracks the real machine; while a tier is skipped its estimate decays back
+to the default, so it gets re-probed.
+
+Deferred DB writes go through a bounded queue drained in batches on the
+DB write lane; when the queue is full the request awaits its own write.
+A failed batch is retried a few times and then written row by row; a row
+that still fails is logged and counted (`dropped`) instead of blocking
+every write after it. Shutdown drains the queue, batch in progress
+included.
+
+Config: ARGUS_LATENCY_BUDGET_MS (default 500), ARGUS_SHEDDING=0 disables.
+"""
+
+import os, asyncio
+from collections import Counter
+from time import perf_counter
+
+TIERS = ("full", "no_shap", "ae_when_needed", "rules_xgb")
+
+# Seconds; replaced by measurements as soon as requests complete
+DEFAULT_SERVICE = (0.120, 0.110, 0.015, 0.005)
+
+# Timings (ml/predict.py) that make up a tier's service time
+SCORING_STAGES = ("features", "scaler", "xgb", "rules", "ae", "fuse", "shap")
+
+
+class LoadShedder:
+    def __init__(self, budget_ms: float = 500.0, enabled: bool = True,
+                 alpha: float = 0.2, decay: float = 0.02):
+        self.budget    = budget_ms / 1000
+        self.enabled   = enabled
+        self.alpha     = alpha
+        self.decay     = decay
+        self.inflight  = 0
+        self.service   = list(DEFAULT_SERVICE)
+        self.loop_lag  = 0.0
+        self.wait      = 0.0                # recent queueing delay (s)
+        self.admitted  = Counter()          # tier → count
+        self.over_budget = 0
+        self._ticker   = None
+        self._tick_due = None               # when the ticker should next wake
+
+    # ── Admission ─────────────────────────────────────────────────────────────
+    def backlog(self) -> float:
+        overdue = perf_counter() - self._tick_due if self._tick_due else 0.0
+        return max(overdue, self.loop_lag, self.wait)
+
+    def predicted(self, tier: int) -> float:
+        return self.backlog() + (self.inflight + 1) * self.service[tier]
+
+    def admit(self) -> int:
+        """Pick a tier for a new request and count it in flight."""
+        tier = self.current_tier()
+        self.inflight += 1
+        self.admitted[tier] += 1
+        return tier
+
+    def done(self, tier: int, service_s: float, total_s: float):
+        """
+        Record a finished request: its scoring time (None if scoring failed)
+        and its end-to-end latency.
+
+        A tier's estimate only moves when that tier runs, so one slow request
+        could keep a fuller tier out for good. Each degraded completion
+        therefore decays the fuller tiers' estimates back toward their
+        defaults, until one is admitted again and re-measured.
+        """
+        self.inflight -= 1
+        if service_s is not None:
+            self.service[tier] += self.alpha * (service_s - self.service[tier])
+            self.wait          += self.alpha * (max(total_s - service_s, 0.0) - self.wait)
+        for lower in range(tier):
+            if self.service[lower] > DEFAULT_SERVICE[lower]:
+                self.service[lower] += self.decay * (DEFAULT_SERVICE[lower] - self.service[lower])
+        if total_s > self.budget:
+            self.over_budget += 1
+
+    def current_tier(self) -> int:
+        """Tier the next request would get (no side effects)."""
+        tier = 0
+        if self.enabled:
+            while tier < len(TIERS) - 1 and self.predicted(tier) > self.budget:
+                tier += 1
+        return tier
+
+    # ── Event-loop lag ────────────────────────────────────────────────────────
+    def start(self, interval: float = 0.05):
+        if self._ticker is None or self._ticker.done():
+            self._ticker = asyncio.create_task(self._tick(interval))
+
+    def stop(self):
+        if self._ticker is not None:
+            self._ticker.cancel()
+            self._ticker   = None
+            self._tick_due = None
+
+    async def _tick(self, interval: float):
+        while True:
+            self._tick_due = perf_counter() + interval
+            await asyncio.sleep(interval)
+            lag = max(perf_counter() - self._tick_due, 0.0)
+            self.loop_lag += self.alpha * (lag - self.loop_lag)
+
+    def status(self) -> dict:
+        return {
+            "enabled":        self.enabled,
+            "budget_ms":      round(self.budget * 1000, 1),
+            "inflight":       self.inflight,
+            "loop_lag_ms":    round(self.loop_lag * 1000, 2),
+            "backlog_ms":     round(self.backlog() * 1000, 2),
+            "wait_ms":        round(self.wait * 1000, 2),
+            "tier":           TIERS[self.current_tier()],
+            "service_ms":     {name: round(s * 1000, 2)
+                               for name, s in zip(TIERS, self.service)},
+            "admitted":       {TIERS[t]: n for t, n in sorted(self.admitted.items())},
+            "over_budget":    self.over_budget,
+        }
+
+
+# ─── Deferred side effects ────────────────────────────────────────────────────
+class DeferredWriter:
+    """
+    Bounded queue of (txn, result) audit rows, written in batches by the
+    coroutine function `write_batch` (the DB write lane). put() writes
+    directly, without queueing, when the queue is full. A failed batch is
+    retried `retries` times, then written row by row so one bad row cannot
+    hold up the rest; rows that still fail are logged and counted as dropped.
+    Once flush() has begun, put() writes inline, so nothing queues behind
+    the shutdown drain.
+    """
+
+    _STOP = object()                      # queued by flush(): drain and exit
+
+    def __init__(self, write_batch, maxsize: int = 10_000, batch: int = 256,
+                 retries: int = 3, retry_delay: float = 1.0):
+        self.write_batch = write_batch
+        self.batch       = batch
+        self.retries     = retries
+        self.retry_delay = retry_delay
+        self.queue       = None           # created on the running loop
+        self.maxsize     = maxsize
+        self.written     = 0
+        self.inline      = 0
+        self.dropped     = 0
+        self.closing     = False          # set by flush(): no more queueing
+        self._task       = None
+
+    def start(self):
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.maxsize)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+
+    async def put(self, txn: dict, result: dict):
+        if self.closing:
+            await self._write([(txn, result)])
+            self.inline += 1
+            return
+        if self.queue is None:
+            self.start()
+        try:
+            self.queue.put_nowait((txn, result))
+        except asyncio.QueueFull:
+            await self.write_batch([(txn, result)])
+            self.inline += 1
+
+    async def _drain(self):
+        stop = False
+        while not (stop and self.queue.empty()):
+            # After the sentinel, only what is already queued is taken
+            items = [] if stop else [await self.queue.get()]
+            while len(items) < self.batch and not self.queue.empty():
+                items.append(self.queue.get_nowait())
+            rows = [item for item in items if item is not self._STOP]
+            stop = stop or len(rows) < len(items)
+            if rows:
+                await self._write(rows)
+
+    async def _write(self, rows: list):
+        for attempt in range(self.retries):
+            try:
+                await self.write_batch(rows)
+                self.written += len(rows)
+                return
+            except Exception as e:
+                print(f"[Deferred write error] {e} — retry {attempt + 1}/{self.retries}"
+                      f" for {len(rows)} rows")
+                await asyncio.sleep(self.retry_delay)
+        # Isolate the failing rows rather than blocking every later write
+        for row in rows:
+            try:
+                await self.write_batch([row])
+                self.written += 1
+            except Exception as e:
+                self.dropped += 1
+                print(f"[Deferred write dropped] {row[0].get('transaction_id')}: {e}")
+
+    async def flush(self):
+        """Write everything still queued, including a batch in progress (shutdown)."""
+        self.closing = True
+        if self.queue is None:
+            return
+        self.start()
+        await self.queue.put(self._STOP)
+        await self._task
+        self._task = None
+
+    def status(self) -> dict:
+        return {"queued": self.queue.qsize() if self.queue else 0,
+                "written": self.written, "inline": self.inline,
+                "dropped": self.dropped}
+
+
+shedder = LoadShedder(
+    budget_ms = float(os.getenv("ARGUS_LATENCY_BUDGET_MS", "500")),
+    enabled   = os.getenv("ARGUS_SHEDDING", "1") == "1",
+)
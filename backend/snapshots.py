@@ -0,0 +1,95 @@
+"""
+ArgusAI — Read Snapshots
+Shared, pre-encoded responses for the dashboard's polling endpoints
+(/api/stats, /api/transactions, /api/user/{id}).
+
+  single flight  concurrent callers for the same key await one computation
+                 (on the DB read lane) instead of each querying SQLite
+  freshness      a snapshot is reused while no write has happened since it
+                 was computed (up to IDLE_TTL, for time-windowed queries),
+                 and for MAX_AGE seconds after writes resume
+  ETag           the JSON body is encoded once per snapshot; a poll whose
+                 If-None-Match matches gets 304 and no body
+
+Config: ARGUS_SNAPSHOT_MAX_AGE (seconds, default 2).
+"""
+
+import os, asyncio, hashlib
+from collections import OrderedDict, Counter
+from time import perf_counter
+
+from backend.async_db import db
+from backend.encoding import dumps
+
+MAX_AGE  = float(os.getenv("ARGUS_SNAPSHOT_MAX_AGE", "2"))
+IDLE_TTL = 60.0
+
+
+class Snapshot:
+    __slots__ = ("body", "etag", "generation", "at")
+
+    def __init__(self, value, generation):
+        self.body       = dumps(value)
+        self.etag       = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+        self.generation = generation
+        self.at         = perf_counter()
+
+    def matches(self, if_none_match: str) -> bool:
+        if not if_none_match:
+            return False
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
+
+
+class SnapshotCache:
+    def __init__(self, max_age: float = MAX_AGE, max_entries: int = 1024):
+        self.max_age     = max_age
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight   = {}                      # key → Future[Snapshot]
+        self.outcomes    = Counter()               # fresh / shared / computed / not_modified
+
+    def _fresh(self, snap: Snapshot, generation) -> bool:
+        age = perf_counter() - snap.at
+        return age < self.max_age or (snap.generation == generation and age < IDLE_TTL)
+
+    async def get(self, key, compute, generation, offload: bool = True) -> Snapshot:
+        """
+        Snapshot for `key`, recomputed with `compute()` when stale.
+        `generation` is any value that changes when the underlying data does.
+        """
+        snap = self._entries.get(key)
+        if snap is not None and self._fresh(snap, generation):
+            self._entries.move_to_end(key)
+            self.outcomes["fresh"] += 1
+            return snap
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.outcomes["shared"] += 1
+            return await asyncio.shield(pending)
+
+        loop   = asyncio.get_running_loop()
+        future = self._inflight[key] = loop.create_future()
+        try:
+            name  = key[0] if isinstance(key, tuple) else key
+            value = await db.read(compute, name=f"snapshot_{name}") if offload else compute()
+            snap  = Snapshot(value, generation)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()                 # retrieved: waiters re-raise it
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(snap)
+        self._entries[key] = snap
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.outcomes["computed"] += 1
+        return snap
+
+
+snapshots = SnapshotCache()
@@ -0,0 +1,281 @@
+"""
+ArgusAI — Stream Controller
+Open-loop, rate-controlled driver for the built-in transaction simulator.
+
+Arrivals are scheduled from a target-rate profile and are never held back
+by slow scoring: each transaction is fired at its due time, and the
+controller reports how far the pipeline falls behind (lag) and the rate it
+actually achieves. This turns the demo stream into a soak-test harness.
+
+Profiles:
+  constant  → fixed rate (tx/s)
+  burst     → base rate with periodic bursts at `peak_rate`
+  ramp      → linear ramp from `rate` to `peak_rate` over `ramp_secs`
+  diurnal   → sinusoidal day/night cycle between `rate` and `peak_rate`
+"""
+
+import asyncio, math, random
+from collections import deque
+
+
+# ─── Load profiles ────────────────────────────────────────────────────────────
+class LoadProfile:
+    """Target arrival rate (tx/s) as a function of seconds since start."""
+    name = "constant"
+
+    def __init__(self, rate: float):
+        self.rate = max(float(rate), 1e-3)
+
+    def rate_at(self, t: float) -> float:
+        return self.rate
+
+    def describe(self) -> dict:
+        return {"profile": self.name, "rate": self.rate}
+
+
+class BurstProfile(LoadProfile):
+    name = "burst"
+
+    def __init__(self, rate: float, peak_rate: float,
+                 burst_every: float = 60.0, burst_duration: float = 10.0):
+        super().__init__(rate)
+        self.peak_rate      = max(float(peak_rate), 1e-3)
+        self.burst_every    = max(float(burst_every), 1e-3)
+        self.burst_duration = min(float(burst_duration), self.burst_every)
+
+    def rate_at(self, t: float) -> float:
+        in_burst = (t % self.burst_every) < self.burst_duration
+        return self.peak_rate if in_burst else self.rate
+
+    def describe(self) -> dict:
+        return {**super().describe(), "peak_rate": self.peak_rate,
+                "burst_every": self.burst_every,
+                "burst_duration": self.burst_duration}
+
+
+class RampProfile(LoadProfile):
+    name = "ramp"
+
+    def __init__(self, rate: float, peak_rate: float, ramp_secs: float = 300.0):
+        super().__init__(rate)
+        self.peak_rate = max(float(peak_rate), 1e-3)
+        self.ramp_secs = max(float(ramp_secs), 1e-3)
+
+    def rate_at(self, t: float) -> float:
+        frac = min(t / self.ramp_secs, 1.0)
+        return self.rate + (self.peak_rate - self.rate) * frac
+
+    def describe(self) -> dict:
+        return {**super().describe(), "peak_rate": self.peak_rate,
+                "ramp_secs": self.ramp_secs}
+
+
+class DiurnalProfile(LoadProfile):
+    """One full day/night cycle every `period` seconds (compressed day)."""
+    name = "diurnal"
+
+    def __init__(self, rate: float, peak_rate: float, period: float = 600.0):
+        super().__init__(rate)
+        self.peak_rate = max(float(peak_rate), 1e-3)
+        self.period    = max(float(period), 1e-3)
+
+    def rate_at(self, t: float) -> float:
+        # Trough at t=0 (midnight), peak at period/2 (midday)
+        phase = (1 - math.cos(2 * math.pi * t / self.period)) / 2
+        return self.rate + (self.peak_rate - self.rate) * phase
+
+    def describe(self) -> dict:
+        return {**super().describe(), "peak_rate": self.peak_rate,
+                "period": self.period}
+
+
+PROFILES = {
+    "constant": LoadProfile,
+    "burst":    BurstProfile,
+    "ramp":     RampProfile,
+    "diurnal":  DiurnalProfile,
+}
+
+
+def build_profile(name: str, rate: float, peak_rate: float = None,
+                  burst_every: float = 60.0, burst_duration: float = 10.0,
+                  ramp_secs: float = 300.0, period: float = 600.0) -> LoadProfile:
+    """Build a profile by name. `peak_rate` defaults to 5× the base rate."""
+    peak = peak_rate if peak_rate is not None else rate * 5
+    if name == "constant":
+        return LoadProfile(rate)
+    if name == "burst":
+        return BurstProfile(rate, peak, burst_every, burst_duration)
+    if name == "ramp":
+        return RampProfile(rate, peak, ramp_secs)
+    if name == "diurnal":
+        return DiurnalProfile(rate, peak, period)
+    raise ValueError(f"unknown load profile {name!r} "
+                     f"(expected one of {sorted(PROFILES)})")
+
+
+# ─── Controller ───────────────────────────────────────────────────────────────
+class StreamController:
+    """
+    Fires `handler(generator())` on an open-loop schedule.
+
+    The scheduler only ever sleeps until the next due time; each arrival runs
+    as its own task, bounded by `concurrency` in-flight handlers. Arrivals that
+    would push the backlog past `max_pending` are dropped and counted, so a
+    saturated pipeline shows up as lag and drops instead of a silently lower
+    rate.
+
+    stop() (and a restart) cancels the arrivals still waiting for a handler
+    slot. Handlers already running finish, but belong to the old run: they
+    no longer touch the counters, which start from zero for the next run.
+    """
+
+    WINDOW_SECS = 10.0
+
+    def __init__(self, handler, generator):
+        self.handler   = handler
+        self.generator = generator
+        self.profile: LoadProfile = None
+        self._task     = None
+        self._run_id   = 0
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.concurrency  = 1
+        self.max_pending  = 1000
+        self.poisson      = False
+        self.started_at   = None
+        self.stopped_at   = None
+        self.scheduled    = 0
+        self.completed    = 0
+        self.errors       = 0
+        self.dropped      = 0
+        self.pending      = 0
+        self.in_flight    = 0
+        self.sched_lag    = 0.0     # scheduler behind its own timetable (s)
+        self.max_lag      = 0.0     # worst due → start delay seen (s)
+        self._lag_ewma    = 0.0
+        self._lat_ewma    = 0.0
+        self._done_times  = deque()
+        self._sem         = None
+        self._fired       = set()   # strong refs so fired tasks aren't GC'd
+        self._waiting     = set()   # fired, not yet holding a handler slot
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, profile: LoadProfile, concurrency: int = 1,
+              max_pending: int = 1000, poisson: bool = False):
+        self.stop()
+        self._reset_counters()
+        self.profile     = profile
+        self.concurrency = max(int(concurrency), 1)
+        self.max_pending = max(int(max_pending), self.concurrency)
+        self.poisson     = poisson
+        self._sem        = asyncio.Semaphore(self.concurrency)
+        self._task       = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self.stopped_at = self._task.get_loop().time()
+            self._task = None
+        # Queued arrivals are dropped; running handlers finish off the books
+        self._run_id += 1
+        for task in self._waiting:
+            task.cancel()
+        self._waiting.clear()
+
+    # ── Scheduling ────────────────────────────────────────────────────────────
+    def _next_gap(self, t: float) -> float:
+        rate = self.profile.rate_at(t)
+        return random.expovariate(rate) if self.poisson else 1.0 / rate
+
+    async def _run(self):
+        loop  = asyncio.get_running_loop()
+        start = self.started_at = loop.time()
+        due   = start
+        while True:
+            now = loop.time()
+            if due > now:
+                await asyncio.sleep(due - now)
+                now = loop.time()
+            self.sched_lag = max(now - due, 0.0)
+
+            self.scheduled += 1
+            if self.pending >= self.max_pending:
+                self.dropped += 1
+            else:
+                self.pending += 1
+                task = asyncio.create_task(self._fire(due, self._run_id))
+                self._fired.add(task)
+                self._waiting.add(task)
+                task.add_done_callback(self._fired.discard)
+            due += self._next_gap(due - start)
+
+    async def _fire(self, due: float, run_id: int):
+        loop = asyncio.get_running_loop()
+        current = lambda: run_id == self._run_id
+        try:
+            async with self._sem:
+                self._waiting.discard(asyncio.current_task())
+                if not current():
+                    return
+                began = loop.time()
+                lag   = began - due
+                self._lag_ewma = 0.9 * self._lag_ewma + 0.1 * lag
+                self.max_lag   = max(self.max_lag, lag)
+                self.in_flight += 1
+                try:
+                    await self.handler(self.generator())
+                    if current():
+                        self.completed += 1
+                except Exception as e:
+                    if current():
+                        self.errors += 1
+                    print(f"[Stream error] {e}")
+                finally:
+                    if current():
+                        self.in_flight -= 1
+                if current():
+                    done = loop.time()
+                    self._lat_ewma = 0.9 * self._lat_ewma + 0.1 * (done - began)
+                    self._done_times.append(done)
+        finally:
+            if current():
+                self.pending -= 1
+
+    # ── Reporting ─────────────────────────────────────────────────────────────
+    def _achieved_rate(self, now: float) -> float:
+        window = self._done_times
+        while window and window[0] < now - self.WINDOW_SECS:
+            window.popleft()
+        span = min(self.WINDOW_SECS, now - self.started_at) if self.started_at else 0
+        return len(window) / span if span > 0 else 0.0
+
+    def status(self) -> dict:
+        if self.profile is None:
+            return {"running": False}
+        now     = self.stopped_at if not self.running and self.stopped_at \
+                  else asyncio.get_running_loop().time()
+        elapsed = now - self.started_at if self.started_at else 0.0
+        return {
+            "running":         self.running,
+            **self.profile.describe(),
+            "concurrency":     self.concurrency,
+            "poisson":         self.poisson,
+            "elapsed_s":       round(elapsed, 2),
+            "target_rate":     round(self.profile.rate_at(elapsed), 3),
+            "achieved_rate":   round(self._achieved_rate(now), 3),
+            "scheduled":       self.scheduled,
+            "completed":       self.completed,
+            "errors":          self.errors,
+            "dropped":         self.dropped,
+            "pending":         self.pending,
+            "in_flight":       self.in_flight,
+            "scheduler_lag_ms": round(self.sched_lag * 1000, 2),
+            "avg_lag_ms":      round(self._lag_ewma * 1000, 2),
+            "max_lag_ms":      round(self.max_lag * 1000, 2),
+            "avg_latency_ms":  round(self._lat_ewma * 1000, 2),
+        }
@@ -2,12 +2,16 @@
 ArgusAI — Live Transaction Stream Simulator
 Generates realistic UPI/Card transactions every few seconds.
 Simulates a real payment network feeding into the fraud engine.
+Seedable (TransactionGenerator / ARGUS_STREAM_SEED) for reproducible runs.
 """
 
-import random, asyncio
-from datetime import datetime
+import os, random, asyncio
+from datetime import datetime, timedelta
+from typing   import Optional
 import numpy as np
 
+from backend import ids
+
 # ─── Reference data (mirrors dataset generator) ───────────────────────────────
 CITIES = [
     ("Mumbai",    19.0760,  72.8777),
@@ -29,18 +33,20 @@ MERCHANT_CATS   = [
     "Fuel", "Healthcare", "Entertainment", "Utility", "Jewellery"
 ]
 
-# Fixed user pool (simulate 500 real users)
-USER_PROFILES = {}
-for uid in range(1, 501):
-    home = random.choice(CITIES)
-    USER_PROFILES[uid] = {
-        "home_city": home[0], "home_lat": home[1], "home_lon": home[2],
-        "avg_spend":    random.uniform(300, 12000),
-        "card_age_days": random.randint(30, 1825),
-        "device":       random.choice(DEVICE_TYPES),
-    }
 
-_txn_counter = 50001   # start after dataset
+# ─── User pool ────────────────────────────────────────────────────────────────
+def build_user_profiles(rng: random.Random, n_users: int = 500) -> dict:
+    """Fixed user pool (simulate `n_users` real users) drawn from `rng`."""
+    profiles = {}
+    for uid in range(1, n_users + 1):
+        home = rng.choice(CITIES)
+        profiles[uid] = {
+            "home_city": home[0], "home_lat": home[1], "home_lon": home[2],
+            "avg_spend":    rng.uniform(300, 12000),
+            "card_age_days": rng.randint(30, 1825),
+            "device":       rng.choice(DEVICE_TYPES),
+        }
+    return profiles
 
 
 def _haversine(lat1, lon1, lat2, lon2):
@@ -51,87 +57,141 @@ def _haversine(lat1, lon1, lat2, lon2):
     return R * 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
 
 
+# ─── Seedable generator ───────────────────────────────────────────────────────
+class TransactionGenerator:
+    """
+    Self-contained transaction source.
+
+    seed       → seeds the user pool and every draw; same seed = same stream
+    start      → optional simulated clock start (datetime); when given,
+                 timestamps advance by `step_secs` per transaction instead of
+                 reading the wall clock, so the stream is fully reproducible
+    IDs are snowflake IDs (backend/ids.py). Live streams share the process
+    generator with the API; a simulated clock gets its own worker-0
+    generator stamped with simulated time, so its IDs are reproducible too.
+    """
+
+    def __init__(self, seed: Optional[int] = None, n_users: int = 500,
+                 start: Optional[datetime] = None, step_secs: float = 3.0):
+        self.seed      = seed
+        self.rng       = random.Random(seed)
+        self.np_rng    = np.random.default_rng(seed)
+        self.n_users   = n_users
+        self.profiles  = build_user_profiles(self.rng, n_users)
+        self.clock     = start
+        self.step      = timedelta(seconds=step_secs)
+        self.ids       = ids._ids if start is None else ids.Snowflake(worker_id=0)
+
+    def _now(self) -> datetime:
+        if self.clock is None:
+            return datetime.now()
+        now, self.clock = self.clock, self.clock + self.step
+        return now
+
+    def generate(self, force_fraud: bool = False) -> dict:
+        """
+        Generate one realistic transaction.
+        force_fraud=True → inject a high-risk transaction (for demo button).
+        """
+        rng, np_rng = self.rng, self.np_rng
+
+        is_fraud = force_fraud or (rng.random() < 0.06)
+        uid      = rng.randint(1, self.n_users)
+        user     = self.profiles[uid]
+        now      = self._now()
+
+        # ── Amount ────────────────────────────────────────────────────────────
+        if is_fraud:
+            amount = round(rng.choice([
+                rng.uniform(50000, 180000),
+                rng.uniform(1, 9),
+            ]), 2)
+        else:
+            amount = round(float(np_rng.lognormal(
+                mean=np.log(max(user["avg_spend"], 1)), sigma=0.7)), 2)
+            amount = max(10, min(amount, 75000))
+
+        # ── Location ──────────────────────────────────────────────────────────
+        if is_fraud and rng.random() < 0.6:
+            city = rng.choice([c for c in CITIES if c[0] != user["home_city"]])
+        else:
+            city = next(c for c in CITIES if c[0] == user["home_city"])
+
+        txn_lat = city[1] + np_rng.normal(0, 0.04)
+        txn_lon = city[2] + np_rng.normal(0, 0.04)
+        distance = round(float(_haversine(user["home_lat"], user["home_lon"],
+                                          txn_lat, txn_lon)), 2)
+
+        # ── Device ────────────────────────────────────────────────────────────
+        if is_fraud and rng.random() < 0.5:
+            device = rng.choice([d for d in DEVICE_TYPES if d != user["device"]])
+        else:
+            device = user["device"]
+
+        # ── Derived features ──────────────────────────────────────────────────
+        avg_7d            = round(user["avg_spend"] * rng.uniform(0.7, 1.3), 2)
+        amount_vs_avg     = round(amount / (avg_7d + 1), 4)
+        daily_count       = rng.randint(1, 15) if is_fraud else rng.randint(1, 5)
+        pay_type          = rng.choice(["UPI","Card","Wallet"]) if is_fraud \
+                            else rng.choice(PAYMENT_TYPES)
+        merchant_cat      = rng.choice(["Jewellery","Electronics","Travel"]) \
+                            if (is_fraud and rng.random() < 0.5) \
+                            else rng.choice(MERCHANT_CATS)
+        device_mismatch   = int(device != user["device"])
+        is_night          = int(now.hour < 6 or now.hour >= 22)
+
+        return {
+            "transaction_id":        self.ids.next_txn_id(
+                                         None if self.clock is None else now),
+            "user_id":               uid,
+            "timestamp":             now.strftime("%Y-%m-%d %H:%M:%S"),
+            "amount":                amount,
+            "payment_type":          pay_type,
+            "merchant_category":     merchant_cat,
+            "transaction_city":      city[0],
+            "transaction_lat":       round(float(txn_lat), 4),
+            "transaction_lon":       round(float(txn_lon), 4),
+            "home_city":             user["home_city"],
+            "home_lat":              user["home_lat"],
+            "home_lon":              user["home_lon"],
+            "distance_from_home_km": distance,
+            "device_type":           device,
+            "user_home_device":      user["device"],
+            "device_mismatch":       device_mismatch,
+            "card_age_days":         user["card_age_days"],
+            "transaction_hour":      now.hour,
+            "transaction_day":       now.weekday(),
+            "is_weekend":            int(now.weekday() >= 5),
+            "is_night":              is_night,
+            "daily_txn_count":       daily_count,
+            "avg_amount_7d":         avg_7d,
+            "amount_vs_avg_ratio":   amount_vs_avg,
+            # meta for dashboard only (not fed to model)
+            "_simulated_fraud":      is_fraud,
+        }
+
+
+# ─── Process-wide default stream ──────────────────────────────────────────────
+# Unseeded by default; set ARGUS_STREAM_SEED for a reproducible live stream.
+_seed           = os.getenv("ARGUS_STREAM_SEED")
+_default        = TransactionGenerator(seed=int(_seed) if _seed else None)
+USER_PROFILES   = _default.profiles
+
+
+def reseed(seed: Optional[int], start: Optional[datetime] = None,
+           step_secs: float = 3.0):
+    """Replace the process-wide generator (e.g. before a benchmark run)."""
+    global _default, USER_PROFILES
+    _default      = TransactionGenerator(seed=seed, start=start, step_secs=step_secs)
+    USER_PROFILES = _default.profiles
+
+
 def generate_live_transaction(force_fraud: bool = False) -> dict:
     """
-    Generate one realistic transaction.
+    Generate one realistic transaction from the process-wide generator.
     force_fraud=True → inject a high-risk transaction (for demo button).
     """
-    global _txn_counter
-    _txn_counter += 1
-
-    is_fraud = force_fraud or (random.random() < 0.06)
-    uid      = random.randint(1, 500)
-    user     = USER_PROFILES[uid]
-    now      = datetime.now()
-
-    # ── Amount ────────────────────────────────────────────────────────────────
-    if is_fraud:
-        amount = round(random.choice([
-            random.uniform(50000, 180000),
-            random.uniform(1, 9),
-        ]), 2)
-    else:
-        amount = round(np.random.lognormal(
-            mean=np.log(max(user["avg_spend"], 1)), sigma=0.7), 2)
-        amount = max(10, min(amount, 75000))
-
-    # ── Location ──────────────────────────────────────────────────────────────
-    if is_fraud and random.random() < 0.6:
-        city = random.choice([c for c in CITIES if c[0] != user["home_city"]])
-    else:
-        city = next(c for c in CITIES if c[0] == user["home_city"])
-
-    txn_lat = city[1] + np.random.normal(0, 0.04)
-    txn_lon = city[2] + np.random.normal(0, 0.04)
-    distance = round(_haversine(user["home_lat"], user["home_lon"],
-                                txn_lat, txn_lon), 2)
-
-    # ── Device ────────────────────────────────────────────────────────────────
-    if is_fraud and random.random() < 0.5:
-        device = random.choice([d for d in DEVICE_TYPES if d != user["device"]])
-    else:
-        device = user["device"]
-
-    # ── Derived features ──────────────────────────────────────────────────────
-    avg_7d            = round(user["avg_spend"] * random.uniform(0.7, 1.3), 2)
-    amount_vs_avg     = round(amount / (avg_7d + 1), 4)
-    daily_count       = random.randint(1, 15) if is_fraud else random.randint(1, 5)
-    pay_type          = random.choice(["UPI","Card","Wallet"]) if is_fraud \
-                        else random.choice(PAYMENT_TYPES)
-    merchant_cat      = random.choice(["Jewellery","Electronics","Travel"]) \
-                        if (is_fraud and random.random() < 0.5) \
-                        else random.choice(MERCHANT_CATS)
-    device_mismatch   = int(device != user["device"])
-    is_night          = int(now.hour < 6 or now.hour >= 22)
-
-    return {
-        "transaction_id":        f"TXN{_txn_counter:06d}",
-        "user_id":               uid,
-        "timestamp":             now.strftime("%Y-%m-%d %H:%M:%S"),
-        "amount":                amount,
-        "payment_type":          pay_type,
-        "merchant_category":     merchant_cat,
-        "transaction_city":      city[0],
-        "transaction_lat":       round(txn_lat, 4),
-        "transaction_lon":       round(txn_lon, 4),
-        "home_city":             user["home_city"],
-        "home_lat":              user["home_lat"],
-        "home_lon":              user["home_lon"],
-        "distance_from_home_km": distance,
-        "device_type":           device,
-        "user_home_device":      user["device"],
-        "device_mismatch":       device_mismatch,
-        "card_age_days":         user["card_age_days"],
-        "transaction_hour":      now.hour,
-        "transaction_day":       now.weekday(),
-        "is_weekend":            int(now.weekday() >= 5),
-        "is_night":              is_night,
-        "daily_txn_count":       daily_count,
-        "avg_amount_7d":         avg_7d,
-        "amount_vs_avg_ratio":   amount_vs_avg,
-        # meta for dashboard only (not fed to model)
-        "_simulated_fraud":      is_fraud,
-    }
+    return _default.generate(force_fraud)
 
 
 async def stream_transactions(callback, interval_sec: float = 3.0):
@@ -0,0 +1,109 @@
+"""
+ArgusAI — Alert storm benchmark
+A card-testing burst against backend/alert_throttle.py: one user produces
+`--storm` BLOCK decisions back to back while `--users` other users get one
+alert each. Sends are local stubs taking `--alert-latency-ms`.
+
+  unthrottled  one fire-and-forget task per alert (the old behaviour)
+  throttled    AlertThrottle with the default buckets, then one digest
+
+Reports messages sent, peak send tasks in flight, coalesced/dropped
+counts and the cost of one admit() decision.
+
+Usage: python benchmarks/bench_alerts.py [--storm 500] [--users 100]
+"""
+
+import asyncio, argparse
+
+from common import time_calls, write_results, print_table
+
+
+class _Sink:
+    """Stub delivery: counts messages and the peak number in flight."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.sent = self.inflight = self.peak = 0
+
+    async def send(self, *args):
+        self.inflight += 1
+        self.peak = max(self.peak, self.inflight)
+        await asyncio.sleep(self.latency_s)
+        self.inflight -= 1
+        self.sent += 1
+        return True
+
+
+def _alerts(storm: int, users: int) -> list:
+    attack = [({"user_id": 212, "amount": 4999.0, "transaction_id": f"TXNA{i}"},
+               {"risk_score": 97.0}) for i in range(storm)]
+    others = [({"user_id": 1000 + u, "amount": 2500.0, "transaction_id": f"TXNU{u}"},
+               {"risk_score": 85.0}) for u in range(users)]
+    # Interleave: the attack is running while ordinary alerts arrive
+    step = max(1, storm // max(users, 1))
+    out  = []
+    for i, pair in enumerate(attack):
+        out.append(pair)
+        if i % step == 0 and others:
+            out.append(others.pop())
+    return out + others
+
+
+async def _unthrottled(alerts: list, sink: _Sink) -> dict:
+    tasks = [asyncio.create_task(sink.send(t, r)) for t, r in alerts]
+    await asyncio.gather(*tasks)
+    return {"alerts": len(alerts), "messages": sink.sent, "peak_tasks": sink.peak}
+
+
+async def _throttled(alerts: list, sink: _Sink) -> dict:
+    from backend.alert_throttle import AlertThrottle
+
+    throttle = AlertThrottle()
+    throttle.start(sink.send)
+    for txn, result in alerts:
+        if throttle.admit("BLOCK", txn, result):
+            throttle.spawn(sink.send(txn, result))
+        await asyncio.sleep(0)
+    await throttle.drain()
+    await throttle.stop()                 # sends the window's digest
+    outcomes = throttle.status()["outcomes"]["BLOCK"]
+    print(f"   digest: {throttle.last_digest['lines'][0] if throttle.last_digest else '-'}")
+    return {"alerts": len(alerts), "messages": sink.sent, "peak_tasks": sink.peak,
+            **outcomes, "digests": throttle.digests}
+
+
+def run(storm: int = 500, users: int = 100, latency_ms: float = 50.0) -> dict:
+    from backend.alert_throttle import AlertThrottle
+
+    alerts  = _alerts(storm, users)
+    results = {
+        "storm[unthrottled]": asyncio.run(_unthrottled(alerts, _Sink(latency_ms / 1000))),
+        "storm[throttled]":   asyncio.run(_throttled(alerts, _Sink(latency_ms / 1000))),
+    }
+    for name, r in results.items():
+        print(f"   {name:<20} {r['alerts']} alerts → {r['messages']} messages, "
+              f"peak {r['peak_tasks']} send tasks")
+
+    # Decision cost once the attacker's bucket is empty (the storm's steady state)
+    throttle = AlertThrottle()
+    results["admit"] = time_calls(lambda t, r: throttle.admit("BLOCK", t, r),
+                                  (pair for pair in alerts[:storm]))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--storm", type=int, default=500)
+    ap.add_argument("--users", type=int, default=100)
+    ap.add_argument("--alert-latency-ms", type=float, default=50.0)
+    ap.add_argument("--out",   default=None)
+    args = ap.parse_args()
+
+    print(f"⏱️  Alert storm benchmark ({args.storm} attack alerts, {args.users} users)")
+    results = run(args.storm, args.users, args.alert_latency_ms)
+    print_table(results)
+    write_results("alerts", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
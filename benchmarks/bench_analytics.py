@@ -0,0 +1,89 @@
+"""
+ArgusAI — Analytics mirror benchmark
+Fills scratch SQLite databases to each requested size, syncs them into the
+DuckDB mirror (backend/analytics.py), then times the predefined
+aggregations against the mirror and the same fraud-rate group-by run
+directly on SQLite.
+
+Needs duckdb (pip install duckdb).
+
+Usage: python benchmarks/bench_analytics.py [--rows 1000000,10000000]
+"""
+
+import os, time, argparse, tempfile
+
+from common import time_calls, write_results, print_table, use_scratch_db
+from bench_database import _bulk_fill
+
+CASES = [
+    ("fraud_rate",     ["city", "merchant", "hour"]),
+    ("fraud_rate",     ["day"]),
+    ("risk_quantiles", ["month", "payment_type"]),
+    ("risk_histogram", ["action"]),
+]
+
+_SQLITE_FRAUD_RATE = """
+    SELECT transaction_city, merchant_category,
+           coalesce(transaction_hour, CAST(strftime('%H', created_at) AS INTEGER)) AS hour,
+           COUNT(*), SUM(action = 'BLOCK'), SUM(action = 'OTP'),
+           ROUND(100.0 * SUM(action = 'BLOCK') / COUNT(*), 3),
+           COUNT(label), ROUND(AVG(risk_score), 2), ROUND(SUM(amount), 2)
+    FROM transactions GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+"""
+
+
+def run(sizes: list[int], n_queries: int = 10) -> dict:
+    results = {}
+    tmpdir  = tempfile.mkdtemp(prefix="argus-bench-")
+    for size in sizes:
+        path     = os.path.join(tmpdir, f"rows-{size}.db")
+        database = use_scratch_db(path)
+        # Imported only now: importing backend.analytics migrates the database
+        from backend import analytics
+        if analytics.duckdb is None:
+            print("   ⚠️  duckdb not installed — skipping analytics benchmark")
+            return {}
+        t0 = time.perf_counter()
+        _bulk_fill(database, size)
+        print(f"   filled {size:,} rows in {time.perf_counter() - t0:.1f}s")
+
+        mirror = analytics.AnalyticsMirror(os.path.join(tmpdir, f"rows-{size}.duckdb"),
+                                           enabled=True)
+        t0 = time.perf_counter()
+        mirror.sync()
+        took = time.perf_counter() - t0
+        print(f"   mirrored {size:,} rows in {took:.1f}s ({size / took:,.0f} rows/s)")
+        results[f"sync@{size}"] = {"n": size, "mean_ms": round(took * 1000, 1),
+                                   "throughput_ops": round(size / took, 1)}
+
+        reads = max(3, n_queries if size <= 1_000_000 else n_queries // 3)
+        for query, by in CASES:
+            results[f"{query}[{'×'.join(by)}]@{size}"] = time_calls(
+                mirror.run_query, ((query, by) for _ in range(reads)), warmup=1)
+
+        conn = database.get_conn()
+        results[f"sqlite_fraud_rate[city×merchant×hour]@{size}"] = time_calls(
+            lambda: conn.execute(_SQLITE_FRAUD_RATE).fetchall(),
+            (() for _ in range(max(3, reads // 3))), warmup=0)
+        conn.close()
+        mirror._conn.close()
+        os.remove(path)
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", default="1000000",
+                    help="comma-separated table sizes (10M takes several minutes to fill)")
+    ap.add_argument("--out",  default=None)
+    args  = ap.parse_args()
+    sizes = [int(s) for s in args.rows.split(",") if s]
+
+    print(f"⏱️  Analytics benchmark (sizes: {', '.join(f'{s:,}' for s in sizes)})")
+    results = run(sizes)
+    print_table(results)
+    write_results("analytics", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+ArgusAI — End-to-end API benchmark
+Full POST /api/transaction latency (validation → scoring → audit write →
+alerts → broadcast → response) under C concurrent clients, plus gateway
+retries of already-scored transactions (idempotent replays).
+
+By default the app runs in-process over httpx's ASGI transport against a
+scratch database, with Telegram/Gmail replaced by local stubs, and the
+auto-stream is not started. Pass --url to load a running server instead
+(its alert configuration is then whatever that server uses).
+
+Usage: python benchmarks/bench_api.py [--n 2000] [--concurrency 1,8,32]
+"""
+
+import asyncio, argparse
+
+import httpx
+
+from common import (time_concurrent, write_results, print_table,
+                    sample_transactions, stub_alerts, use_scratch_db)
+
+_FIELDS = [
+    "amount", "payment_type", "merchant_category", "transaction_city",
+    "distance_from_home_km", "device_type", "device_mismatch", "card_age_days",
+    "transaction_hour", "transaction_day", "is_weekend", "is_night",
+    "daily_txn_count", "avg_amount_7d", "amount_vs_avg_ratio", "user_id",
+]
+
+
+def _body(txn: dict, i: int) -> dict:
+    body = {k: txn[k] for k in _FIELDS}
+    body["transaction_id"] = f"BENCH{i:08d}"
+    return body
+
+
+async def _run(client: httpx.AsyncClient, bodies: list[dict],
+               concurrencies: list[int]) -> dict:
+    async def post(body):
+        resp = await client.post("/api/transaction", json=body)
+        resp.raise_for_status()
+
+    for body in bodies[:20]:          # warm models and connection pool
+        await post({**body, "transaction_id": f"WARM{body['transaction_id']}"})
+    results = {}
+    for c in concurrencies:
+        # Fresh ids per level: a repeated id would be an idempotent replay
+        batch = [{**b, "transaction_id": f"{b['transaction_id']}C{c}"} for b in bodies]
+        results[f"post_transaction@c{c}"] = await time_concurrent(post, batch, c)
+    results[f"retry_transaction@c{c}"] = await time_concurrent(post, batch, c)
+    return results
+
+
+def run(n: int, concurrencies: list[int], url: str = None,
+        alert_latency_ms: float = 50.0) -> dict:
+    txns   = sample_transactions(n)
+    bodies = [_body(t, i) for i, t in enumerate(txns)]
+
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=60)
+    else:
+        use_scratch_db()
+        stub_alerts(alert_latency_ms)
+        from backend.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                                   base_url="http://bench", timeout=60)
+
+    async def go():
+        async with client:
+            return await _run(client, bodies, concurrencies)
+    return asyncio.run(go())
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--n",           type=int, default=2000)
+    ap.add_argument("--concurrency", default="1,8,32")
+    ap.add_argument("--url",         default=None, help="target a running server")
+    ap.add_argument("--alert-latency-ms", type=float, default=50.0)
+    ap.add_argument("--out",         default=None)
+    args = ap.parse_args()
+    cs   = [int(c) for c in args.concurrency.split(",") if c]
+
+    print(f"⏱️  API benchmark ({args.n:,} requests, concurrency {args.concurrency})")
+    results = run(args.n, cs, args.url, args.alert_latency_ms)
+    print_table(results)
+    write_results("api", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
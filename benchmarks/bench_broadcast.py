@@ -0,0 +1,76 @@
+"""
+ArgusAI — WebSocket broadcast benchmark
+Times ConnectionManager.broadcast fan-out of one scored-transaction payload
+to K connected clients. Clients are in-process fakes implementing
+Starlette's WebSocket send methods (send_json encodes, as Starlette does),
+so the numbers cover our encoding + fan-out cost without network noise.
+
+Usage: python benchmarks/bench_broadcast.py [--clients 1,10,100,1000]
+"""
+
+import json, asyncio, argparse
+
+from common import time_concurrent, write_results, print_table, sample_transactions
+
+
+class FakeWebSocket:
+    """Stands in for starlette.websockets.WebSocket on the send path."""
+
+    def __init__(self):
+        self.sent_bytes = 0
+
+    async def send_json(self, data, mode: str = "text"):
+        self.sent_bytes += len(json.dumps(data, separators=(",", ":")))
+
+    async def send_text(self, data: str):
+        self.sent_bytes += len(data)
+
+    async def send_bytes(self, data: bytes):
+        self.sent_bytes += len(data)
+
+
+def _payload(txn: dict) -> dict:
+    return {
+        **txn,
+        "risk_score": 72.4, "risk_level": "HIGH", "action": "BLOCK",
+        "message": "🚫 Transaction blocked — high fraud risk",
+        "fraud_prob": 91.2, "anomaly_score": 0.183, "is_anomaly": True,
+        "shap_explanation": [
+            {"feature": "amount", "label": "Transaction amount", "shap_val": 1.12,
+             "direction": "↑ increases", "impact": "HIGH"},
+        ] * 4,
+        "model_version": "ArgusAI-v1.0",
+        "processed_at":  "2024-01-01T09:00:00",
+    }
+
+
+def run(client_counts: list[int], n: int = 500) -> dict:
+    from backend.main import ConnectionManager
+
+    payloads = [_payload(t) for t in sample_transactions(n)]
+    results  = {}
+    for k in client_counts:
+        manager = ConnectionManager()
+        manager.active = [FakeWebSocket() for _ in range(k)]
+        rounds = max(20, n // max(k // 10, 1))
+        results[f"broadcast@{k}"] = asyncio.run(time_concurrent(
+            manager.broadcast, payloads[:rounds], concurrency=1))
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--clients", default="1,10,100,1000")
+    ap.add_argument("--n",       type=int, default=500)
+    ap.add_argument("--out",     default=None)
+    args = ap.parse_args()
+    counts = [int(c) for c in args.clients.split(",") if c]
+
+    print(f"⏱️  Broadcast benchmark (clients: {args.clients})")
+    results = run(counts, args.n)
+    print_table(results)
+    write_results("broadcast", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
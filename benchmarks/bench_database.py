@@ -0,0 +1,128 @@
+"""
+ArgusAI — Persistence benchmark
+Times log_transaction (insert + user profile upsert + commit) and the
+dashboard aggregate queries (get_stats, get_risk_trend) against scratch
+databases pre-filled to each requested size.
+
+Usage: python benchmarks/bench_database.py [--rows 10000,1000000,10000000]
+"""
+
+import os, json, time, random, argparse, tempfile
+from datetime import datetime, timedelta
+
+from common import (time_calls, write_results, print_table, sample_transactions,
+                    use_scratch_db)
+from ml import explain_codec
+
+_ACTIONS = [("ALLOW", "LOW"), ("OTP", "MEDIUM"), ("BLOCK", "HIGH")]
+
+
+def _fake_result(rng: random.Random) -> dict:
+    action, level = rng.choices(_ACTIONS, weights=[90, 6, 4])[0]
+    return {
+        "risk_score":    round(rng.uniform(0, 100), 2),
+        "risk_level":    level,
+        "action":        action,
+        "fraud_prob":    round(rng.uniform(0, 100), 2),
+        "anomaly_score": round(rng.uniform(0, 0.3), 6),
+        "is_anomaly":    rng.random() < 0.05,
+        "shap_explanation": [
+            {"feature": "amount", "label": "Transaction amount",
+             "shap_val": 0.42, "direction": "↑ increases", "impact": "HIGH"},
+            {"feature": "is_night", "label": "Night-time transaction",
+             "shap_val": -0.12, "direction": "↓ decreases", "impact": "MEDIUM"},
+            {"feature": "distance_from_home_km", "label": "Distance from home",
+             "shap_val": 0.05, "direction": "↑ increases", "impact": "LOW"},
+            {"feature": "card_age_days", "label": "Card age",
+             "shap_val": 0.01, "direction": "↑ increases", "impact": "LOW"},
+        ],
+        "model_version": "ArgusAI-v1.0",
+    }
+
+
+def _bulk_fill(database, rows: int, seed: int = 7, batch: int = 50_000,
+               packed: bool = True):
+    """
+    Insert `rows` audit rows spread over the last 48h, in large batches.
+    packed=False stores explanations as JSON, as rows logged before
+    ml/explain_codec.py were.
+    """
+    encode = explain_codec.pack if packed else json.dumps
+    rng   = random.Random(seed)
+    txns  = sample_transactions(1000, seed=seed)
+    now   = datetime.utcnow()
+    conn  = database.get_conn()
+    conn.execute("PRAGMA synchronous=OFF")
+    done  = 0
+    while done < rows:
+        chunk = []
+        for i in range(min(batch, rows - done)):
+            t, r = txns[(done + i) % len(txns)], _fake_result(rng)
+            created = (now - timedelta(seconds=rng.uniform(0, 48 * 3600))).isoformat()
+            chunk.append((f"TXN{done + i:09d}", t["user_id"], t["timestamp"],
+                          t["amount"], t["payment_type"], t["merchant_category"],
+                          t["transaction_city"], t["device_type"],
+                          t["device_mismatch"], t["distance_from_home_km"],
+                          t["is_night"], r["risk_score"], r["risk_level"],
+                          r["action"], r["fraud_prob"], r["anomaly_score"],
+                          int(r["is_anomaly"]), encode(r["shap_explanation"]),
+                          r["model_version"], created))
+        conn.executemany("""
+            INSERT INTO transactions
+            (transaction_id, user_id, timestamp, amount, payment_type,
+             merchant_category, transaction_city, device_type, device_mismatch,
+             distance_km, is_night, risk_score, risk_level, action,
+             fraud_prob, anomaly_score, is_anomaly, shap_explanation,
+             model_version, created_at)
+            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+        """, chunk)
+        conn.commit()
+        done += len(chunk)
+    conn.close()
+
+
+def run(sizes: list[int], n_writes: int = 2000, n_reads: int = 50) -> dict:
+    results = {}
+    tmpdir  = tempfile.mkdtemp(prefix="argus-bench-")
+    rng     = random.Random(3)
+
+    # Inserts are measured on an empty DB; cost is dominated by the commit.
+    database = use_scratch_db(os.path.join(tmpdir, "writes.db"))
+    txns     = sample_transactions(n_writes)
+    results["log_transaction"] = time_calls(
+        database.log_transaction, ((t, _fake_result(rng)) for t in txns))
+
+    for size in sizes:
+        path     = os.path.join(tmpdir, f"rows-{size}.db")
+        database = use_scratch_db(path)
+        t0 = time.perf_counter()
+        _bulk_fill(database, size)
+        print(f"   filled {size:,} rows in {time.perf_counter() - t0:.1f}s")
+        reads = max(3, n_reads if size <= 1_000_000 else n_reads // 10)
+        results[f"get_stats@{size}"] = time_calls(
+            database.get_stats, (() for _ in range(reads)), warmup=1)
+        results[f"get_risk_trend@{size}"] = time_calls(
+            database.get_risk_trend, ((24,) for _ in range(reads)), warmup=1)
+        results[f"get_recent_transactions@{size}"] = time_calls(
+            database.get_recent_transactions, ((50,) for _ in range(reads)), warmup=1)
+        os.remove(path)
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows",   default="10000,1000000",
+                    help="comma-separated table sizes (10M takes a few minutes)")
+    ap.add_argument("--writes", type=int, default=2000)
+    ap.add_argument("--out",    default=None)
+    args  = ap.parse_args()
+    sizes = [int(s) for s in args.rows.split(",") if s]
+
+    print(f"⏱️  Persistence benchmark (sizes: {', '.join(f'{s:,}' for s in sizes)})")
+    results = run(sizes, args.writes)
+    print_table(results)
+    write_results("database", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
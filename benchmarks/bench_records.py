@@ -0,0 +1,72 @@
+"""
+ArgusAI — Record benchmark
+Cost of carrying a transaction and its decision as plain dicts versus the
+slotted records of ml/records.py:
+
+  memory     bytes held per in-flight (transaction, decision) pair, as in
+             the deferred-write queue (tracemalloc)
+  audit row  (txn, result) → audit-log tuple (database._audit_values)
+  features   record → encoded feature row (FraudEngine._build_features)
+
+Usage: python benchmarks/bench_records.py [--n 10000]
+"""
+
+import argparse, tracemalloc
+
+from common import time_calls, write_results, print_table, sample_transactions
+
+
+def _held_bytes(make, n: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held   = [make(i) for i in range(n)]
+    after  = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return (after - before) / n
+
+
+def run(n: int = 10000) -> dict:
+    from ml.records import Transaction, Decision
+    from ml.predict import FraudEngine
+    from backend import database
+
+    engine = FraudEngine()
+    engine.load()
+    txns    = sample_transactions(n)
+    results = [engine.predict(t).as_dict() for t in txns[:200]]
+    out     = {}
+
+    dict_bytes   = _held_bytes(lambda i: (dict(txns[i]), dict(results[i % 200])), n)
+    record_bytes = _held_bytes(lambda i: (Transaction(txns[i]), Decision(results[i % 200])), n)
+    out["in_flight_bytes[dict]"]   = {"mean_bytes": round(dict_bytes, 1)}
+    out["in_flight_bytes[record]"] = {"mean_bytes": round(record_bytes, 1)}
+    print(f"   in-flight pair: dict {dict_bytes:.0f} B, record {record_bytes:.0f} B")
+
+    now   = "2024-01-01T09:00:00"
+    pairs = [(txns[i], results[i % 200]) for i in range(n)]
+    recs  = [(Transaction(t), Decision(r)) for t, r in pairs]
+    out["audit_values[dict]"]   = time_calls(database._audit_values,
+                                             ((t, r, now) for t, r in pairs))
+    out["audit_values[record]"] = time_calls(database._audit_values,
+                                             ((t, r, now) for t, r in recs))
+    out["features[dict]"]   = time_calls(engine._build_features, ((t,) for t in txns))
+    out["features[record]"] = time_calls(engine._build_features,
+                                         ((t,) for t, _ in recs))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--n",   type=int, default=10000)
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args()
+
+    print(f"⏱️  Record benchmark ({args.n:,} transactions)")
+    results = run(args.n)
+    print_table(results)
+    write_results("records", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+ArgusAI — Rules benchmark
+The rule component of the risk score, hand-written `if`s (as predict.py
+had it) versus the compiled rules of ml/rules.py:
+
+  score      one transaction record → rule score (the per-request path)
+  batch      a batch of records → rule scores: per-row `if`s vs. columns
+             built once and every rule evaluated as NumPy ufuncs
+  signals    alert signal list for one transaction
+
+Scores are checked to be identical on every path before timing.
+
+Usage: python benchmarks/bench_rules.py [--n 20000] [--batch 1000]
+"""
+
+import argparse
+
+import numpy as np
+
+from common import time_calls, write_results, print_table, sample_transactions
+
+
+def _if_score(txn) -> float:
+    rule_score = 0
+    if txn.get("is_night"):            rule_score += 4
+    if txn.get("device_mismatch"):     rule_score += 4
+    if txn.get("distance_from_home_km", 0) > 500:  rule_score += 4
+    if txn.get("amount_vs_avg_ratio",  0) > 5:      rule_score += 3
+    return min(rule_score, 15)
+
+
+def run(n: int = 20000, batch: int = 1000) -> dict:
+    from ml.records import Transaction
+    from ml.rules   import RuleSet, RULES_PATH
+
+    ruleset = RuleSet.from_file(RULES_PATH)
+    txns    = [Transaction(t) for t in sample_transactions(n)]
+    batches = [txns[i:i + batch] for i in range(0, n, batch)]
+
+    expected = np.array([_if_score(t) for t in txns])
+    if not (np.array([ruleset.score(t) for t in txns]) == expected).all() \
+            or not (ruleset.scores(txns) == expected).all():
+        raise SystemExit("❌ compiled rules disagree with the hand-written ones")
+    print(f"   parity ok on {n:,} transactions (mean rule score {expected.mean():.2f})")
+
+    results = {
+        "score[ifs]":      time_calls(_if_score, ((t,) for t in txns)),
+        "score[compiled]": time_calls(ruleset.score, ((t,) for t in txns)),
+    }
+    per_row = lambda r: {k: (round(v / batch, 5) if k.endswith("_ms") else
+                             v * batch if k.startswith("through") else v)
+                         for k, v in r.items()}
+    results[f"batch[ifs/{batch}]"] = per_row(time_calls(
+        lambda b: [_if_score(t) for t in b], ((b,) for b in batches), warmup=2))
+    results[f"batch[vectorized/{batch}]"] = per_row(time_calls(
+        ruleset.scores, ((b,) for b in batches), warmup=2))
+    results["signals"] = time_calls(ruleset.signals, ((t,) for t in txns[:n // 10]))
+
+    for rule in ruleset.stats()["rules"]:
+        print(f"   {rule['name']:<16} hit rate {rule['hit_rate']:>6.1%}  "
+              f"{rule['mean_ns']:>7.1f} ns/row")
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--n",     type=int, default=20000)
+    ap.add_argument("--batch", type=int, default=1000)
+    ap.add_argument("--out",   default=None)
+    args = ap.parse_args()
+
+    print(f"⏱️  Rules benchmark ({args.n:,} transactions)")
+    results = run(args.n, args.batch)
+    print_table(results)
+    write_results("rules", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+ArgusAI — Scoring benchmark
+Times each stage of FraudEngine.predict separately (feature build, scaler,
+XGBoost via predict_proba and via the flat evaluator, autoencoder, SHAP,
+fusion) and the full predict call, one row at a time as the API does.
+
+Usage: python benchmarks/bench_scoring.py [--n 2000] [--out path.json]
+"""
+
+import argparse
+
+from common import time_calls, write_results, print_table, sample_transactions
+
+
+def run(n: int = 2000) -> dict:
+    from ml.predict import FraudEngine
+    from ml.records import Transaction
+
+    engine = FraudEngine()
+    engine.load()
+    txns   = [Transaction(t) for t in sample_transactions(n)]
+
+    rows    = [engine._build_features(t) for t in txns]
+    scaled  = [engine.scaler.transform(r) for r in rows]
+    probs   = [float(engine.xgb_model.predict_proba(x)[0][1]) for x in scaled[:1]]
+
+    results = {
+        "features": time_calls(engine._build_features, ((t,) for t in txns)),
+        "scaler":   time_calls(engine.scaler.transform, ((r,) for r in rows)),
+        "xgb":      time_calls(engine.xgb_model.predict_proba, ((x,) for x in scaled)),
+        "xgb_flat": time_calls(engine.fast_xgb.predict_one, ((x[0],) for x in scaled))
+                    if engine.fast_xgb is not None else {"n": 0},
+        "ae":       time_calls(lambda x: engine.autoencoder.predict(x, verbose=0),
+                               ((x,) for x in scaled)),
+        "shap":     time_calls(engine._explain, ((x,) for x in scaled)),
+        "fuse":     time_calls(engine._fuse_risk,
+                               ((probs[0], 0.05, False, t) for t in txns)),
+        "predict":  time_calls(engine.predict, ((t,) for t in txns)),
+    }
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--n",   type=int, default=2000)
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args()
+
+    print(f"⏱️  Scoring benchmark ({args.n:,} transactions)")
+    results = run(args.n)
+    print_table(results)
+    write_results("scoring", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+ArgusAI — Serialization benchmark
+Per-request encode/decode cost of the API, before and after
+backend/encoding.py:
+
+  ingest     body bytes → txn dict: json.loads + TransactionInput + .dict()
+             (FastAPI's path) vs. TypeAdapter.validate_json + dump_python,
+             single and per item of a 100-transaction batch
+  response   response dict → bytes: jsonable_encoder + json.dumps vs. orjson
+  broadcast  one payload to 100 clients: encoded per client (send_json)
+             vs. encoded once; plus JSON vs. msgpack frame size
+
+Usage: python benchmarks/bench_serialization.py [--n 5000]
+"""
+
+import json, argparse, warnings
+
+from fastapi.encoders import jsonable_encoder
+
+from common import time_calls, write_results, print_table, sample_transactions
+from bench_api import _body
+from bench_broadcast import _payload
+
+CLIENTS = 100
+BATCH   = 100
+
+
+def _stdlib_json(content) -> bytes:
+    # What starlette's JSONResponse.render does
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def run(n: int = 5000) -> dict:
+    from backend import encoding
+    from backend.main import TransactionInput, _TXN_INPUT, _TXN_BATCH, _validated
+
+    txns     = sample_transactions(n)
+    bodies   = [json.dumps(_body(t, i)).encode() for i, t in enumerate(txns)]
+    batches  = [json.dumps([_body(t, i) for i, t in enumerate(txns[j:j + BATCH])]).encode()
+                for j in range(0, n, BATCH)]
+    payloads = [_payload(t) for t in txns]
+    responses = [{"transaction": t, "result": {k: p[k] for k in p if k not in t}}
+                 for t, p in zip(txns, payloads)]
+    results  = {}
+
+    def ingest_model(body):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")      # .dict() is deprecated in pydantic v2
+            return TransactionInput(**json.loads(body)).dict()
+
+    results["ingest[model+dict]"] = time_calls(ingest_model, ((b,) for b in bodies))
+    results["ingest[type_adapter]"] = time_calls(
+        lambda b: _validated(_TXN_INPUT, b), ((b,) for b in bodies))
+    per_item = time_calls(lambda b: _validated(_TXN_BATCH, b), ((b,) for b in batches),
+                          warmup=2)
+    results[f"ingest[type_adapter_batch/{BATCH}]"] = {
+        k: (round(v / BATCH, 4) if k.endswith("_ms") else v * BATCH if k.startswith("through")
+            else v) for k, v in per_item.items()}
+
+    results["response[jsonable_encoder+json]"] = time_calls(
+        lambda r: _stdlib_json(jsonable_encoder(r)), ((r,) for r in responses))
+    results["response[encoding.dumps]"] = time_calls(
+        encoding.dumps, ((r,) for r in responses))
+
+    results[f"broadcast_encode[per_client@{CLIENTS}]"] = time_calls(
+        lambda p: [json.dumps(p, separators=(",", ":")) for _ in range(CLIENTS)],
+        ((p,) for p in payloads[:n // 10]))
+    results[f"broadcast_encode[once@{CLIENTS}]"] = time_calls(
+        lambda p: encoding.encode(p), ((p,) for p in payloads[:n // 10]))
+
+    json_bytes = sum(len(encoding.dumps(p)) for p in payloads) / n
+    results["frame_bytes[json]"] = {"mean_bytes": round(json_bytes, 1)}
+    if encoding.msgpack is not None:
+        results["broadcast_encode[msgpack]"] = time_calls(
+            encoding.packb, ((p,) for p in payloads[:n // 10]))
+        results["frame_bytes[msgpack]"] = {
+            "mean_bytes": round(sum(len(encoding.packb(p)) for p in payloads) / n, 1)}
+    for name in ("json", "msgpack"):
+        if f"frame_bytes[{name}]" in results:
+            print(f"   {name:<8} frame {results[f'frame_bytes[{name}]']['mean_bytes']:>8.1f} B")
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--n",   type=int, default=5000)
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args()
+
+    print(f"⏱️  Serialization benchmark ({args.n:,} transactions)")
+    results = run(args.n)
+    print_table(results)
+    write_results("serialization", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+ArgusAI — Audit-log storage benchmark
+Fills a scratch database with explanations stored the old way (JSON text),
+measures file size and history reads, then packs them in place
+(database._compact_explanations, the startup migration) plus VACUUM and
+measures again.
+
+Usage: python benchmarks/bench_storage.py [--rows 1000000]
+"""
+
+import os, time, argparse, tempfile
+
+from common import time_calls, write_results, print_table, use_scratch_db
+from bench_database import _bulk_fill
+
+
+def _measure(database, path: str, label: str, n_reads: int) -> dict:
+    conn = database.get_conn()
+    results = {
+        f"file_mb[{label}]": {"mean_ms": None,
+                              "mb": round(os.path.getsize(path) / 2**20, 1)},
+        f"get_recent_transactions(1000)[{label}]": time_calls(
+            database.get_recent_transactions, ((1000,) for _ in range(n_reads)), warmup=2),
+        # Full pass over the explanations, as ml/refresh.py-style exports do
+        f"scan_explanations[{label}]": time_calls(
+            lambda: conn.execute("SELECT shap_explanation FROM transactions").fetchall(),
+            (() for _ in range(3)), warmup=1),
+    }
+    conn.close()
+    return results
+
+
+def run(rows: int, n_reads: int = 50) -> dict:
+    path     = os.path.join(tempfile.mkdtemp(prefix="argus-bench-"), "storage.db")
+    database = use_scratch_db(path)
+    t0 = time.perf_counter()
+    _bulk_fill(database, rows, packed=False)
+    print(f"   filled {rows:,} JSON rows in {time.perf_counter() - t0:.1f}s")
+    results = _measure(database, path, "json", n_reads)
+
+    conn = database.get_conn()
+    t0 = time.perf_counter()
+    database._compact_explanations(conn)
+    conn.execute("VACUUM")
+    conn.close()
+    took = time.perf_counter() - t0
+    print(f"   migrated + vacuumed in {took:.1f}s")
+    results["migration"] = {"n": rows, "mean_ms": round(took * 1000, 1)}
+    results.update(_measure(database, path, "packed", n_reads))
+
+    before, after = results["file_mb[json]"]["mb"], results["file_mb[packed]"]["mb"]
+    print(f"   file size {before} MB → {after} MB ({(1 - after / before) * 100:.0f}% smaller)")
+    os.remove(path)
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--out",  default=None)
+    args = ap.parse_args()
+
+    print(f"⏱️  Storage benchmark ({args.rows:,} rows)")
+    results = run(args.rows)
+    print_table(results)
+    write_results("storage", results, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+ArgusAI — Flat tree evaluator benchmark
+Checks that ml/fast_trees.FlatForest reproduces XGBClassifier.predict_proba
+bit for bit, then times single-row and batch scoring for both.
+
+Parity rows: scaled feature vectors of generated transactions, wide random
+rows (to reach every branch) and rows with missing values. Exits non-zero
+on any mismatch.
+
+Usage: python benchmarks/bench_trees.py [--n 2000] [--parity-rows 20000]
+"""
+
+import sys, argparse
+
+import numpy as np
+
+from common import time_calls, write_results, print_table, sample_transactions
+
+
+def parity_rows(engine, n: int) -> dict:
+    rng   = np.random.default_rng(7)
+    txns  = np.vstack([engine.scaler.transform(engine._build_features(t))
+                       for t in sample_transactions(min(n, 5000))]).astype(np.float32)
+    wide  = (rng.normal(size=(n, txns.shape[1])) * 3).astype(np.float32)
+    holes = wide[: n // 10].copy()
+    holes[rng.random(holes.shape) < 0.2] = np.nan
+    return {"transactions": txns, "random": wide, "missing": holes}
+
+
+def run(n: int = 2000, n_parity: int = 20000) -> tuple[dict, dict]:
+    from ml.predict import FraudEngine
+    from ml.fast_trees import FlatForest, check_parity
+
+    engine = FraudEngine()
+    engine.load()
+    model  = engine.xgb_model
+    forest = FlatForest.from_model(model)
+
+    parity = {name: check_parity(forest, model, X)
+              for name, X in parity_rows(engine, n_parity).items()}
+
+    rows = np.random.default_rng(0).normal(size=(n, forest.n_features)).astype(np.float32)
+    results = {
+        "predict_proba_1row": time_calls(model.predict_proba, ((r[None],) for r in rows)),
+        "flat_1row":          time_calls(forest.predict_one, ((r,) for r in rows)),
+    }
+    for batch in (64, 1024):
+        blocks = [rows[i:i + batch] for i in range(0, n, batch) if i + batch <= n] or [rows]
+        results[f"predict_proba_{batch}rows"] = time_calls(
+            model.predict_proba, ((b,) for b in blocks), warmup=1)
+        results[f"flat_{batch}rows"] = time_calls(
+            forest.predict_proba, ((b,) for b in blocks), warmup=1)
+    return results, parity
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--n",           type=int, default=2000)
+    ap.add_argument("--parity-rows", type=int, default=20000)
+    ap.add_argument("--out",         default=None)
+    args = ap.parse_args()
+
+    print(f"⏱️  Tree evaluator benchmark ({args.n:,} rows)")
+    results, parity = run(args.n, args.parity_rows)
+
+    ok = all(p["exact"] for p in parity.values())
+    for name, p in parity.items():
+        mark = "✅" if p["exact"] else "❌"
+        print(f"   {mark} parity/{name:<13} {p['rows']:>7,} rows  "
+              f"mismatches={p['mismatches']}  max_ulp={p['max_ulp']}")
+    print_table(results)
+    speedup = results["predict_proba_1row"]["p50_ms"] / results["flat_1row"]["p50_ms"]
+    print(f"\n   Single-row p50 speedup: {speedup:.1f}×")
+    write_results("trees", {**results, "parity": parity}, args.out)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
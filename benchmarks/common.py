@@ -0,0 +1,146 @@
+"""
+ArgusAI — Benchmark helpers
+Timing, percentile summaries, JSON result files and local alert stubs shared
+by every benchmark in this directory.
+"""
+
+import os, sys, json, time, asyncio, tempfile, importlib, subprocess, platform
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+# ─── Timing ───────────────────────────────────────────────────────────────────
+def summarize(samples_s, elapsed_s: float = None) -> dict:
+    """Latency samples (seconds) → p50/p95/p99/mean (ms) + throughput (ops/s)."""
+    arr = np.asarray(samples_s, dtype=np.float64) * 1000
+    if elapsed_s is None:
+        elapsed_s = float(arr.sum()) / 1000
+    if arr.size == 0:
+        return {"n": 0}
+    return {
+        "n":              int(arr.size),
+        "p50_ms":         round(float(np.percentile(arr, 50)), 4),
+        "p95_ms":         round(float(np.percentile(arr, 95)), 4),
+        "p99_ms":         round(float(np.percentile(arr, 99)), 4),
+        "mean_ms":        round(float(arr.mean()), 4),
+        "max_ms":         round(float(arr.max()), 4),
+        "throughput_ops": round(arr.size / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+    }
+
+
+def time_calls(fn, args_iter, warmup: int = 20) -> dict:
+    """Call fn(*args) for each args tuple, timing each call individually."""
+    args_list = list(args_iter)
+    for args in args_list[:warmup]:
+        fn(*args)
+    samples = []
+    t0 = time.perf_counter()
+    for args in args_list:
+        s = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - s)
+    return summarize(samples, time.perf_counter() - t0)
+
+
+async def time_concurrent(coro_fn, items, concurrency: int) -> dict:
+    """Run coro_fn(item) for all items with `concurrency` workers in flight."""
+    queue   = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+    samples = []
+
+    async def worker():
+        while not queue.empty():
+            item = queue.get_nowait()
+            s = time.perf_counter()
+            await coro_fn(item)
+            samples.append(time.perf_counter() - s)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, time.perf_counter() - t0)
+
+
+# ─── Results ──────────────────────────────────────────────────────────────────
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def write_results(name: str, results: dict, path: str = None) -> str:
+    """Write results + run metadata as JSON; returns the file path."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    commit = _git_commit()
+    path   = path or os.path.join(RESULTS_DIR, f"{name}-{commit}.json")
+    doc = {
+        "benchmark": name,
+        "commit":    commit,
+        "run_at":    datetime.utcnow().isoformat(),
+        "python":    platform.python_version(),
+        "machine":   platform.machine(),
+        "cpus":      os.cpu_count(),
+        "results":   results,
+    }
+    with open(path, "w") as f:
+        json.dump(doc, f, indent=2)
+    print(f"📄 Results → {path}")
+    return path
+
+
+def print_table(results: dict):
+    for name, r in results.items():
+        if isinstance(r, dict) and "p50_ms" in r:
+            print(f"   {name:<28} p50 {r['p50_ms']:>9.3f}ms  p95 {r['p95_ms']:>9.3f}ms"
+                  f"  p99 {r['p99_ms']:>9.3f}ms  {r['throughput_ops']:>10.1f}/s")
+
+
+# ─── Local alert stubs ────────────────────────────────────────────────────────
+def stub_alerts(latency_ms: float = 50.0):
+    """
+    Replace Telegram/Gmail senders with local stubs that sleep `latency_ms`,
+    so alert-heavy runs measure our code rather than third-party APIs.
+    """
+    from backend import alert
+
+    async def _fake_telegram(message: str) -> bool:
+        await asyncio.sleep(latency_ms / 1000)
+        return True
+
+    def _fake_email(subject: str, html_body: str) -> bool:
+        time.sleep(latency_ms / 1000)
+        return True
+
+    alert._send_telegram = _fake_telegram
+    alert._send_email    = _fake_email
+
+
+# ─── Scratch database ─────────────────────────────────────────────────────────
+def use_scratch_db(path: str = None):
+    """
+    Point backend.database at a scratch SQLite file and create the schema.
+    Reloading keeps the module object (and every imported function) alive,
+    so modules that already imported from it follow the new path.
+    """
+    path = path or os.path.join(tempfile.mkdtemp(prefix="argus-bench-"), "bench.db")
+    os.environ["ARGUS_DB_PATH"] = path
+    from backend import database
+    importlib.reload(database)
+    return database
+
+
+def sample_transactions(n: int, seed: int = 42, fraud_every: int = 10) -> list[dict]:
+    """Deterministic transactions from the seeded simulator."""
+    from backend.transaction_stream import TransactionGenerator
+    gen = TransactionGenerator(seed=seed, start=datetime(2024, 1, 1, 9, 0),
+                               step_secs=7.0)
+    return [gen.generate(force_fraud=bool(fraud_every) and i % fraud_every == 0)
+            for i in range(n)]
@@ -0,0 +1,70 @@
+"""
+ArgusAI — Benchmark suite runner
+Runs every benchmark and writes one combined JSON file, suitable for
+diffing across commits.
+
+Usage:
+  python benchmarks/run_all.py                    # quick defaults
+  python benchmarks/run_all.py --rows 10000,1000000,10000000 --n 5000
+  python benchmarks/run_all.py --compare results/all-abc123.json
+"""
+
+import json, argparse
+
+from common import write_results, print_table
+import bench_scoring, bench_trees, bench_database, bench_broadcast, bench_api
+import bench_analytics, bench_serialization, bench_rules, bench_alerts
+
+
+def compare(current: dict, baseline_path: str, key: str = "p99_ms"):
+    """Print relative change of `key` per benchmark versus a baseline file."""
+    with open(baseline_path) as f:
+        base = json.load(f)["results"]
+    print(f"\n📈 {key} vs {baseline_path}")
+    for suite, cur_res in current.items():
+        for name, cur in cur_res.items():
+            old = base.get(suite, {}).get(name)
+            if not old or key not in old or key not in cur or not old[key]:
+                continue
+            delta = (cur[key] - old[key]) / old[key] * 100
+            flag  = "🔴" if delta > 10 else "🟢" if delta < -10 else "  "
+            print(f"   {flag} {suite}/{name:<32} {old[key]:>9.3f} → "
+                  f"{cur[key]:>9.3f}ms  ({delta:+.1f}%)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--n",       type=int, default=1000)
+    ap.add_argument("--rows",    default="10000,1000000")
+    ap.add_argument("--clients", default="1,10,100")
+    ap.add_argument("--concurrency", default="1,8,32")
+    ap.add_argument("--out",     default=None)
+    ap.add_argument("--compare", default=None, help="baseline JSON to diff against")
+    args = ap.parse_args()
+
+    results = {}
+    print("⏱️  scoring");   results["scoring"]   = bench_scoring.run(args.n)
+    print("⏱️  trees");     results["trees"], parity = bench_trees.run(args.n)
+    if not all(p["exact"] for p in parity.values()):
+        print("   ❌ flat tree evaluator differs from predict_proba:", parity)
+    print("⏱️  database");  results["database"]  = bench_database.run(
+        [int(s) for s in args.rows.split(",") if s])
+    print("⏱️  broadcast"); results["broadcast"] = bench_broadcast.run(
+        [int(c) for c in args.clients.split(",") if c], args.n)
+    print("⏱️  api");       results["api"]       = bench_api.run(
+        args.n, [int(c) for c in args.concurrency.split(",") if c])
+    print("⏱️  serialization"); results["serialization"] = bench_serialization.run(args.n)
+    print("⏱️  rules");     results["rules"]     = bench_rules.run(args.n * 10)
+    print("⏱️  alerts");    results["alerts"]    = bench_alerts.run()
+    print("⏱️  analytics"); results["analytics"] = bench_analytics.run(
+        [int(s) for s in args.rows.split(",") if s])
+
+    for suite in results.values():
+        print_table(suite)
+    write_results("all", results, args.out)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
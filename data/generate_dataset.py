@@ -1,16 +1,40 @@
-import pandas as pd
+"""
+ArgusAI — Synthetic Dataset Generator
+Columnar, chunked generator for Indian UPI/Card transactions.
+
+Every column is drawn as a NumPy array, one chunk (a contiguous range of
+days) at a time. Chunks are independent — each gets its own seed spawned
+from the base seed — so they run in parallel across processes and the
+output is identical for a given seed regardless of worker count. Memory
+stays flat: only a small window of chunks is alive at once.
+
+Per-user features use grouped operations within a chunk, in time order:
+  daily_txn_count → running count of the user's transactions that day
+  avg_amount_7d   → mean of the user's previous (up to) 20 amounts; the
+                    window restarts at each chunk boundary, falling back to
+                    the user's profile spend (as for a user's first txn)
+
+Usage:
+  python data/generate_dataset.py                                   # 50k → data/transactions.csv
+  python data/generate_dataset.py --rows 100000000 --format parquet --output data/transactions
+  python data/generate_dataset.py --rows 5000000 --partitioned --workers 8
+"""
+
+import os, argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
 import numpy as np
-from datetime import datetime, timedelta
-import random
-import os
+import pandas as pd
 
 # ─── Config ───────────────────────────────────────────────────────────────────
-random.seed(42)
-np.random.seed(42)
-
+SEED             = 42
 NUM_USERS        = 500
 NUM_TRANSACTIONS = 50000
+NUM_DAYS         = 365
+CHUNK_DAYS       = 7
 FRAUD_RATE       = 0.06
+BASE_DATE        = datetime(2024, 1, 1)
 OUTPUT_PATH      = os.path.join(os.path.dirname(__file__), "transactions.csv")
 
 # ─── Reference Data ───────────────────────────────────────────────────────────
@@ -34,6 +58,25 @@ MERCHANT_CATS = [
     "Fuel", "Healthcare", "Entertainment", "Utility", "Jewellery"
 ]
 
+CITY_NAMES = np.array([c[0] for c in CITIES], dtype=object)
+CITY_LAT   = np.array([c[1] for c in CITIES])
+CITY_LON   = np.array([c[2] for c in CITIES])
+
+FRAUD_HOURS     = np.array([0, 1, 2, 3, 22, 23])
+FRAUD_PAY_IDX   = np.array([PAYMENT_TYPES.index(p) for p in ("UPI", "Card", "Wallet")])
+FRAUD_MERCH_IDX = np.array([MERCHANT_CATS.index(m)
+                            for m in ("Jewellery", "Electronics", "Travel")])
+
+COLUMNS = [
+    "transaction_id", "user_id", "timestamp", "amount", "payment_type",
+    "merchant_category", "transaction_city", "transaction_lat",
+    "transaction_lon", "home_city", "home_lat", "home_lon",
+    "distance_from_home_km", "device_type", "user_home_device",
+    "device_mismatch", "card_age_days", "transaction_hour", "transaction_day",
+    "is_weekend", "is_night", "daily_txn_count", "avg_amount_7d",
+    "amount_vs_avg_ratio", "is_fraud",
+]
+
 
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 def haversine(lat1, lon1, lat2, lon2):
@@ -45,141 +88,227 @@ def haversine(lat1, lon1, lat2, lon2):
     return R * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
 
 
-def generate_users(n):
-    users = {}
-    for uid in range(1, n + 1):
-        home_city = random.choice(CITIES)
-        users[uid] = {
-            "user_id":       uid,
-            "home_city":     home_city[0],
-            "home_lat":      home_city[1],
-            "home_lon":      home_city[2],
-            "card_age_days": random.randint(30, 1825),
-            "avg_spend":     random.uniform(200, 15000),
-            "device":        random.choice(DEVICE_TYPES),
-        }
-    return users
-
-
-def pick_timestamp(base_date, is_fraud):
-    day_offset = random.randint(0, 364)
-    if is_fraud and random.random() < 0.6:
-        hour = random.choice([0, 1, 2, 3, 22, 23])
-    else:
-        hour = random.randint(7, 22)
-    return base_date + timedelta(
-        days=day_offset, hours=hour,
-        minutes=random.randint(0, 59), seconds=random.randint(0, 59)
-    )
+def generate_users(n: int, seed: int = SEED) -> dict:
+    """User profiles as column arrays indexed by user_id (index 0 unused)."""
+    rng = np.random.default_rng([seed, 0])
+    return {
+        "home_city":     np.concatenate([[0], rng.integers(0, len(CITIES), n)]),
+        "card_age_days": np.concatenate([[0], rng.integers(30, 1826, n)]),
+        "avg_spend":     np.concatenate([[0.0], rng.uniform(200, 15000, n)]),
+        "device":        np.concatenate([[0], rng.integers(0, len(DEVICE_TYPES), n)]),
+    }
+
+
+def plan_chunks(rows: int, days: int, chunk_days: int) -> list[tuple]:
+    """[(chunk_idx, first_day, end_day, n_rows, row_offset), ...]"""
+    bounds = list(range(0, days, chunk_days)) + [days]
+    plan, offset = [], 0
+    for k, (d0, d1) in enumerate(zip(bounds[:-1], bounds[1:])):
+        n = rows * d1 // days - rows * d0 // days
+        plan.append((k, d0, d1, n, offset))
+        offset += n
+    return plan
+
+
+def _group_starts(keys_sorted: np.ndarray) -> np.ndarray:
+    """For rows sorted by key, the index of the first row of each row's group."""
+    n     = len(keys_sorted)
+    new   = np.ones(n, dtype=bool)
+    new[1:] = keys_sorted[1:] != keys_sorted[:-1]
+    return np.maximum.accumulate(np.where(new, np.arange(n), 0))
+
+
+# ─── Chunk generation ─────────────────────────────────────────────────────────
+def generate_chunk(spec: tuple, users: dict, seed: int = SEED) -> pd.DataFrame:
+    k, d0, d1, n, offset = spec
+    rng = np.random.default_rng([seed, 1, k])
+
+    # Exactly FRAUD_RATE of the chunk is fraud
+    is_fraud = np.zeros(n, dtype=bool)
+    is_fraud[rng.choice(n, int(round(n * FRAUD_RATE)), replace=False)] = True
+
+    uid   = rng.integers(1, len(users["avg_spend"]), n)
+    home  = users["home_city"][uid]
+    spend = users["avg_spend"][uid]
+    hdev  = users["device"][uid]
+
+    # ── Timestamp ─────────────────────────────────────────────────────────────
+    day   = rng.integers(d0, d1, n)
+    night = is_fraud & (rng.random(n) < 0.6)
+    hour  = np.where(night, rng.choice(FRAUD_HOURS, n), rng.integers(7, 23, n))
+    secs  = (day * 86400 + hour * 3600
+             + rng.integers(0, 60, n) * 60 + rng.integers(0, 60, n))
+
+    # ── Amount ────────────────────────────────────────────────────────────────
+    fraud_amt = np.where(rng.random(n) < 0.5,
+                         rng.uniform(50000, 200000, n), rng.uniform(1, 10, n))
+    legit_amt = np.clip(rng.lognormal(np.log(np.maximum(spend, 1)), 0.8), 10, 80000)
+    amount    = np.round(np.where(is_fraud, fraud_amt, legit_amt), 2)
 
+    # ── Location ──────────────────────────────────────────────────────────────
+    away  = is_fraud & (rng.random(n) < 0.55)
+    city  = np.where(away, (home + rng.integers(1, len(CITIES), n)) % len(CITIES), home)
+    lat   = np.round(CITY_LAT[city] + rng.normal(0, 0.05, n), 4)
+    lon   = np.round(CITY_LON[city] + rng.normal(0, 0.05, n), 4)
+    dist  = np.round(haversine(CITY_LAT[home], CITY_LON[home], lat, lon), 2)
 
-def pick_location(user, is_fraud):
-    if is_fraud and random.random() < 0.55:
-        city = random.choice([c for c in CITIES if c[0] != user["home_city"]])
+    # ── Device / payment / merchant ───────────────────────────────────────────
+    swap   = is_fraud & (rng.random(n) < 0.45)
+    device = np.where(swap, (hdev + rng.integers(1, len(DEVICE_TYPES), n))
+                      % len(DEVICE_TYPES), hdev)
+    pay    = np.where(is_fraud, rng.choice(FRAUD_PAY_IDX, n),
+                      rng.integers(0, len(PAYMENT_TYPES), n))
+    merch  = rng.integers(0, len(MERCHANT_CATS), n)
+    merch  = np.where(is_fraud & (rng.random(n) < 0.5),
+                      rng.choice(FRAUD_MERCH_IDX, n), merch)
+
+    # ── Per-user rolling features (grouped, in time order) ────────────────────
+    by_user = np.lexsort((secs, uid))
+    u_sorted, d_sorted = uid[by_user], day[by_user]
+    a_sorted = amount[by_user]
+
+    pos       = np.arange(n)
+    user_pos  = pos - _group_starts(u_sorted)
+    day_key   = u_sorted.astype(np.int64) * 100_000 + d_sorted
+    daily_cnt = pos - _group_starts(day_key) + 1
+
+    window = np.minimum(user_pos, 20)
+    csum   = np.concatenate([[0.0], np.cumsum(a_sorted)])
+    prev   = csum[pos] - csum[pos - window]
+    avg7d  = np.where(window > 0, prev / np.maximum(window, 1), spend[by_user])
+
+    daily_txn_count = np.empty(n, dtype=np.int64)
+    avg_amount_7d   = np.empty(n)
+    daily_txn_count[by_user] = daily_cnt
+    avg_amount_7d[by_user]   = np.round(avg7d, 2)
+
+    # ── Assemble in time order ────────────────────────────────────────────────
+    order = np.lexsort((uid, secs))
+    ts    = np.datetime64(BASE_DATE, "s") + secs[order].astype("timedelta64[s]")
+    weekday = (ts.astype("datetime64[D]").view("int64") + 3) % 7   # 1970-01-01 = Thu
+
+    hour_o = hour[order]
+    df = pd.DataFrame({
+        "transaction_id":        np.char.add("TXN", np.char.zfill(
+                                     (offset + pos + 1).astype(str), 6)),
+        "user_id":               uid[order],
+        "timestamp":             ts,
+        "amount":                amount[order],
+        "payment_type":          np.array(PAYMENT_TYPES, dtype=object)[pay[order]],
+        "merchant_category":     np.array(MERCHANT_CATS, dtype=object)[merch[order]],
+        "transaction_city":      CITY_NAMES[city[order]],
+        "transaction_lat":       lat[order],
+        "transaction_lon":       lon[order],
+        "home_city":             CITY_NAMES[home[order]],
+        "home_lat":              CITY_LAT[home[order]],
+        "home_lon":              CITY_LON[home[order]],
+        "distance_from_home_km": dist[order],
+        "device_type":           np.array(DEVICE_TYPES, dtype=object)[device[order]],
+        "user_home_device":      np.array(DEVICE_TYPES, dtype=object)[hdev[order]],
+        "device_mismatch":       (device != hdev)[order].astype(np.int8),
+        "card_age_days":         users["card_age_days"][uid[order]],
+        "transaction_hour":      hour_o,
+        "transaction_day":       weekday,
+        "is_weekend":            (weekday >= 5).astype(np.int8),
+        "is_night":              ((hour_o < 6) | (hour_o >= 22)).astype(np.int8),
+        "daily_txn_count":       daily_txn_count[order],
+        "avg_amount_7d":         avg_amount_7d[order],
+        "amount_vs_avg_ratio":   np.round(amount[order] / (avg_amount_7d[order] + 1), 4),
+        "is_fraud":              is_fraud[order].astype(np.int8),
+    }, columns=COLUMNS)
+    return df
+
+
+# ─── Output ───────────────────────────────────────────────────────────────────
+def _write_part(df: pd.DataFrame, path: str, fmt: str):
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
     else:
-        city = next(c for c in CITIES if c[0] == user["home_city"])
-    lat = city[1] + np.random.normal(0, 0.05)
-    lon = city[2] + np.random.normal(0, 0.05)
-    return city[0], round(lat, 4), round(lon, 4)
+        df.to_csv(path, index=False, date_format="%Y-%m-%d %H:%M:%S")
+
+
+def _chunk_to_part(args) -> tuple:
+    """Worker: generate one chunk and write it as its own partition file."""
+    spec, users, seed, out_dir, fmt = args
+    df   = generate_chunk(spec, users, seed)
+    path = os.path.join(out_dir, f"part-{spec[0]:05d}.{fmt}")
+    _write_part(df, path, fmt)
+    return len(df), int(df["is_fraud"].sum())
 
 
-# ─── Main ─────────────────────────────────────────────────────────────────────
-def generate_dataset():
+def _chunk_frame(args) -> pd.DataFrame:
+    spec, users, seed = args
+    return generate_chunk(spec, users, seed)
+
+
+def generate_dataset(rows: int = NUM_TRANSACTIONS, users: int = NUM_USERS,
+                     days: int = NUM_DAYS, chunk_days: int = CHUNK_DAYS,
+                     seed: int = SEED, workers: int = None, fmt: str = "csv",
+                     output: str = OUTPUT_PATH, partitioned: bool = False) -> dict:
+    """
+    Generate `rows` transactions. Partitioned output writes one file per chunk
+    from the workers (data/<output>/part-NNNNN.<fmt>); otherwise chunks are
+    appended, in order, to a single CSV by the parent process.
+    """
     print("⚙️  Generating ArgusAI synthetic dataset...")
-    users     = generate_users(NUM_USERS)
-    base_date = datetime(2024, 1, 1)
-    records   = []
-
-    fraud_indices    = set(random.sample(range(NUM_TRANSACTIONS),
-                                         int(NUM_TRANSACTIONS * FRAUD_RATE)))
-    user_daily_counts = {}
-    user_recent_txns  = {}
-
-    for i in range(NUM_TRANSACTIONS):
-        is_fraud = i in fraud_indices
-        uid      = random.randint(1, NUM_USERS)
-        user     = users[uid]
-
-        ts       = pick_timestamp(base_date, is_fraud)
-        date_key = (uid, ts.date())
-        user_daily_counts[date_key] = user_daily_counts.get(date_key, 0) + 1
-
-        # Amount
-        if is_fraud:
-            amount = round(random.choice([
-                random.uniform(50000, 200000),
-                random.uniform(1, 10),
-            ]), 2)
-        else:
-            amount = round(np.random.lognormal(
-                mean=np.log(max(user["avg_spend"], 1)), sigma=0.8), 2)
-            amount = max(10, min(amount, 80000))
-
-        # Location
-        txn_city, txn_lat, txn_lon = pick_location(user, is_fraud)
-        distance = round(haversine(
-            user["home_lat"], user["home_lon"], txn_lat, txn_lon), 2)
-
-        # Device
-        if is_fraud and random.random() < 0.45:
-            device = random.choice([d for d in DEVICE_TYPES if d != user["device"]])
+    workers  = workers or os.cpu_count() or 1
+    profiles = generate_users(users, seed)
+    plan     = plan_chunks(rows, days, chunk_days)
+    total = frauds = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if partitioned or fmt == "parquet":
+            os.makedirs(output, exist_ok=True)
+            jobs = ((spec, profiles, seed, output, fmt) for spec in plan)
+            for n, f in pool.map(_chunk_to_part, jobs):
+                total, frauds = total + n, frauds + f
         else:
-            device = user["device"]
-
-        # 7-day avg
-        recent = user_recent_txns.get(uid, [])
-        avg_7d = round(np.mean(recent[-20:]) if recent else user["avg_spend"], 2)
-        user_recent_txns.setdefault(uid, []).append(amount)
-
-        # Payment type
-        pay_type = random.choice(["UPI", "Card", "Wallet"]) if is_fraud \
-                   else random.choice(PAYMENT_TYPES)
-
-        # Merchant
-        merchant_cat = random.choice(MERCHANT_CATS)
-        if is_fraud and random.random() < 0.5:
-            merchant_cat = random.choice(["Jewellery", "Electronics", "Travel"])
-
-        records.append({
-            "transaction_id":        f"TXN{i+1:06d}",
-            "user_id":               uid,
-            "timestamp":             ts.strftime("%Y-%m-%d %H:%M:%S"),
-            "amount":                amount,
-            "payment_type":          pay_type,
-            "merchant_category":     merchant_cat,
-            "transaction_city":      txn_city,
-            "transaction_lat":       txn_lat,
-            "transaction_lon":       txn_lon,
-            "home_city":             user["home_city"],
-            "home_lat":              user["home_lat"],
-            "home_lon":              user["home_lon"],
-            "distance_from_home_km": distance,
-            "device_type":           device,
-            "user_home_device":      user["device"],
-            "device_mismatch":       int(device != user["device"]),
-            "card_age_days":         user["card_age_days"],
-            "transaction_hour":      ts.hour,
-            "transaction_day":       ts.weekday(),
-            "is_weekend":            int(ts.weekday() >= 5),
-            "is_night":              int(ts.hour < 6 or ts.hour >= 22),
-            "daily_txn_count":       user_daily_counts[date_key],
-            "avg_amount_7d":         avg_7d,
-            "amount_vs_avg_ratio":   round(amount / (avg_7d + 1), 4),
-            "is_fraud":              int(is_fraud),
-        })
-
-    df = pd.DataFrame(records)
-    df = df.sort_values("timestamp").reset_index(drop=True)
-    df.to_csv(OUTPUT_PATH, index=False)
-
-    total  = len(df)
-    frauds = df["is_fraud"].sum()
-    print(f"✅ Dataset saved → {OUTPUT_PATH}")
-    print(f"   Total        : {total:,}")
-    print(f"   Fraud        : {frauds:,}  ({frauds/total*100:.1f}%)")
+            # Bounded window of in-flight chunks keeps parent memory flat
+            pending, first = [], True
+
+            def append(df):
+                nonlocal first, total, frauds
+                df.to_csv(output, mode="w" if first else "a", header=first,
+                          index=False, date_format="%Y-%m-%d %H:%M:%S")
+                first  = False
+                total  += len(df)
+                frauds += int(df["is_fraud"].sum())
+
+            for spec in plan:
+                pending.append(pool.submit(_chunk_frame, (spec, profiles, seed)))
+                if len(pending) >= workers * 2:
+                    append(pending.pop(0).result())
+            for fut in pending:
+                append(fut.result())
+
+    print(f"✅ Dataset saved → {output}")
+    print(f"   Total        : {total:,}  ({len(plan)} chunks, {workers} workers)")
+    print(f"   Fraud        : {frauds:,}  ({frauds/max(total,1)*100:.1f}%)")
     print(f"   Legitimate   : {total - frauds:,}")
-    return df
+    return {"rows": total, "fraud": frauds, "chunks": len(plan), "output": output}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="ArgusAI synthetic dataset generator")
+    ap.add_argument("--rows",       type=int, default=NUM_TRANSACTIONS)
+    ap.add_argument("--users",      type=int, default=NUM_USERS)
+    ap.add_argument("--days",       type=int, default=NUM_DAYS)
+    ap.add_argument("--chunk-days", type=int, default=CHUNK_DAYS,
+                    help="days per chunk (chunk = unit of parallelism + memory)")
+    ap.add_argument("--seed",       type=int, default=SEED)
+    ap.add_argument("--workers",    type=int, default=None)
+    ap.add_argument("--format",     choices=["csv", "parquet"], default="csv")
+    ap.add_argument("--partitioned", action="store_true",
+                    help="one file per chunk under --output (always on for parquet)")
+    ap.add_argument("--output",     default=None)
+    args = ap.parse_args()
+
+    partitioned = args.partitioned or args.format == "parquet"
+    output = args.output or (os.path.join(os.path.dirname(__file__), "transactions")
+                             if partitioned else OUTPUT_PATH)
+    generate_dataset(args.rows, args.users, args.days, args.chunk_days, args.seed,
+                     args.workers, args.format, output, partitioned)
 
 
 if __name__ == "__main__":
-    generate_dataset()
\ No newline at end of file
+    main()
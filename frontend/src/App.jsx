@@ -36,6 +36,18 @@ export default function App() {
       try {
         const txn = JSON.parse(e.data);
         if (txn.action === "pong") return;
+        if (txn.type === "backlog") {
+          // Recent history on (re)connect; merge with anything already shown
+          setTransactions(prev => {
+            const seen = new Set();
+            return [...prev, ...txn.transactions]
+              .filter(t => !seen.has(t.transaction_id) && seen.add(t.transaction_id))
+              .sort((a, b) => (b.processed_at || "").localeCompare(a.processed_at || ""))
+              .slice(0, 100);
+          });
+          setSelected(prev => prev ?? txn.transactions[0] ?? null);
+          return;
+        }
         setTransactions(prev => [txn, ...prev].slice(0, 100));
         setSelected(txn);   // auto-highlight latest
       } catch {}
@@ -221,7 +233,8 @@ export default function App() {
                   { label: "Method",   value: selected.payment_type || "—" },
                   { label: "Device",   value: selected.device_type || "—" },
                   { label: "Fraud %",  value: `${selected.fraud_prob || 0}%` },
-                  { label: "Anomaly",  value: selected.is_anomaly ? "⚠️ Yes" : "✅ No" },
+                  { label: "Anomaly",  value: selected.is_anomaly == null ? "— (not scored)"
+                                              : selected.is_anomaly ? "⚠️ Yes" : "✅ No" },
                 ].map((item, i) => (
                   <div key={i} style={{
                     display: "flex",
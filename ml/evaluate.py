@@ -0,0 +1,85 @@
+"""
+ArgusAI — Offline Evaluation & Threshold Calibration
+Scores the saved models against the cached feature matrix (ml/cache/), so
+re-evaluating or re-calibrating never re-parses the CSV.
+
+  - Reproduces train.py's 80/20 stratified split (random_state=42)
+  - Reports XGBoost ROC-AUC / average precision on the test split
+  - Recomputes the autoencoder threshold (95th percentile of reconstruction
+    error on normal training rows); --write-threshold saves it to
+    model_meta.json
+
+Usage: python ml/evaluate.py [--data data/transactions.csv] [--write-threshold]
+"""
+
+import os, sys, json, argparse, warnings
+warnings.filterwarnings("ignore")
+
+import numpy as np
+import joblib
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import roc_auc_score, average_precision_score
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ml.feature_cache import load_or_build
+
+BASE      = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE, "data", "transactions.csv")
+MODEL_DIR = os.path.join(BASE, "ml", "models")
+
+
+def _errors(ae_model, X, batch: int = 65_536) -> np.ndarray:
+    """Per-row reconstruction MSE, batched so X can stay memory-mapped."""
+    out = np.empty(len(X), dtype=np.float32)
+    for i in range(0, len(X), batch):
+        xb = np.asarray(X[i:i + batch])
+        out[i:i + batch] = np.mean(np.square(xb - ae_model.predict(xb, verbose=0)), axis=1)
+    return out
+
+
+def evaluate(data_path=DATA_PATH, model_dir=MODEL_DIR, percentile: float = 95.0,
+             write_threshold: bool = False) -> dict:
+    X, y, feature_cols, _, _ = load_or_build(data_path)
+
+    with open(os.path.join(model_dir, "model_meta.json")) as f:
+        meta = json.load(f)
+    if meta["feature_cols"] != feature_cols:
+        raise SystemExit("❌ Cached features do not match model_meta.json — retrain first")
+
+    idx_train, idx_test = train_test_split(
+        np.arange(len(y)), test_size=0.2, random_state=42, stratify=y)
+    idx_train.sort(); idx_test.sort()
+
+    print("\n📊 Evaluating XGBoost...")
+    xgb_model = joblib.load(os.path.join(model_dir, "xgb_model.joblib"))
+    y_test    = np.asarray(y[idx_test])
+    y_prob    = xgb_model.predict_proba(X[idx_test])[:, 1]
+    auc       = roc_auc_score(y_test, y_prob)
+    ap        = average_precision_score(y_test, y_prob)
+    print(f"   ROC-AUC: {auc:.4f}  |  Avg Precision: {ap:.4f}")
+
+    print("\n🧠 Calibrating autoencoder threshold...")
+    from tensorflow import keras
+    ae_model  = keras.models.load_model(os.path.join(model_dir, "autoencoder.keras"))
+    normal    = idx_train[np.asarray(y[idx_train]) == 0]
+    threshold = float(np.percentile(_errors(ae_model, X[normal]), percentile))
+    print(f"   Threshold ({percentile:g}th pct): {threshold:.6f}  "
+          f"(saved: {meta['ae_threshold']:.6f})")
+
+    if write_threshold:
+        meta["ae_threshold"] = threshold
+        with open(os.path.join(model_dir, "model_meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        print("   ✅ model_meta.json updated")
+
+    return {"roc_auc": auc, "avg_precision": ap, "ae_threshold": threshold}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Evaluate saved models on the cached feature matrix")
+    ap.add_argument("--data",       default=DATA_PATH)
+    ap.add_argument("--models",     default=MODEL_DIR)
+    ap.add_argument("--percentile", type=float, default=95.0)
+    ap.add_argument("--write-threshold", action="store_true")
+    args = ap.parse_args()
+    evaluate(args.data, args.models, args.percentile, args.write_threshold)
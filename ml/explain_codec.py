@@ -0,0 +1,71 @@
+"""
+ArgusAI — Packed SHAP Explanations
+The audit log stores each explanation as (feature index, float32 SHAP value)
+pairs, 5 bytes each, instead of a JSON list that repeats keys, labels and
+direction strings on every row. Label, direction and impact are derived
+from the value when the row is read, by the same explanation() the engine
+uses when scoring (ml/predict.py), so a decoded row matches what was
+broadcast.
+
+Indices refer to FEATURE_COLS, the model feature order in model_meta.json.
+They are stored, so the list is append-only: new features go at the end.
+
+Deliberately free of numpy/XGBoost/TensorFlow imports — the DB layer uses it.
+"""
+
+import json, struct
+
+# Model feature order (model_meta.json "feature_cols"). Append-only.
+FEATURE_COLS = [
+    "amount", "distance_from_home_km", "card_age_days",
+    "transaction_hour", "transaction_day",
+    "is_weekend", "is_night", "device_mismatch",
+    "daily_txn_count", "avg_amount_7d", "amount_vs_avg_ratio",
+    "payment_type_enc", "merchant_category_enc", "device_type_enc",
+]
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_COLS)}
+
+FEATURE_LABELS = {
+    "amount":                  "Transaction amount",
+    "distance_from_home_km":   "Distance from home",
+    "is_night":                "Night-time transaction",
+    "device_mismatch":         "Device mismatch",
+    "transaction_hour":        "Transaction hour",
+    "amount_vs_avg_ratio":     "Amount vs 7-day average",
+    "daily_txn_count":         "Daily transaction count",
+    "card_age_days":           "Card age",
+    "payment_type_enc":        "Payment method",
+    "merchant_category_enc":   "Merchant category",
+}
+
+_PAIR = struct.Struct("<Bf")
+
+
+def explanation(feature: str, value: float) -> dict:
+    """
+    One explanation entry, as returned by the engine and the API. Direction
+    and impact follow the rounded value, which is what gets stored.
+    """
+    value = round(float(value), 4)
+    return {
+        "feature":   feature,
+        "label":     FEATURE_LABELS.get(feature, feature.replace("_", " ").title()),
+        "shap_val":  value,
+        "direction": "↑ increases" if value > 0 else "↓ decreases",
+        "impact":    "HIGH" if abs(value) > 0.3 else
+                     "MEDIUM" if abs(value) > 0.1 else "LOW",
+    }
+
+
+def pack(explanations: list[dict]) -> bytes:
+    return b"".join(_PAIR.pack(FEATURE_INDEX[e["feature"]], e["shap_val"])
+                    for e in explanations)
+
+
+def unpack(stored) -> list[dict]:
+    """Explanations from a stored value: packed bytes, or legacy JSON text."""
+    if not stored:
+        return []
+    if isinstance(stored, str):
+        return json.loads(stored)
+    return [explanation(FEATURE_COLS[i], value) for i, value in _PAIR.iter_unpack(stored)]
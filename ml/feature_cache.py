@@ -0,0 +1,145 @@
+"""
+ArgusAI — Feature Matrix Cache
+Materialises the encoded + scaled feature matrix and labels once, as .npy
+files that later runs memory-map with zero parsing.
+
+Cache entries live in ml/cache/<key>/ and are keyed by a content hash of the
+source data (a CSV file or every partition in a directory) plus the feature
+spec (NUMERIC_FEATURES, CATEGORICAL_FEATURES, TARGET). Editing the data or
+the feature lists changes the key, so stale matrices are never reused.
+
+  X.npy                  float32 (rows × features), scaled
+  y.npy                  int32 labels
+  scaler.joblib          StandardScaler the matrix was scaled with
+  label_encoders.joblib  per-column LabelEncoders
+  meta.json              key, source, feature_cols, n_rows, fraud_rate
+
+Usage:
+  from ml.feature_cache import load_or_build
+  X, y, feature_cols, le_dict, scaler = load_or_build("data/transactions.csv")
+"""
+
+import os, glob, json, shutil, hashlib, tempfile
+from datetime import datetime
+
+import numpy as np
+import joblib
+
+from ml.features import (NUMERIC_FEATURES, CATEGORICAL_FEATURES, TARGET,
+                         StreamingPreprocessor, iter_frames)
+
+CACHE_DIR      = os.path.join(os.path.dirname(__file__), "cache")
+FORMAT_VERSION = 1
+_HASH_BLOCK    = 1 << 22       # 4 MiB
+
+
+def _source_files(path: str) -> list[str]:
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.parquet"))
+                      + glob.glob(os.path.join(path, "*.csv")))
+    return [path]
+
+
+def cache_key(path: str) -> str:
+    """Content hash of the source data + feature spec."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps({
+        "version":     FORMAT_VERSION,
+        "numeric":     NUMERIC_FEATURES,
+        "categorical": CATEGORICAL_FEATURES,
+        "target":      TARGET,
+    }, sort_keys=True).encode())
+    for f in _source_files(path):
+        h.update(os.path.basename(f).encode())
+        with open(f, "rb") as fh:
+            for block in iter(lambda: fh.read(_HASH_BLOCK), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def load_entry(entry: str):
+    with open(os.path.join(entry, "meta.json")) as f:
+        meta = json.load(f)
+    X = np.load(os.path.join(entry, "X.npy"), mmap_mode="r")
+    y = np.load(os.path.join(entry, "y.npy"), mmap_mode="r")
+    le_dict = joblib.load(os.path.join(entry, "label_encoders.joblib"))
+    scaler  = joblib.load(os.path.join(entry, "scaler.joblib"))
+    return X, y, meta["feature_cols"], le_dict, scaler
+
+
+def build(path: str, key: str, chunksize: int = 500_000) -> str:
+    """Two streaming passes: fit encoders/scaler, then write scaled rows."""
+    print(f"🧱 Building feature cache for {path}...")
+    prep = StreamingPreprocessor()
+    for df in iter_frames(path, chunksize):
+        prep.partial_fit(df)
+    le_dict, scaler = prep.finalize()
+    feature_cols = NUMERIC_FEATURES + [c + "_enc" for c in CATEGORICAL_FEATURES]
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=f".{key}-", dir=CACHE_DIR)
+    X_out = np.lib.format.open_memmap(os.path.join(tmp, "X.npy"), mode="w+",
+                                      dtype=np.float32,
+                                      shape=(prep.n_rows, len(feature_cols)))
+    y_out = np.lib.format.open_memmap(os.path.join(tmp, "y.npy"), mode="w+",
+                                      dtype=np.int32, shape=(prep.n_rows,))
+    row = 0
+    for df in iter_frames(path, chunksize):
+        X, y = prep.transform(df)
+        X_out[row:row + len(y)] = X
+        y_out[row:row + len(y)] = y
+        row += len(y)
+    X_out.flush(); y_out.flush()
+    del X_out, y_out
+
+    joblib.dump(scaler,  os.path.join(tmp, "scaler.joblib"))
+    joblib.dump(le_dict, os.path.join(tmp, "label_encoders.joblib"))
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump({
+            "key":          key,
+            "source":       os.path.abspath(path),
+            "feature_cols": feature_cols,
+            "n_rows":       prep.n_rows,
+            "fraud_rate":   prep.n_fraud / max(prep.n_rows, 1),
+            "created_at":   datetime.utcnow().isoformat(),
+        }, f, indent=2)
+
+    # Publish atomically so a crashed build is never picked up
+    entry = os.path.join(CACHE_DIR, key)
+    try:
+        os.replace(tmp, entry)
+    except OSError:                      # another process published it first
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(f"   Cached {prep.n_rows:,} rows → {os.path.relpath(entry)}")
+    return entry
+
+
+def ensure(path: str, chunksize: int = 500_000, rebuild: bool = False) -> str:
+    """Return the cache entry directory for `path`, building it if needed."""
+    key   = cache_key(path)
+    entry = os.path.join(CACHE_DIR, key)
+    if rebuild and os.path.isdir(entry):
+        shutil.rmtree(entry)
+    if os.path.isdir(entry):
+        print(f"⚡ Feature cache hit ({key[:12]}) — skipping CSV parsing")
+    else:
+        build(path, key, chunksize)
+    return entry
+
+
+def load_or_build(path: str, chunksize: int = 500_000, rebuild: bool = False):
+    """
+    Return (X, y, feature_cols, le_dict, scaler) for `path`, with X and y
+    memory-mapped from the cache, building the entry first if needed.
+    """
+    return load_entry(ensure(path, chunksize, rebuild))
+
+
+def prune(keep: int = 3):
+    """Delete all but the `keep` most recently used cache entries."""
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = sorted((os.path.join(CACHE_DIR, d) for d in os.listdir(CACHE_DIR)
+                      if not d.startswith(".")), key=os.path.getatime, reverse=True)
+    for entry in entries[keep:]:
+        shutil.rmtree(entry, ignore_errors=True)
@@ -0,0 +1,121 @@
+"""
+ArgusAI — Feature Spec & Streaming Preprocessing
+Model feature lists plus the chunked readers and single-pass encoder/scaler
+fitting shared by ml/train.py (--stream) and ml/feature_cache.py.
+Deliberately free of XGBoost/TensorFlow imports so it loads fast.
+"""
+
+import os, glob
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+
+# ─── Features ─────────────────────────────────────────────────────────────────
+NUMERIC_FEATURES = [
+    "amount", "distance_from_home_km", "card_age_days",
+    "transaction_hour", "transaction_day",
+    "is_weekend", "is_night", "device_mismatch",
+    "daily_txn_count", "avg_amount_7d", "amount_vs_avg_ratio",
+]
+
+CATEGORICAL_FEATURES = ["payment_type", "merchant_category", "device_type"]
+TARGET = "is_fraud"
+
+
+# ─── Streaming preprocessing ──────────────────────────────────────────────────
+TEST_FRACTION = 0.2
+VAL_FRACTION  = 0.1     # of the train split, held out for early stopping
+SPLIT_SEED    = 42
+
+
+def iter_frames(path, chunksize: int = 500_000):
+    """Yield DataFrames of the model columns from a CSV or a partition dir."""
+    cols = NUMERIC_FEATURES + CATEGORICAL_FEATURES + [TARGET]
+    if os.path.isdir(path):
+        parts = sorted(glob.glob(os.path.join(path, "*.parquet"))
+                       + glob.glob(os.path.join(path, "*.csv")))
+        for part in parts:
+            if part.endswith(".parquet"):
+                yield pd.read_parquet(part, columns=cols)
+            else:
+                yield from pd.read_csv(part, usecols=cols, chunksize=chunksize)
+    else:
+        yield from pd.read_csv(path, usecols=cols, chunksize=chunksize)
+
+
+class StreamingPreprocessor:
+    """
+    One streaming pass fits everything train() fits in memory: label
+    encoders (sorted vocabularies, exactly as LabelEncoder.fit would produce),
+    a StandardScaler over the 14 encoded features, and class counts.
+    Categorical columns are tallied as value counts, so their scaler moments
+    are computed once the vocabulary is final.
+    """
+
+    def __init__(self):
+        self.num_scaler = StandardScaler()
+        self.cat_counts = {col: {} for col in CATEGORICAL_FEATURES}
+        self.n_fraud    = 0
+        self.n_rows     = 0
+
+    def partial_fit(self, df: pd.DataFrame):
+        self.num_scaler.partial_fit(df[NUMERIC_FEATURES].values.astype(np.float64))
+        for col in CATEGORICAL_FEATURES:
+            counts = self.cat_counts[col]
+            for val, n in df[col].astype(str).value_counts().items():
+                counts[val] = counts.get(val, 0) + int(n)
+        self.n_fraud += int(df[TARGET].sum())
+        self.n_rows  += len(df)
+
+    def finalize(self):
+        le_dict, means, variances = {}, [], []
+        for col in CATEGORICAL_FEATURES:
+            vocab = sorted(self.cat_counts[col])
+            le = LabelEncoder()
+            le.classes_ = np.array(vocab, dtype=object)
+            le_dict[col] = le
+            codes  = np.arange(len(vocab), dtype=np.float64)
+            counts = np.array([self.cat_counts[col][v] for v in vocab], dtype=np.float64)
+            mean   = float((codes * counts).sum() / counts.sum())
+            means.append(mean)
+            variances.append(float(((codes - mean) ** 2 * counts).sum() / counts.sum()))
+
+        scaler = StandardScaler()
+        scaler.mean_            = np.concatenate([self.num_scaler.mean_, means])
+        scaler.var_             = np.concatenate([self.num_scaler.var_, variances])
+        scaler.scale_           = np.where(scaler.var_ > 0, np.sqrt(scaler.var_), 1.0)
+        scaler.n_samples_seen_  = self.n_rows
+        scaler.n_features_in_   = len(scaler.mean_)
+        self.le_dict, self.scaler = le_dict, scaler
+        return le_dict, scaler
+
+    def transform(self, df: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        X = np.empty((len(df), len(NUMERIC_FEATURES) + len(CATEGORICAL_FEATURES)),
+                     dtype=np.float32)
+        X[:, :len(NUMERIC_FEATURES)] = df[NUMERIC_FEATURES].values
+        for j, col in enumerate(CATEGORICAL_FEATURES, start=len(NUMERIC_FEATURES)):
+            X[:, j] = self.le_dict[col].transform(df[col].astype(str))
+        X = self.scaler.transform(X).astype(np.float32)
+        return X, df[TARGET].values.astype(np.int32)
+
+
+def iter_split(path, prep: StreamingPreprocessor, part: str,
+               chunksize: int, normal_only: bool = False):
+    """
+    Yield scaled (X, y) chunks of the "train" or "test" split. Rows are
+    assigned by a per-chunk seeded draw, so every pass sees the same split.
+    "fit" and "val" divide "train" further: VAL_FRACTION of it is "val".
+    """
+    val_end = TEST_FRACTION + VAL_FRACTION * (1 - TEST_FRACTION)
+    for i, df in enumerate(iter_frames(path, chunksize)):
+        draw    = np.random.default_rng([SPLIT_SEED, i]).random(len(df))
+        is_test = draw < TEST_FRACTION
+        is_val  = ~is_test & (draw < val_end)
+        mask    = {"test": is_test, "train": ~is_test,
+                   "fit":  ~is_test & ~is_val, "val": is_val}[part]
+        X, y = prep.transform(df[mask])
+        if normal_only:
+            X, y = X[y == 0], y[y == 0]
+        if len(y):
+            yield X, y
@@ -5,6 +5,7 @@ Returns: risk_score (0-100), risk_level, action, shap_explanation
 """
 
 import os, json, warnings
+from time import perf_counter
 warnings.filterwarnings("ignore")
 
 import numpy as np
@@ -12,8 +13,17 @@ import joblib
 import shap
 import tensorflow as tf
 
+from ml.fast_trees    import FlatForest, check_parity
+from ml.explain_codec import explanation, FEATURE_INDEX
+from ml.records       import Transaction, Decision, row_getter
+from ml.rules         import rules
+
 # ─── Paths ────────────────────────────────────────────────────────────────────
-MODEL_DIR = os.path.join(os.path.dirname(__file__), "models")
+MODEL_DIR       = os.path.join(os.path.dirname(__file__), "models")
+DEFAULT_VERSION = "ArgusAI-v1.0"     # artifact sets saved before versioning
+FAST_TREES      = os.getenv("ARGUS_FAST_TREES", "1") == "1"
+CASCADE         = os.getenv("ARGUS_CASCADE", "0") == "1"
+AE_WEIGHT       = 25.0               # max autoencoder contribution to risk
 
 # ─── Thresholds → risk levels ─────────────────────────────────────────────────
 RISK_THRESHOLDS = {
@@ -23,55 +33,104 @@ RISK_THRESHOLDS = {
 }
 
 
-# ─── Singleton model loader ────────────────────────────────────────────────────
+# Categorical column → values the encoders had never seen, across every
+# engine this process has loaded (monotonic, exported as a counter)
+UNSEEN: dict = {}
+
+
+# ─── Model engine ─────────────────────────────────────────────────────────────
 class FraudEngine:
-    _instance = None
+    """One artifact set (a model directory). See ml/registry.py for versions."""
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._loaded = False
-        return cls._instance
+    def __init__(self, model_dir: str = MODEL_DIR):
+        self.model_dir = model_dir
+        self._loaded   = False
+        self.unseen    = UNSEEN
 
     def load(self):
         if self._loaded:
             return
-        print("🔄 Loading ArgusAI models...")
+        print(f"🔄 Loading ArgusAI models from {self.model_dir}...")
+        d = self.model_dir
 
-        self.xgb_model    = joblib.load(os.path.join(MODEL_DIR, "xgb_model.joblib"))
-        self.scaler       = joblib.load(os.path.join(MODEL_DIR, "scaler.joblib"))
-        self.le_dict      = joblib.load(os.path.join(MODEL_DIR, "label_encoders.joblib"))
-        self.explainer    = joblib.load(os.path.join(MODEL_DIR, "shap_explainer.joblib"))
+        self.xgb_model    = joblib.load(os.path.join(d, "xgb_model.joblib"))
+        self.scaler       = joblib.load(os.path.join(d, "scaler.joblib"))
+        self.le_dict      = joblib.load(os.path.join(d, "label_encoders.joblib"))
+        self.explainer    = joblib.load(os.path.join(d, "shap_explainer.joblib"))
         self.autoencoder  = tf.keras.models.load_model(
-                                os.path.join(MODEL_DIR, "autoencoder.keras"))
+                                os.path.join(d, "autoencoder.keras"))
 
-        with open(os.path.join(MODEL_DIR, "model_meta.json")) as f:
+        with open(os.path.join(d, "model_meta.json")) as f:
             self.meta = json.load(f)
 
+        self.fast_xgb      = self._flatten_xgb() if FAST_TREES else None
+        self.version       = self.meta.get("version", DEFAULT_VERSION)
         self.ae_threshold  = self.meta["ae_threshold"]
         self.feature_cols  = self.meta["feature_cols"]
         self.num_features  = self.meta["numeric_features"]
         self.cat_features  = self.meta["cat_features"]
+        # The audit log stores explanations by feature index (ml/explain_codec.py)
+        unknown = [c for c in self.feature_cols if c not in FEATURE_INDEX]
+        if unknown:
+            raise ValueError(f"features not in explain_codec.FEATURE_COLS: {unknown}")
+        # Feature row straight off the record; categories → encoder index by dict
+        # lookup (LabelEncoder.transform per value costs tens of µs)
+        self._numeric_row  = row_getter(self.num_features, [0] * len(self.num_features))
+        self._cat_codes    = {col: {str(c): i for i, c in enumerate(self.le_dict[col].classes_)}
+                              for col in self.cat_features}
         self._loaded       = True
-        print("✅ Models loaded.")
+        print(f"✅ Models loaded ({self.version}).")
+
+    def _flatten_xgb(self):
+        """FlatForest for single-row scoring, if it reproduces predict_proba exactly."""
+        try:
+            forest = FlatForest.from_model(self.xgb_model)
+        except ValueError as e:
+            print(f"   Flat tree evaluator unavailable ({e}) — using XGBoost")
+            return None
+        rows   = np.random.default_rng(0).normal(size=(256, forest.n_features))
+        parity = check_parity(forest, self.xgb_model, rows.astype(np.float32))
+        if not parity["exact"]:
+            print(f"   Flat tree evaluator off: {parity['mismatches']} rows differ "
+                  f"(max {parity['max_ulp']} ulp) — using XGBoost")
+            return None
+        return forest
+
+    def warmup(self, n: int = 32, batch: int = 64, seed: int = 0):
+        """
+        Score `n` synthetic transactions end to end and push a `batch`-row
+        block through each model, so graph tracing, lazy allocations and
+        SHAP setup happen now rather than on the first live request.
+        """
+        self.load()
+        rng   = np.random.default_rng(seed)
+        n_num = len(self.num_features)
+        mean, scale = self.scaler.mean_[:n_num], self.scaler.scale_[:n_num]
+        for i in range(n):
+            values = np.maximum(mean + scale * rng.normal(size=n_num), 0)
+            txn    = dict(zip(self.num_features, values.tolist()))
+            for col in self.cat_features:
+                classes  = self.le_dict[col].classes_
+                txn[col] = classes[i % len(classes)]
+            self.predict(txn, count=False)
+        X = rng.normal(size=(batch, len(self.feature_cols))).astype(np.float32)
+        self.xgb_model.predict_proba(X)
+        self.autoencoder.predict(X, verbose=0)
+        self.explainer.shap_values(X[:1])
 
     # ── Feature vector ─────────────────────────────────────────────────────────
-    def _build_features(self, txn: dict) -> np.ndarray:
-        row = []
-
+    def _build_features(self, txn: Transaction, count: bool = True) -> np.ndarray:
         # Numeric
-        for col in self.num_features:
-            row.append(float(txn.get(col, 0)))
+        row = list(self._numeric_row(txn))
 
         # Categorical encoded
         for col in self.cat_features:
-            le  = self.le_dict[col]
-            val = str(txn.get(col, ""))
-            try:
-                enc = le.transform([val])[0]
-            except ValueError:
+            enc = self._cat_codes[col].get(str(txn.get(col, "")))
+            if enc is None:
                 enc = 0   # unseen category → default 0
-            row.append(float(enc))
+                if count:
+                    self.unseen[col] = self.unseen.get(col, 0) + 1
+            row.append(enc)
 
         return np.array(row, dtype=np.float32).reshape(1, -1)
 
@@ -82,20 +141,22 @@ class FraudEngine:
         Combine signals into 0-100 risk score.
         Weights:  XGBoost 60%  |  Autoencoder 25%  |  Rules 15%
         """
-        xgb_component = fraud_prob * 60
+        return self._combine(fraud_prob, self._ae_component(anomaly_score),
+                             self._rule_score(txn))
 
-        # Normalize anomaly score to 0-1 range
+    def _ae_component(self, anomaly_score: float) -> float:
+        # Normalize anomaly score to 0-1 range, weighted 0-25
         ae_norm  = min(anomaly_score / (self.ae_threshold * 3), 1.0)
-        ae_component = ae_norm * 25
+        return ae_norm * AE_WEIGHT
 
-        # Rule-based component (0-15)
-        rule_score = 0
-        if txn.get("is_night"):            rule_score += 4
-        if txn.get("device_mismatch"):     rule_score += 4
-        if txn.get("distance_from_home_km", 0) > 500:  rule_score += 4
-        if txn.get("amount_vs_avg_ratio",  0) > 5:      rule_score += 3
+    @staticmethod
+    def _rule_score(txn: dict, count: bool = True) -> float:
+        # Rule-based component (0-15), from ml/rules.json (see ml/rules.py)
+        return rules.score(txn, count)
 
-        risk = xgb_component + ae_component + min(rule_score, 15)
+    @staticmethod
+    def _combine(fraud_prob: float, ae_component: float, rule_score: float) -> float:
+        risk = fraud_prob * 60 + ae_component + rule_score
         return round(min(max(risk, 0), 100), 2)
 
     # ── Decision ──────────────────────────────────────────────────────────────
@@ -116,74 +177,114 @@ class FraudEngine:
         pairs = sorted(zip(feature_names, shap_vals),
                        key=lambda x: abs(x[1]), reverse=True)
 
-        explanations = []
-        label_map = {
-            "amount":                  "Transaction amount",
-            "distance_from_home_km":   "Distance from home",
-            "is_night":                "Night-time transaction",
-            "device_mismatch":         "Device mismatch",
-            "transaction_hour":        "Transaction hour",
-            "amount_vs_avg_ratio":     "Amount vs 7-day average",
-            "daily_txn_count":         "Daily transaction count",
-            "card_age_days":           "Card age",
-            "payment_type_enc":        "Payment method",
-            "merchant_category_enc":   "Merchant category",
-        }
-
-        for feat, val in pairs[:top_n]:
-            direction = "↑ increases" if val > 0 else "↓ decreases"
-            label     = label_map.get(feat, feat.replace("_", " ").title())
-            explanations.append({
-                "feature":   feat,
-                "label":     label,
-                "shap_val":  round(float(val), 4),
-                "direction": direction,
-                "impact":    "HIGH" if abs(val) > 0.3 else
-                             "MEDIUM" if abs(val) > 0.1 else "LOW",
-            })
-        return explanations
+        return [explanation(feat, val) for feat, val in pairs[:top_n]]
 
     # ── Main Predict ───────────────────────────────────────────────────────────
-    def predict(self, txn: dict) -> dict:
+    def predict(self, txn, timings: dict = None, cascade: bool = None,
+                tier: int = 0, count: bool = True) -> Decision:
+        """
+        Score one transaction. If `timings` is given, it is filled with the
+        seconds spent in each stage (features, scaler, xgb, rules, ae, fuse,
+        shap); "rules" includes the cascade bounds check.
+        count=False (warmup, shadow scoring) leaves the process-wide counters
+        (rule hits, UNSEEN categories) untouched.
+
+        Cascade mode (ARGUS_CASCADE=1, or cascade=True) runs the cheap stages
+        first. Once XGBoost and the rules are known the autoencoder can only
+        add 0-25 points; if both ends of that range land on the same action,
+        the AE is skipped and the AE-free score (the lower bound) reported,
+        with anomaly_score and is_anomaly None (not computed).
+        SHAP is only computed for OTP/BLOCK decisions. Actions are identical
+        to full scoring (see ml/verify_cascade.py); result["cascade"] records
+        what was skipped.
+
+        `tier` > 0 is degraded scoring under load (backend/shedding.py):
+        1 skips SHAP, 2 also runs the AE only when it can change the action,
+        3 never runs the AE (rules + XGBoost, lower-bound score). Tier 3 may
+        under-score transactions the AE would have pushed over a threshold.
+        """
         self.load()
+        txn     = Transaction.of(txn)
+        cascade = (CASCADE if cascade is None else cascade) or tier >= 2
+        t = timings if timings is not None else {}
+        t0 = perf_counter()
 
         # Build feature vector
-        X_raw    = self._build_features(txn)
+        X_raw    = self._build_features(txn, count)
+        t1 = perf_counter();  t["features"] = t1 - t0
         X_scaled = self.scaler.transform(X_raw)
+        t0 = perf_counter();  t["scaler"] = t0 - t1
 
         # XGBoost fraud probability
-        fraud_prob = float(self.xgb_model.predict_proba(X_scaled)[0][1])
+        if self.fast_xgb is not None:
+            fraud_prob = self.fast_xgb.predict_one(X_scaled[0])
+        else:
+            fraud_prob = float(self.xgb_model.predict_proba(X_scaled)[0][1])
+        t1 = perf_counter();  t["xgb"] = t1 - t0
+
+        rules   = self._rule_score(txn, count)
+        skipped = []
+        bounds  = None
+        if cascade:
+            bounds = (self._combine(fraud_prob, 0.0, rules),
+                      self._combine(fraud_prob, AE_WEIGHT, rules))
+            if tier >= 3 or self._decide(bounds[0])[1] == self._decide(bounds[1])[1]:
+                skipped.append("ae")
+        t0 = perf_counter();  t["rules"] = t0 - t1; t1 = t0
 
         # Autoencoder anomaly
-        recon        = self.autoencoder.predict(X_scaled, verbose=0)
-        ae_error     = float(np.mean(np.square(X_scaled - recon)))
-        is_anomaly   = ae_error > self.ae_threshold
+        if "ae" in skipped:
+            ae_error, is_anomaly = None, None
+            risk_score = bounds[0]
+        else:
+            recon      = self.autoencoder.predict(X_scaled, verbose=0)
+            ae_error   = float(np.mean(np.square(X_scaled - recon)))
+            is_anomaly = ae_error > self.ae_threshold
+            t0 = perf_counter();  t["ae"] = t0 - t1; t1 = t0
 
-        # Fuse risk score
-        risk_score   = self._fuse_risk(fraud_prob, ae_error, is_anomaly, txn)
+            # Fuse risk score
+            risk_score = self._combine(fraud_prob, self._ae_component(ae_error), rules)
         risk_level, action, message = self._decide(risk_score)
+        t0 = perf_counter();  t["fuse"] = t0 - t1
 
         # SHAP explanations
-        explanations = self._explain(X_scaled)
-
-        return {
-            "risk_score":      risk_score,
-            "risk_level":      risk_level,
-            "action":          action,
-            "message":         message,
-            "fraud_prob":      round(fraud_prob * 100, 2),
-            "anomaly_score":   round(ae_error, 6),
-            "is_anomaly":      bool(is_anomaly),
-            "shap_explanation": explanations,
-            "model_version":   "ArgusAI-v1.0",
-        }
-
-
-# ─── Singleton accessor ───────────────────────────────────────────────────────
-_engine = FraudEngine()
-
-def predict_transaction(txn: dict) -> dict:
-    return _engine.predict(txn)
+        if tier >= 1 or (cascade and action == "ALLOW"):
+            skipped.append("shap")
+            explanations = []
+        else:
+            explanations = self._explain(X_scaled)
+            t["shap"] = perf_counter() - t0
+
+        result = Decision(
+            risk_score       = risk_score,
+            risk_level       = risk_level,
+            action           = action,
+            message          = message,
+            fraud_prob       = round(fraud_prob * 100, 2),
+            anomaly_score    = round(ae_error, 6) if ae_error is not None else None,
+            is_anomaly       = bool(is_anomaly) if ae_error is not None else None,
+            shap_explanation = explanations,
+            model_version    = self.version,
+        )
+        if cascade or tier:
+            result.cascade = {
+                "early_exit":  "ae" in skipped,
+                "skipped":     skipped,
+                "risk_bounds": list(bounds) if bounds else None,
+            }
+        return result
+
+
+# ─── Accessors ────────────────────────────────────────────────────────────────
+def predict_transaction(txn, timings: dict = None, tier: int = 0) -> Decision:
+    """Score with the registry's active model (see ml/registry.py)."""
+    from ml.registry import registry
+    return registry.predict(txn, timings, tier)
+
+
+def unseen_category_counts() -> dict:
+    """Categorical column → number of values the encoders had never seen."""
+    return dict(UNSEEN)
 
 
 # ─── Quick test ───────────────────────────────────────────────────────────────
@@ -209,6 +310,6 @@ if __name__ == "__main__":
 
     import json
     print("\n=== LEGITIMATE TRANSACTION ===")
-    print(json.dumps(predict_transaction(sample_legit), indent=2))
+    print(json.dumps(predict_transaction(sample_legit).as_dict(), indent=2))
     print("\n=== FRAUD TRANSACTION ===")
-    print(json.dumps(predict_transaction(sample_fraud), indent=2))
+    print(json.dumps(predict_transaction(sample_fraud).as_dict(), indent=2))
@@ -0,0 +1,149 @@
+"""
+ArgusAI — Transaction & Decision Records
+Slotted record types for what travels down the scoring path:
+
+  Transaction  a scored transaction (TransactionInput's fields, plus any
+               extra keys, e.g. the simulator's coordinates, in `extra`)
+  Decision     the engine's result plus what the API adds afterwards
+               (degraded, tier, fingerprint, otp_*, replayed)
+
+A record has no per-instance __dict__, and its fields are read with one
+attrgetter call: row_getter() turns a record into a feature row or an
+audit-log tuple with no intermediate dict.
+
+Records are also mutable mappings, so code written against the old dicts
+(txn.get(...), result["action"], {**txn, **result}) keeps working. A field
+that was never assigned is absent, as a missing dict key would be. JSON
+encoders go through as_dict() (backend/encoding.py).
+"""
+
+from collections.abc import MutableMapping
+from operator import attrgetter
+
+# Order of TransactionInput (backend/main.py)
+TXN_FIELDS = (
+    "transaction_id", "user_id", "timestamp", "amount", "payment_type",
+    "merchant_category", "transaction_city", "distance_from_home_km",
+    "device_type", "device_mismatch", "card_age_days", "transaction_hour",
+    "transaction_day", "is_weekend", "is_night", "daily_txn_count",
+    "avg_amount_7d", "amount_vs_avg_ratio",
+)
+
+DECISION_FIELDS = (
+    "risk_score", "risk_level", "action", "message", "fraud_prob",
+    "anomaly_score", "is_anomaly", "shap_explanation", "model_version", "cascade",
+    # Set by the API after scoring
+    "degraded", "tier", "fingerprint", "otp_sent", "otp", "otp_deferred", "otp_throttled",
+    "replayed",
+)
+
+
+class Record(MutableMapping):
+    __slots__ = ("extra",)
+    FIELDS: tuple = ()
+    _FIELDSET     = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELDSET = frozenset(cls.FIELDS)
+
+    def __init__(self, data=None, **fields):
+        self.extra = None
+        if data:
+            for key, value in data.items():
+                self[key] = value
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def of(cls, value) -> "Record":
+        """`value` itself if it already is one, else a record of its items."""
+        return value if type(value) is cls else cls(value)
+
+    # ── Mapping protocol ─────────────────────────────────────────────────────
+    def __getitem__(self, key):
+        if key in self._FIELDSET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._FIELDSET:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._FIELDSET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self.extra is None:
+            raise KeyError(key)
+        else:
+            del self.extra[key]
+
+    def get(self, key, default=None):
+        if key in self._FIELDSET:
+            return getattr(self, key, default)
+        return self.extra.get(key, default) if self.extra is not None else default
+
+    def __contains__(self, key) -> bool:
+        if key in self._FIELDSET:
+            return hasattr(self, key)
+        return self.extra is not None and key in self.extra
+
+    def __iter__(self):
+        for key in self.FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def as_dict(self) -> dict:
+        out = {key: getattr(self, key) for key in self.FIELDS if hasattr(self, key)}
+        if self.extra is not None:
+            out.update(self.extra)
+        return out
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class Transaction(Record):
+    __slots__ = TXN_FIELDS
+    FIELDS    = TXN_FIELDS
+
+
+class Decision(Record):
+    __slots__ = DECISION_FIELDS
+    FIELDS    = DECISION_FIELDS
+
+
+def row_getter(fields, defaults):
+    """
+    record → tuple of `fields`, in one attrgetter call. Fields the record
+    lacks take their entry in `defaults` (the slow path, as .get would).
+    """
+    fields, defaults = tuple(fields), tuple(defaults)
+    get = attrgetter(*fields)
+    if len(fields) == 1:
+        one = get
+        get = lambda record: (one(record),)
+
+    def row(record) -> tuple:
+        try:
+            return get(record)
+        except AttributeError:
+            return tuple(record.get(f, d) for f, d in zip(fields, defaults))
+    return row
@@ -0,0 +1,210 @@
+"""
+ArgusAI — Incremental Model Refresh
+Updates the live models from transactions labelled in the audit log
+(backend/argusai.db) instead of retraining from a CSV:
+
+  1. Pulls rows labelled since the current model's watermark
+     (`refreshed_through` in model_meta.json) — OTP confirmations
+     (label 0) and analyst verdicts via POST /api/transactions/{id}/label
+  2. Encodes them with the current scaler / label encoders, so the feature
+     space the trees were grown on is unchanged
+  3. Continues boosting the existing booster (`xgb_model=` warm start) for
+     a few extra rounds, and fine-tunes the autoencoder on the labelled
+     legitimate rows at a low learning rate
+  4. Recalibrates ae_threshold on the held-out legitimate rows (never seen
+     by the fine-tune) and reports base vs refreshed AUC / AP on the same
+     held-out slice
+  5. Writes a complete, versioned artifact set to ml/models/versions/<version>/
+     (--promote also copies it over the live set in ml/models/)
+
+Usage: python ml/refresh.py [--rounds 30] [--epochs 3] [--promote]
+"""
+
+import os, sys, json, shutil, sqlite3, argparse, warnings
+from datetime import datetime
+warnings.filterwarnings("ignore")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import roc_auc_score, average_precision_score
+
+# ─── Paths ────────────────────────────────────────────────────────────────────
+BASE         = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR    = os.path.join(BASE, "ml", "models")
+VERSIONS_DIR = os.path.join(MODEL_DIR, "versions")
+DB_PATH      = os.getenv("ARGUS_DB_PATH", os.path.join(BASE, "backend", "argusai.db"))
+
+ARTIFACTS = ("xgb_model.joblib", "scaler.joblib", "label_encoders.joblib",
+             "shap_explainer.joblib", "autoencoder.keras", "model_meta.json")
+
+
+# ─── Labelled data ────────────────────────────────────────────────────────────
+def load_labelled(db_path: str, since: str = None) -> pd.DataFrame:
+    """
+    Labelled rows (newest label wins) logged with a full feature vector.
+    Rows written before the feature columns existed have NULL features and
+    are skipped.
+    """
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query("""
+        SELECT transaction_id, amount, distance_km AS distance_from_home_km,
+               card_age_days, transaction_hour, transaction_day, is_weekend,
+               is_night, device_mismatch, daily_txn_count, avg_amount_7d,
+               amount_vs_avg_ratio, payment_type, merchant_category,
+               device_type, label, labelled_at
+        FROM transactions
+        WHERE label IS NOT NULL AND card_age_days IS NOT NULL
+          AND (? IS NULL OR labelled_at > ?)
+        ORDER BY labelled_at
+    """, conn, params=(since, since))
+    conn.close()
+    return df.drop_duplicates("transaction_id", keep="last")
+
+
+def encode(df: pd.DataFrame, meta: dict, le_dict: dict, scaler) -> np.ndarray:
+    """Same encoding as FraudEngine._build_features (unseen category → 0)."""
+    X = np.empty((len(df), len(meta["feature_cols"])), dtype=np.float32)
+    n = len(meta["numeric_features"])
+    X[:, :n] = df[meta["numeric_features"]].astype(np.float32).values
+    for j, col in enumerate(meta["cat_features"], start=n):
+        codes   = {v: i for i, v in enumerate(le_dict[col].classes_)}
+        X[:, j] = df[col].astype(str).map(codes).fillna(0).values
+    return scaler.transform(X).astype(np.float32)
+
+
+def _scores(y, p) -> dict:
+    if len(np.unique(y)) < 2:
+        return {"roc_auc": None, "avg_precision": None}
+    return {"roc_auc":       round(float(roc_auc_score(y, p)), 4),
+            "avg_precision": round(float(average_precision_score(y, p)), 4)}
+
+
+# ─── Refresh ──────────────────────────────────────────────────────────────────
+def refresh(db_path: str = DB_PATH, base_dir: str = MODEL_DIR, since: str = None,
+            rounds: int = 30, learning_rate: float = None, epochs: int = 3,
+            min_rows: int = 50, holdout: float = 0.2, promote: bool = False):
+    from tensorflow import keras
+    from ml.train import save_artifacts
+    import shap
+
+    with open(os.path.join(base_dir, "model_meta.json")) as f:
+        meta = json.load(f)
+    since  = since or meta.get("refreshed_through")
+    parent = meta.get("version", "ArgusAI-v1.0")
+
+    df = load_labelled(db_path, since)
+    print(f"📥 {len(df):,} labelled transactions since {since or 'the beginning'} "
+          f"({int(df['label'].sum()) if len(df) else 0} fraud)")
+    if len(df) < min_rows:
+        print(f"   Need at least {min_rows} — nothing to do.")
+        return None
+
+    xgb_model = joblib.load(os.path.join(base_dir, "xgb_model.joblib"))
+    scaler    = joblib.load(os.path.join(base_dir, "scaler.joblib"))
+    le_dict   = joblib.load(os.path.join(base_dir, "label_encoders.joblib"))
+    ae_model  = keras.models.load_model(os.path.join(base_dir, "autoencoder.keras"))
+
+    X = encode(df, meta, le_dict, scaler)
+    y = df["label"].values.astype(np.int32)
+    stratify = y if np.bincount(y, minlength=2).min() >= 2 else None
+    X_fit, X_hold, y_fit, y_hold = train_test_split(
+        X, y, test_size=holdout, random_state=42, stratify=stratify)
+    before = _scores(y_hold, xgb_model.predict_proba(X_hold)[:, 1])
+
+    # XGBoost: append `rounds` trees fitted to the new labels
+    print(f"\n🚀 Continuing XGBoost for {rounds} rounds "
+          f"(base: {xgb_model.get_booster().num_boosted_rounds()} trees)...")
+    # The base model is confident on most rows, so per-row hessians p(1-p)
+    # are tiny; the default min_child_weight=1 would block every split on a
+    # batch of a few hundred rows and the new trees would be empty.
+    params = xgb_model.get_params()
+    params.update(n_estimators=rounds, n_jobs=-1, min_child_weight=0.01,
+                  learning_rate=learning_rate or params.get("learning_rate") or 0.05)
+    if y_fit.sum():
+        params["scale_pos_weight"] = (len(y_fit) - y_fit.sum()) / y_fit.sum()
+    refreshed = type(xgb_model)(**params)
+    refreshed.fit(X_fit, y_fit, xgb_model=xgb_model.get_booster())
+    after = _scores(y_hold, refreshed.predict_proba(X_hold)[:, 1])
+    print(f"   Held-out ({len(y_hold)} rows) before: {before}  after: {after}")
+
+    # Autoencoder: short, low-LR fine-tune on confirmed-legitimate fit rows,
+    # threshold from the held-out legitimate rows
+    X_normal, X_calib = X_fit[y_fit == 0], X_hold[y_hold == 0]
+    threshold = meta["ae_threshold"]
+    if len(X_normal):
+        print(f"\n🧠 Fine-tuning autoencoder for {epochs} epochs "
+              f"on {len(X_normal):,} legitimate rows...")
+        ae_model.compile(optimizer=keras.optimizers.Adam(1e-4), loss="mse")
+        ae_model.fit(X_normal, X_normal, epochs=epochs, batch_size=256, verbose=2)
+    else:
+        print("\n⚠️  No legitimate rows to fine-tune on — autoencoder unchanged")
+    if len(X_normal) and len(X_calib):
+        errors    = np.mean(np.square(X_calib - ae_model.predict(X_calib, verbose=0)), axis=1)
+        threshold = float(np.percentile(errors, 95))
+        print(f"   Anomaly threshold (95th pct of {len(X_calib):,} held-out rows): "
+              f"{threshold:.6f}  (was {meta['ae_threshold']:.6f})")
+    elif len(X_normal):
+        print(f"   ⚠️  No held-out legitimate rows — keeping ae_threshold "
+              f"{threshold:.6f}")
+
+    # Versioned artifact set
+    version = "ArgusAI-" + datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+    out_dir = os.path.join(VERSIONS_DIR, version)
+    extra   = {k: v for k, v in meta.items()
+               if k not in ("feature_cols", "numeric_features", "cat_features",
+                            "ae_threshold", "trained_at")}
+    extra.update({
+        "version":            version,
+        "parent_version":     parent,
+        "refreshed_through":  df["labelled_at"].max(),
+        "refresh": {
+            "rows":        int(len(df)),
+            "fraud_rows":  int(y.sum()),
+            "xgb_rounds":  rounds,
+            "ae_epochs":   epochs if len(X_normal) else 0,
+            "ae_fit_rows": int(len(X_normal)),
+            "ae_calibration_rows": int(len(X_calib)) if len(X_normal) else 0,
+            "total_trees": refreshed.get_booster().num_boosted_rounds(),
+            "holdout_before": before,
+            "holdout_after":  after,
+        },
+    })
+    save_artifacts(out_dir, refreshed, scaler, le_dict, shap.TreeExplainer(refreshed),
+                   ae_model, threshold, meta["feature_cols"], extra)
+
+    if promote:
+        promote_version(out_dir, base_dir)
+    return out_dir
+
+
+def promote_version(version_dir: str, model_dir: str = MODEL_DIR):
+    """Copy a version's artifacts over the live set (each file swapped atomically)."""
+    for name in ARTIFACTS:
+        src, dst = os.path.join(version_dir, name), os.path.join(model_dir, name)
+        tmp = dst + ".tmp"
+        if os.path.isdir(src):
+            shutil.copytree(src, tmp, dirs_exist_ok=True)
+        else:
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+    print(f"🚢 Promoted {os.path.basename(version_dir)} → {os.path.relpath(model_dir, BASE)}/")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Refresh models from labelled audit-log rows")
+    ap.add_argument("--db",       default=DB_PATH)
+    ap.add_argument("--base",     default=MODEL_DIR, help="artifact set to start from")
+    ap.add_argument("--since",    default=None,
+                    help="labelled_at watermark (default: the base model's)")
+    ap.add_argument("--rounds",   type=int,   default=30)
+    ap.add_argument("--learning-rate", type=float, default=None)
+    ap.add_argument("--epochs",   type=int,   default=3)
+    ap.add_argument("--min-rows", type=int,   default=50)
+    ap.add_argument("--promote",  action="store_true",
+                    help="copy the new version over ml/models/")
+    args = ap.parse_args()
+    refresh(args.db, args.base, args.since, args.rounds, args.learning_rate,
+            args.epochs, args.min_rows, promote=args.promote)
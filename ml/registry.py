@@ -0,0 +1,205 @@
+"""
+ArgusAI — Model Registry
+Versioned artifact sets with background loading and zero-downtime swaps.
+
+  ml/models/                     the live set trained by train.py
+  ml/models/versions/<version>/  sets written by refresh.py (or copied in)
+
+A version is activated by loading it on a worker thread, warming it with
+synthetic traffic (FraudEngine.warmup) and only then swapping the active
+engine reference — a single assignment, so requests in flight finish on
+the engine they started with and nothing is dropped. A candidate can
+also run in shadow: a sampled fraction of live transactions is re-scored
+by it off the request path and compared with the primary decision.
+
+Per-version predict latency is tracked for both roles (primary / shadow).
+"""
+
+import os, json, random, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+from ml.predict import FraudEngine, MODEL_DIR, DEFAULT_VERSION
+
+VERSIONS_DIR = os.path.join(MODEL_DIR, "versions")
+WARMUP_ROWS  = int(os.getenv("ARGUS_WARMUP_ROWS", "32"))
+
+
+class LatencyStats:
+    """Count, mean and recent-window percentiles of predict latency."""
+
+    def __init__(self, window: int = 2048):
+        self.count  = 0
+        self.total  = 0.0
+        self._recent = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.count  += 1
+        self.total  += seconds
+        self._recent.append(seconds)
+
+    def summary(self) -> dict:
+        recent = np.fromiter(self._recent, dtype=np.float64)
+        p50, p99 = (np.percentile(recent, [50, 99]) * 1000) if len(recent) else (0.0, 0.0)
+        return {
+            "count":   self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms":  round(float(p50), 3),
+            "p99_ms":  round(float(p99), 3),
+        }
+
+
+class ModelRegistry:
+    def __init__(self, model_dir: str = MODEL_DIR, versions_dir: str = VERSIONS_DIR):
+        self.model_dir    = model_dir
+        self.versions_dir = versions_dir
+        self.active: FraudEngine = FraudEngine(model_dir)
+        self.shadow: FraudEngine = None
+        self.shadow_fraction     = 0.0
+        self.latency  = {}                    # (version, role) → LatencyStats
+        self.loading  = None                  # {"version", "state", "error", ...}
+        self._shadow_cmp  = self._new_comparison()
+        self._shadow_pool = ThreadPoolExecutor(max_workers=1,
+                                               thread_name_prefix="argus-shadow")
+        self._shadow_slots = threading.BoundedSemaphore(100)   # max queued shadow jobs
+        self._lock = threading.Lock()
+
+    # ── Versions ──────────────────────────────────────────────────────────────
+    def path_for(self, version: str) -> str:
+        candidate = os.path.join(self.versions_dir, version)
+        if os.path.isfile(os.path.join(candidate, "model_meta.json")):
+            return candidate
+        if version in ("live", self._live_version()):
+            return self.model_dir
+        raise KeyError(version)
+
+    def _live_version(self) -> str:
+        try:
+            with open(os.path.join(self.model_dir, "model_meta.json")) as f:
+                return json.load(f).get("version", DEFAULT_VERSION)
+        except OSError:
+            return DEFAULT_VERSION
+
+    def versions(self) -> list[dict]:
+        names = [self._live_version()]
+        if os.path.isdir(self.versions_dir):
+            names += sorted(v for v in os.listdir(self.versions_dir)
+                            if v not in names
+                            and os.path.isfile(os.path.join(self.versions_dir, v,
+                                                            "model_meta.json")))
+        active = self.active.version if self.active._loaded else None
+        shadow = self.shadow.version if self.shadow else None
+        return [{"version": v, "path": os.path.relpath(self.path_for(v), MODEL_DIR),
+                 "active": v == active, "shadow": v == shadow} for v in names]
+
+    # ── Loading & swapping ────────────────────────────────────────────────────
+    def warm_start(self):
+        """Load and warm the active engine (blocking; call at startup)."""
+        t = perf_counter()
+        self.active.warmup(WARMUP_ROWS)
+        print(f"🔥 {self.active.version} warmed in {perf_counter() - t:.1f}s")
+
+    def _load(self, version: str) -> FraudEngine:
+        self.loading = {"version": version, "state": "loading", "error": None,
+                        "started_at": datetime.utcnow().isoformat()}
+        try:
+            engine = FraudEngine(self.path_for(version))
+            engine.load()
+            self.loading["state"] = "warming"
+            engine.warmup(WARMUP_ROWS)
+            self.loading["state"] = "ready"
+            return engine
+        except Exception as e:
+            self.loading.update(state="failed", error=f"{type(e).__name__}: {e}")
+            raise
+
+    def activate(self, version: str) -> FraudEngine:
+        """Load + warm `version`, then make it the primary. Blocking."""
+        engine = self._load(version)
+        with self._lock:
+            previous, self.active = self.active, engine
+            if self.shadow is not None and self.shadow.version == engine.version:
+                self.shadow = None
+        self.loading["state"] = "active"
+        print(f"🔀 Active model: {getattr(previous, 'version', '?')} → {engine.version}")
+        return engine
+
+    def set_shadow(self, version: str = None, fraction: float = 0.1):
+        """Shadow-score `fraction` of traffic with `version` (None disables). Blocking."""
+        if version is None:
+            self.shadow, self.shadow_fraction = None, 0.0
+            return
+        engine = self._load(version)
+        with self._lock:
+            self.shadow          = engine
+            self.shadow_fraction = min(max(fraction, 0.0), 1.0)
+            self._shadow_cmp     = self._new_comparison()
+        self.loading["state"] = "shadowing"
+
+    # ── Scoring ───────────────────────────────────────────────────────────────
+    def _observe(self, version: str, role: str, seconds: float):
+        stats = self.latency.get((version, role))
+        if stats is None:
+            stats = self.latency.setdefault((version, role), LatencyStats())
+        stats.observe(seconds)
+
+    def predict(self, txn: dict, timings: dict = None, tier: int = 0) -> dict:
+        engine = self.active
+        t      = perf_counter()
+        result = engine.predict(txn, timings, tier=tier)
+        self._observe(engine.version, "primary", perf_counter() - t)
+
+        shadow = self.shadow
+        if shadow is not None and not tier and random.random() < self.shadow_fraction:
+            if self._shadow_slots.acquire(blocking=False):   # never let shadow lag grow
+                self._shadow_pool.submit(self._score_shadow, shadow, txn, result)
+            else:
+                self._shadow_cmp["dropped"] += 1
+        return result
+
+    def _score_shadow(self, engine: FraudEngine, txn: dict, primary: dict):
+        try:
+            t = perf_counter()
+            result = engine.predict(txn, count=False)
+            self._observe(engine.version, "shadow", perf_counter() - t)
+            cmp = self._shadow_cmp
+            cmp["n"]          += 1
+            cmp["agree"]      += result["action"] == primary["action"]
+            cmp["abs_delta"]  += abs(result["risk_score"] - primary["risk_score"])
+            key = f"{primary['action']}->{result['action']}"
+            cmp["transitions"][key] = cmp["transitions"].get(key, 0) + 1
+        finally:
+            self._shadow_slots.release()
+
+    @staticmethod
+    def _new_comparison() -> dict:
+        return {"n": 0, "agree": 0, "abs_delta": 0.0, "dropped": 0, "transitions": {}}
+
+    # ── Introspection ─────────────────────────────────────────────────────────
+    def latency_summary(self) -> dict:
+        return {f"{v}/{role}": s.summary() for (v, role), s in self.latency.items()}
+
+    def status(self) -> dict:
+        cmp = self._shadow_cmp
+        return {
+            "active":   self.active.version if self.active._loaded else None,
+            "shadow":   {
+                "version":       self.shadow.version,
+                "fraction":      self.shadow_fraction,
+                "scored":        cmp["n"],
+                "dropped":       cmp["dropped"],
+                "action_agreement": round(cmp["agree"] / cmp["n"], 4) if cmp["n"] else None,
+                "mean_abs_risk_delta": round(cmp["abs_delta"] / cmp["n"], 3) if cmp["n"] else None,
+                "transitions":   dict(cmp["transitions"]),
+            } if self.shadow else None,
+            "loading":  self.loading,
+            "latency":  self.latency_summary(),
+            "versions": self.versions(),
+        }
+
+
+registry = ModelRegistry()
@@ -0,0 +1,390 @@
+"""
+ArgusAI — Rules Engine
+The rule component of the risk score (0-15 of 100) and the risk signals
+listed in block/OTP alerts, both from one config file (ml/rules.json, or
+ARGUS_RULES):
+
+  {"cap": 15, "rules": [
+    {"name": "far_from_home", "when": "distance_from_home_km > 500",
+     "weight": 4, "signal": "{distance_from_home_km:.0f}km from home", "icon": "📍"},
+    ...]}
+
+`when` is an expression over transaction columns: comparisons, and/or/not,
++ - * / %, `col in ("a", "b")`, abs/min/max. It is parsed once and checked
+against a whitelist of AST nodes and column names (nothing else is
+reachable: no attributes, subscripts or other calls), then compiled twice:
+
+  scalar  one transaction → bool, plain Python (the per-request path)
+  vector  column arrays → bool array, NumPy ufuncs (evaluate() over a batch)
+
+A transaction's rule score is the sum of the weights of the rules it hits,
+capped at `cap` (at most RULE_CAP, the rules' share of the fused score).
+
+The file is re-read when its mtime changes (checked at most once per
+ARGUS_RULES_CHECK_S); a file that fails to parse or validate is reported
+in status() and the previous rules stay active. Every rule counts hits,
+errors and evaluation time (GET /api/rules). A single transaction runs
+all rules in one compiled call; one call in TIME_EVERY runs them one by
+one under the clock instead, so per-rule cost is sampled, not paid on
+every request.
+"""
+
+import os, ast, json, string, functools
+from datetime import datetime
+from time import monotonic, perf_counter_ns
+
+import numpy as np
+
+from ml.records import row_getter
+
+RULES_PATH    = os.getenv("ARGUS_RULES", os.path.join(os.path.dirname(__file__), "rules.json"))
+CHECK_SECONDS = float(os.getenv("ARGUS_RULES_CHECK_S", "1.0"))
+RULE_CAP      = 15.0               # rules' share of the 0-100 risk score
+TIME_EVERY    = 64                 # single-transaction calls per timed (rule by rule) one
+
+# Columns a rule may read (TransactionInput, backend/main.py)
+NUMERIC_COLUMNS = (
+    "amount", "distance_from_home_km", "device_mismatch", "card_age_days",
+    "transaction_hour", "transaction_day", "is_weekend", "is_night",
+    "daily_txn_count", "avg_amount_7d", "amount_vs_avg_ratio",
+)
+TEXT_COLUMNS = ("payment_type", "merchant_category", "transaction_city", "device_type")
+COLUMNS      = NUMERIC_COLUMNS + TEXT_COLUMNS
+_DEFAULTS    = {**{c: 0 for c in NUMERIC_COLUMNS}, **{c: "" for c in TEXT_COLUMNS}}
+
+_FUNCTIONS = {"abs", "min", "max"}
+_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+    ast.UAdd, ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In,
+    ast.NotIn, ast.Name, ast.Load, ast.Constant, ast.Tuple, ast.List, ast.Call,
+)
+
+
+class RuleError(ValueError):
+    """A rules file that cannot be loaded; the message names the rule."""
+
+
+# ─── Compilation ──────────────────────────────────────────────────────────────
+def _check(tree: ast.Expression, name: str) -> set:
+    """Reject anything outside the whitelist; returns the columns read."""
+    columns, lists = set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Compare):
+            for op, right in zip(node.ops, node.comparators):
+                if isinstance(op, (ast.In, ast.NotIn)):
+                    if not isinstance(right, (ast.Tuple, ast.List)):
+                        raise RuleError(f"rule {name!r}: `in` needs a literal list")
+                    lists.add(id(right))
+    for node in ast.walk(tree):
+        if not isinstance(node, _NODES):
+            raise RuleError(f"rule {name!r}: {type(node).__name__} not allowed")
+        if isinstance(node, ast.Call):
+            if (not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS
+                    or node.keywords):
+                raise RuleError(f"rule {name!r}: only {sorted(_FUNCTIONS)} may be called")
+        elif isinstance(node, ast.Name) and node.id not in _FUNCTIONS:
+            if node.id not in _DEFAULTS:
+                raise RuleError(f"rule {name!r}: unknown column {node.id!r}")
+            columns.add(node.id)
+        elif isinstance(node, ast.Constant) and not isinstance(node.value, (int, float, str)):
+            raise RuleError(f"rule {name!r}: constant {node.value!r} not allowed")
+        elif isinstance(node, (ast.Tuple, ast.List)):
+            if id(node) not in lists:
+                raise RuleError(f"rule {name!r}: lists only go on the right of `in`")
+            if not all(isinstance(e, ast.Constant) for e in node.elts):
+                raise RuleError(f"rule {name!r}: lists may only hold constants")
+    return columns
+
+
+class _Columns(ast.NodeTransformer):
+    """column → c["column"]"""
+
+    def visit_Name(self, node):
+        if node.id in _FUNCTIONS:
+            return node
+        return ast.copy_location(ast.Subscript(
+            value=ast.Name("c", ast.Load()), slice=ast.Constant(node.id),
+            ctx=ast.Load()), node)
+
+
+class _Vectorize(_Columns):
+    """and/or/not/in → NumPy ufuncs, so the expression works on arrays."""
+
+    @staticmethod
+    def _call(fn, *args):
+        return ast.Call(func=ast.Name(fn, ast.Load()), args=list(args), keywords=[])
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        fn = "_and" if isinstance(node.op, ast.And) else "_or"
+        return functools.reduce(lambda a, b: self._call(fn, a, b), node.values)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        return self._call("_not", node.operand) if isinstance(node.op, ast.Not) else node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        terms, left = [], node.left
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                term = self._call("_isin", left, ast.Tuple(right.elts, ast.Load()))
+                terms.append(self._call("_not", term) if isinstance(op, ast.NotIn) else term)
+            else:
+                terms.append(ast.Compare(left, [op], [right]))
+            left = right
+        return functools.reduce(lambda a, b: self._call("_and", a, b), terms)
+
+
+_SCALAR_ENV = {"__builtins__": {}, "abs": abs, "min": min, "max": max}
+_VECTOR_ENV = {"__builtins__": {}, "abs": np.abs, "min": np.minimum, "max": np.maximum,
+               "_and": np.logical_and, "_or": np.logical_or, "_not": np.logical_not,
+               "_isin": lambda a, values: np.isin(a, list(values))}
+
+
+def _body(tree: ast.Expression, transformer) -> ast.expr:
+    return transformer.visit(ast.parse(ast.unparse(tree), mode="eval")).body
+
+
+def _lambda(body: ast.expr, env: dict, filename: str):
+    """`lambda c: <body>`, compiled with only `env` in scope."""
+    fn = ast.Expression(ast.Lambda(
+        args=ast.arguments(posonlyargs=[], args=[ast.arg("c")], kwonlyargs=[],
+                           kw_defaults=[], defaults=[]),
+        body=body))
+    return eval(compile(ast.fix_missing_locations(fn), filename, "eval"), env)
+
+
+# ─── Rules ────────────────────────────────────────────────────────────────────
+class Rule:
+    __slots__ = ("name", "when", "weight", "signal", "icon", "columns", "expr",
+                 "test", "test_batch", "hits", "errors", "ns", "timed")
+
+    def __init__(self, spec: dict):
+        name = spec.get("name")
+        if not isinstance(name, str) or not name:
+            raise RuleError(f"rule without a name: {spec!r}")
+        self.name   = name
+        self.when   = spec.get("when")
+        self.weight = spec.get("weight", 0)
+        self.signal = spec.get("signal", name)
+        self.icon   = spec.get("icon", "")
+        if not isinstance(self.when, str):
+            raise RuleError(f"rule {name!r}: `when` must be an expression string")
+        if not isinstance(self.weight, (int, float)) or isinstance(self.weight, bool) \
+                or self.weight < 0:
+            raise RuleError(f"rule {name!r}: weight must be a number >= 0")
+        try:
+            tree = ast.parse(self.when, mode="eval")
+        except SyntaxError as e:
+            raise RuleError(f"rule {name!r}: {e.msg}") from None
+
+        fields = {f for _, f, _, _ in string.Formatter().parse(self.signal) if f}
+        if fields - set(_DEFAULTS):
+            raise RuleError(f"rule {name!r}: signal uses unknown {sorted(fields - set(_DEFAULTS))}")
+        self.columns    = _check(tree, name) | fields
+        self.expr       = _body(tree, _Columns())
+        self.test       = _lambda(self.expr, _SCALAR_ENV, f"<rule {name}>")
+        self.test_batch = _lambda(_body(tree, _Vectorize()), _VECTOR_ENV, f"<rule {name}>")
+        self.hits = self.errors = self.ns = self.timed = 0
+
+    def hit(self, row: dict) -> bool:
+        try:
+            return bool(self.test(row))
+        except (TypeError, ZeroDivisionError):    # None, or x / 0
+            self.errors += 1
+            return False
+
+    def text(self, row: dict, icons: bool = False) -> str:
+        try:
+            text = self.signal.format_map(row)
+        except (ValueError, TypeError):           # format spec vs. a None value
+            text = self.name
+        return f"{self.icon} {text}" if icons and self.icon else text
+
+    def stats(self, evaluated: int) -> dict:
+        return {
+            "name":      self.name,
+            "when":      self.when,
+            "weight":    self.weight,
+            "hits":      self.hits,
+            "hit_rate":  round(self.hits / evaluated, 4) if evaluated else 0.0,
+            "errors":    self.errors,
+            "mean_ns":   round(self.ns / self.timed, 1) if self.timed else None,
+        }
+
+
+class RuleSet:
+    """One loaded rules file: compiled rules, weights and their counters."""
+
+    def __init__(self, config: dict, source: str = None):
+        if not isinstance(config, dict) or not isinstance(config.get("rules"), list):
+            raise RuleError('expected {"cap": ..., "rules": [...]}')
+        self.cap = config.get("cap", RULE_CAP)
+        if not isinstance(self.cap, (int, float)) or not 0 <= self.cap <= RULE_CAP:
+            raise RuleError(f"cap must be between 0 and {RULE_CAP:g}")
+        self.rules  = [Rule(spec) for spec in config["rules"]]
+        names = [r.name for r in self.rules]
+        if len(set(names)) != len(names):
+            raise RuleError(f"duplicate rule names in {names}")
+        # Every rule in one call: lambda c: (rule_1, rule_2, ...)
+        self._test_all = _lambda(ast.Tuple([r.expr for r in self.rules], ast.Load()),
+                                 _SCALAR_ENV, "<rules>")
+        self.weights   = np.array([r.weight for r in self.rules], dtype=np.float64)
+        self.columns   = tuple(c for c in COLUMNS if any(c in r.columns for r in self.rules))
+        self._row      = row_getter(self.columns, [_DEFAULTS[c] for c in self.columns])
+        self.evaluated = 0
+        self.source    = source
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+
+    @classmethod
+    def from_file(cls, path: str) -> "RuleSet":
+        try:
+            with open(path, encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            raise RuleError(f"{path}: {e}") from None
+        return cls(config, path)
+
+    def row(self, txn) -> dict:
+        return dict(zip(self.columns, self._row(txn)))
+
+    # ── One transaction ───────────────────────────────────────────────────────
+    def score(self, txn, count: bool = True) -> float:
+        """Rule score of `txn`; count=False leaves the stats untouched."""
+        row = self.row(txn)
+        if count:
+            self.evaluated += 1
+        if count and self.evaluated % TIME_EVERY == 0:
+            hits = self._timed(row)
+        else:
+            try:
+                hits = self._test_all(row)
+            except (TypeError, ZeroDivisionError):
+                hits = [rule.hit(row) for rule in self.rules]
+        total = 0
+        for rule, hit in zip(self.rules, hits):
+            if hit:
+                total += rule.weight
+                if count:
+                    rule.hits += 1
+        return min(total, self.cap)
+
+    def _timed(self, row: dict) -> list:
+        hits = []
+        for rule in self.rules:
+            t0 = perf_counter_ns()
+            hits.append(rule.hit(row))
+            rule.ns    += perf_counter_ns() - t0
+            rule.timed += 1
+        return hits
+
+    def signals(self, txn, icons: bool = False) -> list[str]:
+        """Signal text of every rule `txn` hits (not counted in the stats)."""
+        row = self.row(txn)
+        return [rule.text(row, icons) for rule in self.rules if rule.hit(row)]
+
+    # ── A batch ───────────────────────────────────────────────────────────────
+    def batch_columns(self, txns) -> dict:
+        """Records or dicts → {column: array} for the columns the rules read."""
+        rows = [self._row(t) for t in txns]
+        out  = {}
+        for i, col in enumerate(self.columns):
+            if col in _DEFAULTS and isinstance(_DEFAULTS[col], str):
+                out[col] = np.array([str(r[i]) for r in rows], dtype=object)
+            else:
+                out[col] = np.fromiter((r[i] or 0 for r in rows), np.float64, len(rows))
+        return out
+
+    def evaluate(self, batch) -> np.ndarray:
+        """
+        (rules × rows) hit matrix. `batch` is a list of transactions, or a
+        mapping of column → array (a dict, or a pandas DataFrame).
+        """
+        if isinstance(batch, (list, tuple)):
+            n, batch = len(batch), self.batch_columns(batch)
+        columns = {c: np.asarray(batch[c]) for c in self.columns}
+        if columns:
+            n = len(next(iter(columns.values())))
+        hits = np.zeros((len(self.rules), n), dtype=bool)
+        with np.errstate(all="ignore"):
+            for i, rule in enumerate(self.rules):
+                t0 = perf_counter_ns()
+                hits[i] = np.asarray(rule.test_batch(columns), dtype=bool)
+                rule.ns    += perf_counter_ns() - t0
+                rule.timed += n
+                rule.hits  += int(hits[i].sum())
+        self.evaluated += n
+        return hits
+
+    def scores(self, batch) -> np.ndarray:
+        """Rule score per row of `batch`, as score() would give it."""
+        return np.minimum(self.weights @ self.evaluate(batch), self.cap)
+
+    def stats(self) -> dict:
+        return {"source": self.source, "loaded_at": self.loaded_at, "cap": self.cap,
+                "columns": list(self.columns), "evaluated": self.evaluated,
+                "rules": [r.stats(self.evaluated) for r in self.rules]}
+
+
+# ─── Hot reload ───────────────────────────────────────────────────────────────
+class RuleEngine:
+    """The active RuleSet, swapped in when the file changes."""
+
+    def __init__(self, path: str = RULES_PATH, check_seconds: float = CHECK_SECONDS):
+        self.path          = path
+        self.check_seconds = check_seconds
+        self.reloads    = 0
+        self.last_error = None
+        self._mtime     = None
+        self._checked   = 0.0
+        self._ruleset: RuleSet = None
+
+    @property
+    def ruleset(self) -> RuleSet:
+        now = monotonic()
+        if self._ruleset is None:
+            self.reload()                 # first load: a bad file is fatal
+        elif now - self._checked >= self.check_seconds:
+            self._checked = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = self._mtime
+            if mtime != self._mtime:
+                try:
+                    self.reload()
+                except RuleError:
+                    self._mtime = mtime   # reported once, retried on the next edit
+        return self._ruleset
+
+    def reload(self) -> RuleSet:
+        """Load the file now; on error keep the current rules and re-raise."""
+        try:
+            mtime   = os.stat(self.path).st_mtime_ns
+            ruleset = RuleSet.from_file(self.path)
+        except (OSError, RuleError) as e:
+            self.last_error = str(e)
+            print(f"⚠️  Rules not reloaded: {e}")
+            raise RuleError(str(e)) from None
+        loaded = self._ruleset is not None
+        self._ruleset, self._mtime, self._checked = ruleset, mtime, monotonic()
+        self.last_error = None
+        if loaded:
+            self.reloads += 1
+            print(f"✅ Rules reloaded: {len(ruleset.rules)} rules from {self.path}")
+        return ruleset
+
+    def score(self, txn, count: bool = True) -> float:
+        return self.ruleset.score(txn, count)
+
+    def signals(self, txn, icons: bool = False) -> list[str]:
+        return self.ruleset.signals(txn, icons)
+
+    def status(self) -> dict:
+        return {**self.ruleset.stats(), "reloads": self.reloads,
+                "last_error": self.last_error}
+
+
+rules = RuleEngine()
@@ -0,0 +1,276 @@
+"""
+ArgusAI — Hyperparameter Search
+Budgeted search over XGBoost and autoencoder hyperparameters, run by
+`python ml/train.py --search`.
+
+  - Random sampling: `trials` configurations per model from SEARCH_SPACE
+  - Successive halving: every survivor is trained at the rung's budget
+    (XGBoost trees / AE epochs), the best 1/eta advance to an eta× larger
+    budget until max_budget
+  - A spawn-based process pool runs the trials; each worker is pinned to
+    `threads` cores (OMP/TF thread limits, XGBoost n_jobs) so that
+    workers × threads never oversubscribes the machine
+  - Workers memory-map the cached feature matrix (ml/feature_cache.py), so
+    data is parsed once, not once per trial
+
+Trials are scored on a validation slice of the training split — the test
+split train.py reports on is never seen. Every trial lands in
+ml/models/leaderboard.json with its fit time and p50/p99 single-row
+inference latency next to ROC-AUC / average precision, so a model that is
+accurate but too slow to serve can be ruled out (--max-latency-ms).
+"""
+
+import os, json, contextlib, multiprocessing
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import roc_auc_score, average_precision_score
+
+from ml import feature_cache
+from ml.features import SPLIT_SEED
+
+MODEL_DIR        = os.path.join(os.path.dirname(__file__), "models")
+LEADERBOARD_PATH = os.path.join(MODEL_DIR, "leaderboard.json")
+
+SEARCH_SPACE = {
+    "xgb": {
+        "max_depth":        ("choice", [3, 4, 5, 6, 8]),
+        "learning_rate":    ("log",    0.02, 0.3),
+        "subsample":        ("uniform", 0.6, 1.0),
+        "colsample_bytree": ("uniform", 0.5, 1.0),
+        "min_child_weight": ("choice", [1, 3, 5, 10]),
+        "gamma":            ("choice", [0.0, 0.1, 0.5, 1.0]),
+    },
+    "ae": {
+        "hidden":        ("choice", [[32, 16], [64, 32], [128, 64]]),
+        "bottleneck":    ("choice", [4, 8, 16]),
+        "dropout":       ("uniform", 0.0, 0.3),
+        "learning_rate": ("log",     3e-4, 3e-3),
+        "batch_size":    ("choice", [128, 256, 512]),
+    },
+}
+# (budget parameter, min budget, max budget)
+BUDGETS = {
+    "xgb": ("n_estimators", 50, 400),
+    "ae":  ("epochs",        5,  45),
+}
+LATENCY_ROWS = {"xgb": 200, "ae": 25}
+
+
+def sample_configs(model: str, n: int, rng: np.random.Generator) -> list[dict]:
+    configs = []
+    for _ in range(n):
+        cfg = {}
+        for name, (kind, *args) in SEARCH_SPACE[model].items():
+            if kind == "choice":
+                cfg[name] = args[0][rng.integers(len(args[0]))]
+            elif kind == "uniform":
+                cfg[name] = round(float(rng.uniform(*args)), 4)
+            else:
+                cfg[name] = float(f"{np.exp(rng.uniform(np.log(args[0]), np.log(args[1]))):.4g}")
+        configs.append(cfg)
+    return configs
+
+
+# ─── Worker side ──────────────────────────────────────────────────────────────
+_W = {}
+
+
+def _init_worker(entry: str, idx_train, idx_val, threads: int):
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    X, y, *_ = feature_cache.load_entry(entry)
+    _W.update(X_train=np.asarray(X[idx_train]), y_train=np.asarray(y[idx_train]),
+              X_val=np.asarray(X[idx_val]),     y_val=np.asarray(y[idx_val]),
+              threads=threads)
+
+
+def _latency_ms(fn, X) -> tuple[float, float]:
+    fn(X[:1])                                       # warm-up
+    times = []
+    for i in range(len(X)):
+        t = perf_counter()
+        fn(X[i:i + 1])                              # one row, as the API scores
+        times.append((perf_counter() - t) * 1000)
+    return float(np.percentile(times, 50)), float(np.percentile(times, 99))
+
+
+def _fit_xgb(trial: int, params: dict, budget: int) -> dict:
+    import xgboost as xgb
+    X, y = _W["X_train"], _W["y_train"]
+    spw  = (len(y) - y.sum()) / max(y.sum(), 1)
+    model = xgb.XGBClassifier(**params, n_estimators=budget, scale_pos_weight=spw,
+                              eval_metric="aucpr", random_state=42,
+                              n_jobs=_W["threads"])
+    t = perf_counter()
+    model.fit(X, y)
+    fit_s = perf_counter() - t
+    score = model.predict_proba(_W["X_val"])[:, 1]
+    p50, p99 = _latency_ms(model.predict_proba, _W["X_val"][:LATENCY_ROWS["xgb"]])
+    return _row("xgb", trial, params, budget, score, fit_s, p50, p99)
+
+
+def _fit_ae(trial: int, params: dict, budget: int) -> dict:
+    from tensorflow.keras.callbacks import EarlyStopping
+    from ml.train import build_autoencoder
+    X, y   = _W["X_train"], _W["y_train"]
+    normal = X[y == 0]
+    model  = build_autoencoder(X.shape[1], params["hidden"], params["bottleneck"],
+                               params["dropout"], params["learning_rate"])
+    t = perf_counter()
+    model.fit(normal, normal, epochs=budget, batch_size=params["batch_size"],
+              validation_split=0.1, verbose=0,
+              callbacks=[EarlyStopping(patience=5, restore_best_weights=True,
+                                       monitor="val_loss")])
+    fit_s = perf_counter() - t
+    X_val = _W["X_val"]
+    score = np.mean(np.square(X_val - model.predict(X_val, verbose=0,
+                                                    batch_size=4096)), axis=1)
+    p50, p99 = _latency_ms(lambda x: model.predict(x, verbose=0),
+                           X_val[:LATENCY_ROWS["ae"]])
+    return _row("ae", trial, params, budget, score, fit_s, p50, p99)
+
+
+def _row(model, trial, params, budget, score, fit_s, p50, p99) -> dict:
+    y_val = _W["y_val"]
+    return {
+        "model":          model,
+        "trial":          trial,
+        "params":         {**params, BUDGETS[model][0]: budget},
+        "budget":         budget,
+        "roc_auc":        round(float(roc_auc_score(y_val, score)), 5),
+        "avg_precision":  round(float(average_precision_score(y_val, score)), 5),
+        "fit_seconds":    round(fit_s, 3),
+        "latency_ms_p50": round(p50, 4),
+        "latency_ms_p99": round(p99, 4),
+    }
+
+
+_FIT = {"xgb": _fit_xgb, "ae": _fit_ae}
+
+
+# ─── Driver ───────────────────────────────────────────────────────────────────
+@contextlib.contextmanager
+def _thread_env(threads: int):
+    """Thread caps inherited by spawned workers before any native lib loads."""
+    names = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+             "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS")
+    saved = {k: os.environ.get(k) for k in names}
+    os.environ.update({k: str(threads) for k in names})
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def successive_halving(pool, model: str, configs: list[dict], eta: int = 3) -> list[dict]:
+    _, budget, max_budget = BUDGETS[model]
+    alive, rows, rung = list(enumerate(configs)), [], 0
+    while alive:
+        futures = [pool.submit(_FIT[model], trial, cfg, budget) for trial, cfg in alive]
+        results = [f.result() for f in futures]
+        for r in results:
+            r["rung"] = rung
+        rows.extend(results)
+        best = max(results, key=lambda r: r["avg_precision"])
+        print(f"   {model:<3} rung {rung}: {len(alive):>2} trials @ "
+              f"{BUDGETS[model][0]}={budget:<4} best AP {best['avg_precision']:.4f}")
+        if budget >= max_budget or len(alive) == 1:
+            break
+        results.sort(key=lambda r: r["avg_precision"], reverse=True)
+        alive  = [(r["trial"], configs[r["trial"]])
+                  for r in results[:max(1, len(alive) // eta)]]
+        budget = min(max_budget, budget * eta)
+        rung  += 1
+    return rows
+
+
+def select(rows: list[dict], max_latency_ms: float = None):
+    """Best AP among the most-trained trials that meet the latency budget."""
+    ok = [r for r in rows if max_latency_ms is None
+          or r["latency_ms_p50"] <= max_latency_ms]
+    if not ok:
+        return None
+    return max(ok, key=lambda r: (r["budget"], r["avg_precision"]))
+
+
+def run_search(data_path: str, trials: int = 12, workers: int = None,
+               threads: int = None, eta: int = 3, max_latency_ms: float = None,
+               seed: int = 42) -> dict:
+    cores   = os.cpu_count() or 2
+    workers = workers or max(1, min(trials, cores // 2))
+    threads = threads or max(1, cores // workers)
+    print(f"🔎 Hyperparameter search: {trials} configs/model, eta={eta}, "
+          f"{workers} workers × {threads} threads")
+
+    entry  = feature_cache.ensure(data_path)
+    _, y, *_ = feature_cache.load_entry(entry)
+    idx_train, _ = train_test_split(np.arange(len(y)), test_size=0.2,
+                                    random_state=42, stratify=y)
+    idx_fit, idx_val = train_test_split(idx_train, test_size=0.2,
+                                        random_state=SPLIT_SEED + 1,
+                                        stratify=np.asarray(y[idx_train]))
+    idx_fit.sort(); idx_val.sort()
+
+    rng = np.random.default_rng(seed)
+    configs = {m: sample_configs(m, trials, rng) for m in ("xgb", "ae")}
+
+    t = perf_counter()
+    with _thread_env(threads), ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(entry, idx_fit, idx_val, threads)) as pool, \
+         ThreadPoolExecutor(max_workers=2) as drivers:
+        # Both models' halving schedules share the pool
+        jobs = {m: drivers.submit(successive_halving, pool, m, configs[m], eta)
+                for m in configs}
+        rows = {m: job.result() for m, job in jobs.items()}
+    elapsed = perf_counter() - t
+
+    selected = {m: select(rows[m], max_latency_ms) for m in rows}
+    entries  = sorted(rows["xgb"] + rows["ae"],
+                      key=lambda r: (r["model"], -r["budget"], -r["avg_precision"]))
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    with open(LEADERBOARD_PATH, "w") as f:
+        json.dump({
+            "data":               os.path.abspath(data_path),
+            "trials":             trials,
+            "eta":                eta,
+            "workers":            workers,
+            "threads_per_worker": threads,
+            "max_latency_ms":     max_latency_ms,
+            "elapsed_seconds":    round(elapsed, 1),
+            "selected":           selected,
+            "entries":            entries,
+        }, f, indent=2)
+
+    print(f"\n🏁 Search finished in {elapsed:.0f}s → {os.path.relpath(LEADERBOARD_PATH)}")
+    print(f"   {'model':<5} {'trial':>5} {'budget':>6} {'AP':>7} {'AUC':>7} "
+          f"{'fit s':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for r in [r for r in entries if r["budget"] == BUDGETS[r["model"]][2]][:10]:
+        mark = " ✅" if r is selected[r["model"]] else ""
+        print(f"   {r['model']:<5} {r['trial']:>5} {r['budget']:>6} "
+              f"{r['avg_precision']:>7.4f} {r['roc_auc']:>7.4f} {r['fit_seconds']:>7.1f} "
+              f"{r['latency_ms_p50']:>8.3f} {r['latency_ms_p99']:>8.3f}{mark}")
+    for m, r in selected.items():
+        if r is None:
+            print(f"   ⚠️  No {m} trial met the {max_latency_ms}ms budget — using defaults")
+
+    return {
+        "xgb": selected["xgb"]["params"] if selected["xgb"] else None,
+        "ae":  selected["ae"]["params"]  if selected["ae"]  else None,
+        "leaderboard": {
+            "path":      os.path.basename(LEADERBOARD_PATH),
+            "xgb_trial": selected["xgb"]["trial"] if selected["xgb"] else None,
+            "ae_trial":  selected["ae"]["trial"]  if selected["ae"]  else None,
+        },
+    }
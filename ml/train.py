@@ -4,9 +4,21 @@ Trains:
   1. XGBoost classifier  (supervised fraud detection)
   2. Autoencoder         (unsupervised anomaly detection)
 Saves all artifacts to ml/models/
+
+Modes:
+  python ml/train.py                       in-memory (default); XGBoost and
+      the autoencoder train concurrently on split thread budgets
+  python ml/train.py --search [--trials N] budgeted hyperparameter search
+      (random sampling + successive halving across a process pool), writes
+      ml/models/leaderboard.json, then trains the winning configs
+  python ml/train.py --stream [--data P]   out-of-core: chunks are streamed
+      into XGBoost (QuantileDMatrix, or --external-memory DMatrix), the
+      scaler/encoders are fitted in one streaming pass and the autoencoder
+      trains from a generator. P may be a CSV or a directory of CSV/Parquet
+      partitions (see data/generate_dataset.py --partitioned).
 """
 
-import os, sys, warnings
+import os, sys, argparse, warnings
 warnings.filterwarnings("ignore")
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
@@ -14,6 +26,7 @@ import pandas as pd
 import numpy as np
 import joblib
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 from sklearn.model_selection   import train_test_split
 from sklearn.preprocessing     import StandardScaler, LabelEncoder
@@ -35,16 +48,29 @@ DATA_PATH = os.path.join(BASE, "data", "transactions.csv")
 MODEL_DIR = os.path.join(os.path.dirname(__file__), "models")
 os.makedirs(MODEL_DIR, exist_ok=True)
 
-# ─── Features ─────────────────────────────────────────────────────────────────
-NUMERIC_FEATURES = [
-    "amount", "distance_from_home_km", "card_age_days",
-    "transaction_hour", "transaction_day",
-    "is_weekend", "is_night", "device_mismatch",
-    "daily_txn_count", "avg_amount_7d", "amount_vs_avg_ratio",
-]
+# ─── Hyperparameters ──────────────────────────────────────────────────────────
+# Defaults for the standard path; `--search` (ml/search.py) explores around them.
+XGB_PARAMS = {
+    "n_estimators":     400,
+    "max_depth":        6,
+    "learning_rate":    0.05,
+    "subsample":        0.8,
+    "colsample_bytree": 0.8,
+}
+AE_PARAMS = {
+    "hidden":        (64, 32),
+    "bottleneck":    16,
+    "dropout":       0.2,
+    "learning_rate": 1e-3,
+    "epochs":        60,
+    "batch_size":    256,
+}
 
-CATEGORICAL_FEATURES = ["payment_type", "merchant_category", "device_type"]
-TARGET = "is_fraud"
+# ─── Features ─────────────────────────────────────────────────────────────────
+from ml.features import (NUMERIC_FEATURES, CATEGORICAL_FEATURES, TARGET,
+                         SPLIT_SEED, TEST_FRACTION, StreamingPreprocessor,
+                         iter_frames, iter_split)
+from ml import feature_cache
 
 
 # ─── Data Loading & Feature Engineering ───────────────────────────────────────
@@ -68,8 +94,10 @@ def load_and_prepare(path):
 
 
 # ─── XGBoost Training ─────────────────────────────────────────────────────────
-def train_xgboost(X_train, X_test, y_train, y_test, feature_cols):
+def train_xgboost(X_train, X_test, y_train, y_test, feature_cols,
+                  params: dict = None, n_jobs: int = -1):
     print("\n🚀 Training XGBoost classifier...")
+    params = {**XGB_PARAMS, **(params or {})}
 
     # Cost-sensitive: weight fraud samples higher
     fraud_count = y_train.sum()
@@ -78,16 +106,11 @@ def train_xgboost(X_train, X_test, y_train, y_test, feature_cols):
     print(f"   scale_pos_weight = {scale_pos_weight:.2f}  (penalising false negatives)")
 
     model = xgb.XGBClassifier(
-        n_estimators      = 400,
-        max_depth         = 6,
-        learning_rate     = 0.05,
-        subsample         = 0.8,
-        colsample_bytree  = 0.8,
+        **params,
         scale_pos_weight  = scale_pos_weight,   # cost-sensitive
-        use_label_encoder = False,
         eval_metric       = "aucpr",
         random_state      = 42,
-        n_jobs            = -1,
+        n_jobs            = n_jobs,
     )
     model.fit(
         X_train, y_train,
@@ -115,34 +138,43 @@ def train_xgboost(X_train, X_test, y_train, y_test, feature_cols):
 
 
 # ─── Autoencoder Training ─────────────────────────────────────────────────────
-def train_autoencoder(X_train, y_train, input_dim):
+def build_autoencoder(input_dim, hidden=(64, 32), bottleneck=16, dropout=0.2,
+                      learning_rate=1e-3):
+    inp  = Input(shape=(input_dim,))
+    x    = Dense(hidden[0], activation="relu")(inp)
+    x    = Dropout(dropout)(x)
+    x    = Dense(hidden[1], activation="relu")(x)
+    x    = Dense(bottleneck, activation="relu")(x)    # bottleneck
+    x    = Dense(hidden[1], activation="relu")(x)
+    x    = Dropout(dropout)(x)
+    x    = Dense(hidden[0], activation="relu")(x)
+    out  = Dense(input_dim, activation="linear")(x)
+
+    autoencoder = Model(inp, out)
+    autoencoder.compile(optimizer=tf.keras.optimizers.Adam(learning_rate), loss="mse")
+    return autoencoder
+
+
+def train_autoencoder(X_train, y_train, input_dim, params: dict = None,
+                      verbose: int = 1):
     print("\n🧠 Training Autoencoder (anomaly detection)...")
+    params = {**AE_PARAMS, **(params or {})}
 
     # Train ONLY on normal transactions
     X_normal = X_train[y_train == 0]
     print(f"   Training on {len(X_normal):,} normal transactions")
 
-    inp  = Input(shape=(input_dim,))
-    x    = Dense(64, activation="relu")(inp)
-    x    = Dropout(0.2)(x)
-    x    = Dense(32, activation="relu")(x)
-    x    = Dense(16, activation="relu")(x)    # bottleneck
-    x    = Dense(32, activation="relu")(x)
-    x    = Dropout(0.2)(x)
-    x    = Dense(64, activation="relu")(x)
-    out  = Dense(input_dim, activation="linear")(x)
-
-    autoencoder = Model(inp, out)
-    autoencoder.compile(optimizer="adam", loss="mse")
+    autoencoder = build_autoencoder(input_dim, params["hidden"], params["bottleneck"],
+                                    params["dropout"], params["learning_rate"])
 
     cb = EarlyStopping(patience=5, restore_best_weights=True, monitor="val_loss")
     autoencoder.fit(
         X_normal, X_normal,
-        epochs          = 60,
-        batch_size      = 256,
+        epochs          = params["epochs"],
+        batch_size      = params["batch_size"],
         validation_split= 0.1,
         callbacks       = [cb],
-        verbose         = 1,
+        verbose         = verbose,
     )
 
     # Compute reconstruction errors on training set
@@ -155,13 +187,24 @@ def train_autoencoder(X_train, y_train, input_dim):
 
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
-def main():
-    # 1. Load data
-    df, X, y, feature_cols, le_dict = load_and_prepare(DATA_PATH)
-
-    # 2. Scale
-    scaler  = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+def thread_split(ae_share: float = 0.5) -> tuple[int, int]:
+    """Split the cores between XGBoost and TensorFlow when both train at once."""
+    cores      = os.cpu_count() or 2
+    ae_threads = max(1, int(cores * ae_share))
+    return max(1, cores - ae_threads), ae_threads
+
+
+def main(data_path=DATA_PATH, use_cache: bool = True, xgb_params: dict = None,
+         ae_params: dict = None, extra_meta: dict = None):
+    # 1-2. Load, encode and scale — memory-mapped from the feature cache when
+    #      the source data and feature spec are unchanged since the last run
+    if use_cache:
+        X_scaled, y, feature_cols, le_dict, scaler = \
+            feature_cache.load_or_build(data_path)
+    else:
+        df, X, y, feature_cols, le_dict = load_and_prepare(data_path)
+        scaler   = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
 
     # 3. Split
     X_train, X_test, y_train, y_test = train_test_split(
@@ -169,44 +212,256 @@ def main():
     )
     print(f"\n   Train: {len(X_train):,}  |  Test: {len(X_test):,}")
 
-    # 4. Train models
-    xgb_model, explainer, auc, ap = train_xgboost(
-        X_train, X_test, y_train, y_test, feature_cols)
-    ae_model, ae_threshold = train_autoencoder(
-        X_train, y_train, X_train.shape[1])
+    # 4. Train models — XGBoost and the autoencoder are independent, so they
+    #    run side by side on disjoint thread budgets (both release the GIL)
+    xgb_threads, ae_threads = thread_split()
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(ae_threads)
+    except RuntimeError:                 # TF already initialised in this process
+        pass
+    print(f"   Training concurrently: XGBoost ×{xgb_threads} threads, "
+          f"Autoencoder ×{ae_threads} threads")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        xgb_job = pool.submit(train_xgboost, X_train, X_test, y_train, y_test,
+                              feature_cols, xgb_params, xgb_threads)
+        ae_job  = pool.submit(train_autoencoder, X_train, y_train,
+                              X_train.shape[1], ae_params, 2)
+        xgb_model, explainer, auc, ap = xgb_job.result()
+        ae_model, ae_threshold        = ae_job.result()
 
     # 5. Save everything
+    meta = {
+        "roc_auc":          round(auc, 4),
+        "avg_precision":    round(ap, 4),
+        "n_train":          int(len(X_train)),
+        "n_test":           int(len(X_test)),
+        "fraud_rate":       float(y.mean()),
+        "xgb_params":       {**XGB_PARAMS, **(xgb_params or {})},
+        "ae_params":        {**AE_PARAMS, **(ae_params or {})},
+        **(extra_meta or {}),
+    }
+    save_artifacts(MODEL_DIR, xgb_model, scaler, le_dict, explainer,
+                   ae_model, ae_threshold, feature_cols, meta)
+    print(f"\n🎯 Final ROC-AUC: {auc:.4f}  |  Avg Precision: {ap:.4f}")
+
+
+# ─── Artifacts ────────────────────────────────────────────────────────────────
+def save_artifacts(model_dir, xgb_model, scaler, le_dict, explainer,
+                   ae_model, ae_threshold, feature_cols, extra_meta: dict):
     print("\n💾 Saving artifacts...")
-    joblib.dump(xgb_model,    os.path.join(MODEL_DIR, "xgb_model.joblib"))
-    joblib.dump(scaler,       os.path.join(MODEL_DIR, "scaler.joblib"))
-    joblib.dump(le_dict,      os.path.join(MODEL_DIR, "label_encoders.joblib"))
-    joblib.dump(explainer,    os.path.join(MODEL_DIR, "shap_explainer.joblib"))
-    ae_model.save(            os.path.join(MODEL_DIR, "autoencoder.keras"))
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(xgb_model,    os.path.join(model_dir, "xgb_model.joblib"))
+    joblib.dump(scaler,       os.path.join(model_dir, "scaler.joblib"))
+    joblib.dump(le_dict,      os.path.join(model_dir, "label_encoders.joblib"))
+    joblib.dump(explainer,    os.path.join(model_dir, "shap_explainer.joblib"))
+    ae_model.save(            os.path.join(model_dir, "autoencoder.keras"))
 
     meta = {
         "feature_cols":     feature_cols,
         "numeric_features": NUMERIC_FEATURES,
         "cat_features":     CATEGORICAL_FEATURES,
         "ae_threshold":     ae_threshold,
-        "roc_auc":          round(auc, 4),
-        "avg_precision":    round(ap, 4),
         "trained_at":       pd.Timestamp.now().isoformat(),
-        "n_train":          int(len(X_train)),
-        "n_test":           int(len(X_test)),
-        "fraud_rate":       float(y.mean()),
+        "version":          "ArgusAI-" + pd.Timestamp.utcnow().strftime("%Y%m%d-%H%M%S"),
+        **extra_meta,
     }
-    with open(os.path.join(MODEL_DIR, "model_meta.json"), "w") as f:
+    with open(os.path.join(model_dir, "model_meta.json"), "w") as f:
         json.dump(meta, f, indent=2)
 
-    print("\n✅ All artifacts saved to ml/models/")
+    print(f"\n✅ All artifacts saved to {os.path.relpath(model_dir, BASE)}/")
     print("   xgb_model.joblib")
     print("   scaler.joblib")
     print("   label_encoders.joblib")
     print("   shap_explainer.joblib")
     print("   autoencoder.keras")
     print("   model_meta.json")
+
+
+# ─── Out-of-core training ─────────────────────────────────────────────────────
+class ChunkIter(xgb.DataIter):
+    """Feeds split chunks to XGBoost one at a time."""
+
+    def __init__(self, path, prep, part, chunksize, cache_prefix=None):
+        self._args = (path, prep, part, chunksize)
+        self._it   = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._it is None:
+            self._it = iter_split(*self._args)
+        try:
+            X, y = next(self._it)
+        except StopIteration:
+            return False
+        input_data(data=X, label=y)
+        return True
+
+    def reset(self):
+        self._it = None
+
+
+def train_xgboost_streaming(path, prep, chunksize, external_memory=False,
+                            params: dict = None, n_jobs: int = -1):
+    print("\n🚀 Training XGBoost classifier (streamed)...")
+    params = {**XGB_PARAMS, **(params or {})}
+    num_boost_round = params.pop("n_estimators")
+    scale_pos_weight = (prep.n_rows - prep.n_fraud) / max(prep.n_fraud, 1)
+    print(f"   scale_pos_weight = {scale_pos_weight:.2f}  (penalising false negatives)")
+
+    cache = os.path.join(MODEL_DIR, ".xgb_cache") if external_memory else None
+    train_it = ChunkIter(path, prep, "train", chunksize, cache_prefix=cache)
+    test_it  = ChunkIter(path, prep, "test",  chunksize)
+    if external_memory:
+        dtrain = xgb.DMatrix(train_it)
+        dtest  = xgb.DMatrix(test_it)
+    else:
+        dtrain = xgb.QuantileDMatrix(train_it)
+        dtest  = xgb.QuantileDMatrix(test_it, ref=dtrain)
+
+    params = {
+        "objective":        "binary:logistic",
+        "tree_method":      "hist",
+        "scale_pos_weight": scale_pos_weight,
+        "eval_metric":      "aucpr",
+        "seed":             42,
+        "nthread":          n_jobs,
+        **params,
+    }
+    booster = xgb.train(params, dtrain, num_boost_round=num_boost_round,
+                        evals=[(dtest, "test")], verbose_eval=50)
+
+    # Same artifact type as the in-memory path (predict.py uses predict_proba)
+    model = xgb.XGBClassifier()
+    model.load_model(bytearray(booster.save_raw("json")))
+
+    y_test = dtest.get_label().astype(np.int32)
+    y_prob = booster.predict(dtest)
+    auc    = roc_auc_score(y_test, y_prob)
+    ap     = average_precision_score(y_test, y_prob)
+    print(f"\n📊 XGBoost Results:")
+    print(f"   ROC-AUC          : {auc:.4f}")
+    print(f"   Avg Precision    : {ap:.4f}")
+    print(classification_report(y_test, (y_prob >= 0.5).astype(int),
+                                target_names=["Legit", "Fraud"]))
+
+    print("🔍 Building SHAP explainer...")
+    explainer = shap.TreeExplainer(model)
+    return model, explainer, auc, ap, int(dtrain.num_row()), int(dtest.num_row())
+
+
+def train_autoencoder_streaming(path, prep, chunksize, input_dim,
+                                params: dict = None, verbose: int = 1,
+                                threshold_sample: int = 1_000_000):
+    print("\n🧠 Training Autoencoder from a chunk generator...")
+    params     = {**AE_PARAMS, **(params or {})}
+    batch_size = params["batch_size"]
+    spec = (tf.TensorSpec(shape=(None, input_dim), dtype=tf.float32),
+            tf.TensorSpec(shape=(None, input_dim), dtype=tf.float32))
+
+    def batches(part):
+        def gen():
+            for X, _ in iter_split(path, prep, part, chunksize, normal_only=True):
+                for i in range(0, len(X), batch_size):
+                    yield X[i:i + batch_size], X[i:i + batch_size]
+        return tf.data.Dataset.from_generator(gen, output_signature=spec) \
+                              .prefetch(tf.data.AUTOTUNE)
+
+    autoencoder = build_autoencoder(input_dim, params["hidden"], params["bottleneck"],
+                                    params["dropout"], params["learning_rate"])
+    # Early stopping watches a slice of the train split; the test split
+    # stays unseen until evaluation
+    cb = EarlyStopping(patience=5, restore_best_weights=True, monitor="val_loss")
+    autoencoder.fit(batches("fit"), validation_data=batches("val"),
+                    epochs=params["epochs"], callbacks=[cb], verbose=verbose)
+
+    # 95th percentile of reconstruction error over a uniform sample: every
+    # normal train row is kept with the same probability, so ~threshold_sample
+    # rows are kept whatever the chunk sizes
+    expected = (prep.n_rows - prep.n_fraud) * (1 - TEST_FRACTION)
+    keep_p   = min(1.0, threshold_sample / max(expected, 1))
+    rng, errors = np.random.default_rng(SPLIT_SEED), []
+    for X, _ in iter_split(path, prep, "train", chunksize, normal_only=True):
+        recon = autoencoder.predict(X, verbose=0, batch_size=4096)
+        err   = np.mean(np.square(X - recon), axis=1)
+        errors.append(err[rng.random(len(err)) < keep_p])
+    threshold = float(np.percentile(np.concatenate(errors), 95))
+    print(f"   Anomaly threshold (95th pct): {threshold:.6f}")
+    return autoencoder, threshold
+
+
+def main_streaming(path, chunksize: int = 500_000, external_memory: bool = False,
+                   xgb_params: dict = None, ae_params: dict = None):
+    print(f"📂 Streaming dataset from {path} (chunks of {chunksize:,})...")
+    prep = StreamingPreprocessor()
+    for df in iter_frames(path, chunksize):
+        prep.partial_fit(df)
+    le_dict, scaler = prep.finalize()
+    print(f"   Rows: {prep.n_rows:,}  |  Fraud rate: {prep.n_fraud / prep.n_rows * 100:.2f}%")
+    feature_cols = NUMERIC_FEATURES + [c + "_enc" for c in CATEGORICAL_FEATURES]
+
+    # Each model streams its own passes over the data, on its own threads
+    xgb_threads, ae_threads = thread_split()
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(ae_threads)
+    except RuntimeError:                 # TF already initialised in this process
+        pass
+    print(f"   Training concurrently: XGBoost ×{xgb_threads} threads, "
+          f"Autoencoder ×{ae_threads} threads")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        xgb_job = pool.submit(train_xgboost_streaming, path, prep, chunksize,
+                              external_memory, xgb_params, xgb_threads)
+        ae_job  = pool.submit(train_autoencoder_streaming, path, prep, chunksize,
+                              len(feature_cols), ae_params, 2)
+        xgb_model, explainer, auc, ap, n_train, n_test = xgb_job.result()
+        ae_model, ae_threshold = ae_job.result()
+
+    save_artifacts(MODEL_DIR, xgb_model, scaler, le_dict, explainer,
+                   ae_model, ae_threshold, feature_cols, {
+                       "roc_auc":       round(auc, 4),
+                       "avg_precision": round(ap, 4),
+                       "n_train":       n_train,
+                       "n_test":        n_test,
+                       "fraud_rate":    prep.n_fraud / prep.n_rows,
+                       "training_mode": "external_memory" if external_memory
+                                        else "streaming",
+                       "xgb_params":    {**XGB_PARAMS, **(xgb_params or {})},
+                       "ae_params":     {**AE_PARAMS, **(ae_params or {})},
+                   })
     print(f"\n🎯 Final ROC-AUC: {auc:.4f}  |  Avg Precision: {ap:.4f}")
 
 
+def cli():
+    ap = argparse.ArgumentParser(description="ArgusAI model training")
+    ap.add_argument("--data",      default=DATA_PATH,
+                    help="CSV file or directory of CSV/Parquet partitions")
+    ap.add_argument("--stream",    action="store_true",
+                    help="out-of-core training from chunks")
+    ap.add_argument("--chunksize", type=int, default=500_000)
+    ap.add_argument("--external-memory", action="store_true",
+                    help="with --stream: page XGBoost data through an on-disk cache")
+    ap.add_argument("--no-cache",  action="store_true",
+                    help="re-parse the CSV instead of using ml/cache/")
+    ap.add_argument("--search",    action="store_true",
+                    help="hyperparameter search (see ml/search.py), then train the winners")
+    ap.add_argument("--trials",    type=int, default=12,
+                    help="with --search: configurations sampled per model")
+    ap.add_argument("--workers",   type=int, default=None,
+                    help="with --search: worker processes")
+    ap.add_argument("--max-latency-ms", type=float, default=None,
+                    help="with --search: only pick models whose p50 single-row "
+                         "inference latency is under this budget")
+    args = ap.parse_args()
+    if args.search:
+        from ml.search import run_search
+        best = run_search(args.data, trials=args.trials, workers=args.workers,
+                          max_latency_ms=args.max_latency_ms)
+        main(args.data, xgb_params=best["xgb"], ae_params=best["ae"],
+             extra_meta={"search": best["leaderboard"]})
+    elif args.stream or args.external_memory:
+        main_streaming(args.data, args.chunksize, args.external_memory)
+    else:
+        main(args.data, use_cache=not args.no_cache)
+
+
 if __name__ == "__main__":
-    main()
+    cli()
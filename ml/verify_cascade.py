@@ -0,0 +1,89 @@
+"""
+ArgusAI — Cascade Verification
+Scores a replay set twice — full pipeline and cascade mode — and checks
+that every decision matches. Also reports how often the cascade exits
+early and how much scoring time it saves.
+
+Replay set: a capture file (backend/capture.py) or, without one, a seeded
+synthetic stream with injected fraud. Exits non-zero on any mismatch.
+
+Usage:
+  python ml/verify_cascade.py --capture data/captures/bench.argcap
+  python ml/verify_cascade.py --n 5000 --seed 42 --fraud-every 10
+"""
+
+import os, sys, argparse
+from time import perf_counter
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def replay_set(capture: str = None, n: int = 2000, seed: int = 42,
+               fraud_every: int = 10) -> list[dict]:
+    if capture:
+        from backend.capture import open_capture, decode
+        recs = open_capture(capture)
+        return [decode(r) for r in (recs[:n] if n else recs)]
+    from backend.transaction_stream import TransactionGenerator
+    gen = TransactionGenerator(seed=seed)
+    return [gen.generate(force_fraud=bool(fraud_every) and i % fraud_every == 0)
+            for i in range(n)]
+
+
+def verify(txns: list[dict], model_dir: str = None) -> dict:
+    from ml.predict import FraudEngine, MODEL_DIR
+    engine = FraudEngine(model_dir or MODEL_DIR)
+    engine.warmup()
+
+    mismatches, exits, shap_skips = [], 0, 0
+    t_full = t_cascade = 0.0
+    for txn in txns:
+        t = perf_counter()
+        full = engine.predict(txn, cascade=False)
+        t_full += perf_counter() - t
+        t = perf_counter()
+        fast = engine.predict(txn, cascade=True)
+        t_cascade += perf_counter() - t
+
+        c = fast["cascade"]
+        exits      += c["early_exit"]
+        shap_skips += "shap" in c["skipped"]
+        lo, hi      = c["risk_bounds"]
+        same_score  = c["early_exit"] or fast["risk_score"] == full["risk_score"]
+        if fast["action"] != full["action"] or not same_score \
+                or not lo <= full["risk_score"] <= hi:
+            mismatches.append({"transaction_id": txn.get("transaction_id"),
+                               "full": full["action"], "cascade": fast["action"],
+                               "full_risk": full["risk_score"], "bounds": [lo, hi]})
+
+    n = len(txns)
+    return {
+        "transactions":   n,
+        "mismatches":     len(mismatches),
+        "early_exit_pct": round(exits / n * 100, 2) if n else 0.0,
+        "shap_skip_pct":  round(shap_skips / n * 100, 2) if n else 0.0,
+        "full_ms":        round(t_full / n * 1000, 3) if n else 0.0,
+        "cascade_ms":     round(t_cascade / n * 1000, 3) if n else 0.0,
+        "examples":       mismatches[:10],
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Check cascade decisions against full scoring")
+    ap.add_argument("--capture",     default=None, help=".argcap replay set")
+    ap.add_argument("--n",           type=int, default=2000,
+                    help="transactions to check (0 = whole capture)")
+    ap.add_argument("--seed",        type=int, default=42)
+    ap.add_argument("--fraud-every", type=int, default=10)
+    ap.add_argument("--models",      default=None)
+    args = ap.parse_args()
+
+    txns   = replay_set(args.capture, args.n, args.seed, args.fraud_every)
+    print(f"🔁 Verifying cascade on {len(txns):,} transactions...")
+    report = verify(txns, args.models)
+    print(f"   Early exits (AE skipped): {report['early_exit_pct']}%  |  "
+          f"SHAP skipped: {report['shap_skip_pct']}%")
+    print(f"   Mean predict: full {report['full_ms']}ms → cascade {report['cascade_ms']}ms")
+    if report["mismatches"]:
+        print(f"❌ {report['mismatches']} decisions differ, e.g. {report['examples'][:3]}")
+        sys.exit(1)
+    print("✅ All cascade decisions match full scoring")